@@ -0,0 +1,69 @@
+"""
+Benchmark micro-batching TextClassifierService pada request bersamaan.
+
+Sejumlah thread (meniru thread request gunicorn) memanggil classify_text secara bersamaan
+dengan teks dokumen sintetis. Dibandingkan tanpa batching (CLASSIFY_BATCH_MAX_SIZE=1) dan
+dengan batching pada beberapa ukuran jendela; dicetak throughput, latensi p50/p95 per
+panggilan, dan statistik batch dari /metrics.
+
+Membutuhkan model CLASSIFY_MODEL (diunduh dari Hugging Face jika belum ada di cache).
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_classifier_batching
+"""
+import logging
+import threading
+import time
+
+from src.document_api.core.config import settings
+from src.document_api.services.classifier_service import TextClassifierService
+
+CONCURRENCY = 16
+CALLS_PER_THREAD = 8
+CONFIGS = [(1, 0), (8, 5), (8, 10), (16, 20)]  # (CLASSIFY_BATCH_MAX_SIZE, CLASSIFY_BATCH_WAIT_MS)
+
+
+def make_text(i: int) -> str:
+    words = ["surat", "permohonan", "majelis", "jemaat", "kegiatan", "tanggal", "undangan", "ibadah"]
+    return " ".join(words[(i + j) % len(words)] for j in range(60 + i % 200))
+
+
+def run(service: TextClassifierService):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        for n in range(CALLS_PER_THREAD):
+            start = time.perf_counter()
+            service.classify_text(make_text(offset * CALLS_PER_THREAD + n))
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CONCURRENCY)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    logging.disable(logging.INFO)
+    total = CONCURRENCY * CALLS_PER_THREAD
+    for max_size, wait_ms in CONFIGS:
+        settings.CLASSIFY_BATCH_MAX_SIZE, settings.CLASSIFY_BATCH_WAIT_MS = max_size, wait_ms
+        service = TextClassifierService(model_name_or_path=settings.CLASSIFY_MODEL)
+        service.classify_text(make_text(0))  # pemanasan
+        elapsed, p50, p95 = run(service)
+        label = "tanpa batching" if max_size == 1 else f"batch {max_size:2d}, {wait_ms:2d} ms"
+        print(f"{label:18s}: {total / elapsed:6.1f} teks/s, p50 {p50 * 1000:7.1f} ms, p95 {p95 * 1000:7.1f} ms")
+        stats = service.batch_stats()
+        if stats:
+            print(f"{'':18s}  rata-rata batch {stats['batch_size_mean']}, delay antrean {stats['queue_delay_ms']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark normalisasi resolusi upload gambar (load_image) untuk foto ponsel beresolusi tinggi.
+
+Halaman surat sintetis diperbesar ke ukuran foto 12 MP dan 48 MP, disimpan sebagai JPEG dan PNG,
+lalu dibaca dengan:
+- decode penuh (cv2.imdecode) diikuti pra-pemrosesan pada resolusi asli, dan
+- load_image (decode tereduksi + resize ke OCR_IMAGE_TARGET_DPI) diikuti pra-pemrosesan.
+
+Alokasi baru saat decode diukur dengan tracemalloc.
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_image_normalize
+"""
+import logging
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic_pages import make_letter_page
+from src.document_api.core.config import settings
+from src.document_api.utils.image_loader import load_image
+from src.document_api.utils.preprocessing_image import preprocess_image_data
+
+REPEATS = 3
+MB = 1024 * 1024
+PHOTO_SIZES = {"12 MP": (3024, 4032), "48 MP": (6000, 8000)}
+
+
+def measure(fn, repeats=REPEATS):
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return result, (time.perf_counter() - start) / repeats * 1000, peak
+
+
+def preprocess_ms(image: np.ndarray) -> float:
+    start = time.perf_counter()
+    preprocess_image_data(image.copy(), page_number=1, id_numerik="bench", inplace=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    settings.APP_DEBUG = False
+    logging.disable(logging.INFO)
+    target_dpi = settings.OCR_IMAGE_TARGET_DPI or 300
+    page = make_letter_page(with_stamp=True, with_table=True)
+
+    for label, (width, height) in PHOTO_SIZES.items():
+        photo = cv2.resize(page, (width, height), interpolation=cv2.INTER_CUBIC)
+        for ext in (".jpg", ".png"):
+            data = cv2.imencode(ext, photo)[1].tobytes()
+            full, full_ms, full_peak = measure(lambda: cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+            (small, info), small_ms, small_peak = measure(lambda: load_image(data, target_dpi))
+            print(f"{label} {ext:4s}: decode penuh {full_ms:6.1f} ms, {full_peak / MB:6.1f} MB -> "
+                  f"{full.shape[1]}x{full.shape[0]} | load_image {small_ms:6.1f} ms, {small_peak / MB:6.1f} MB -> "
+                  f"{small.shape[1]}x{small.shape[0]} (~{info['estimated_dpi']:.0f} dpi, "
+                  f"reduksi decode 1/{info['decode_reduction']})")
+            print(f"{'':10s} pra-pemrosesan: resolusi asli {preprocess_ms(full):7.1f} ms | "
+                  f"setelah normalisasi {preprocess_ms(small):6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
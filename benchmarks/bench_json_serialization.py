@@ -0,0 +1,107 @@
+"""
+Benchmark serialisasi respons JSON untuk hasil NER/ekstraksi berukuran besar.
+
+Payload sintetis meniru respons /extract-information dokumen panjang: teks OCR puluhan halaman
+dan ribuan entitas dengan skor np.float32 serta offset np.int64. Dibandingkan:
+- sanitize_for_json (membangun ulang seluruh struktur) lalu json standar (jalur lama),
+- NumpyJSONProvider dengan json standar + hook numpy_default,
+- NumpyJSONProvider dengan orjson (jika terinstal),
+ditambah ukuran body setelah `fields=-text` dan setelah kompresi gzip/br.
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_json_serialization
+"""
+import gzip
+import json
+import time
+
+import numpy as np
+from flask import Flask
+
+from src.document_api.utils import json_provider
+from src.document_api.utils.json_provider import NumpyJSONProvider, select_fields
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPEATS = 20
+PAGES = 40
+ENTITIES = 5000
+
+
+def sanitize_for_json(data):
+    """Salinan helper lama dari api/ner.py sebagai pembanding."""
+    if isinstance(data, (np.int_, np.intc, np.intp, np.int8,
+                         np.int16, np.int32, np.int64, np.uint8,
+                         np.uint16, np.uint32, np.uint64)):
+        return int(data)
+    elif isinstance(data, (np.float16, np.float32, np.float64)):
+        return float(data)
+    elif isinstance(data, (np.ndarray,)):
+        return data.tolist()
+    elif isinstance(data, dict):
+        return {k: sanitize_for_json(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [sanitize_for_json(v) for v in data]
+    return data
+
+
+def make_payload() -> dict:
+    rng = np.random.default_rng(0)
+    words = ["Jemaat", "GKI", "Surabaya", "Pdt.", "Budi", "Santoso", "tanggal", "Nomor", "Majelis"]
+    text = "\n".join(" ".join(rng.choice(words, 400)) for _ in range(PAGES))
+    entities = [{
+        "entity_group": str(rng.choice(["PER", "ORG", "LOC", "DATE"])),
+        "score": np.float32(rng.random()),
+        "word": str(rng.choice(words)),
+        "start": np.int64(i * 7),
+        "end": np.int64(i * 7 + 5),
+    } for i in range(ENTITIES)]
+    return {"data": {"file_name": "bench.pdf", "text": text, "entities": entities}}
+
+
+def timed(fn, repeats=REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    app = Flask(__name__)
+    provider = NumpyJSONProvider(app)
+    payload = make_payload()
+
+    legacy_ms = timed(lambda: json.dumps(sanitize_for_json(payload), separators=(",", ":")))
+    print(f"sanitize_for_json + json   : {legacy_ms:7.1f} ms")
+
+    orjson_module = json_provider.orjson
+    json_provider.orjson = None
+    try:
+        std_ms = timed(lambda: provider.dumps(payload))
+    finally:
+        json_provider.orjson = orjson_module
+    print(f"provider (json + default)  : {std_ms:7.1f} ms")
+    if orjson_module is not None:
+        orjson_ms = timed(lambda: provider.dumps(payload))
+        print(f"provider (orjson)          : {orjson_ms:7.1f} ms ({legacy_ms / orjson_ms:.1f}x)")
+    else:
+        print("provider (orjson)          : orjson tidak terinstal")
+
+    body = provider.dumps(payload).encode("utf-8")
+    trimmed = provider.dumps(dict(payload, data=select_fields(payload["data"], "-text"))).encode("utf-8")
+    print(f"\nbody penuh                 : {len(body) / 1024:7.1f} KB")
+    print(f"fields=-text               : {len(trimmed) / 1024:7.1f} KB")
+    gz_ms = timed(lambda: gzip.compress(body, compresslevel=5), repeats=5)
+    print(f"gzip level 5               : {len(gzip.compress(body, compresslevel=5)) / 1024:7.1f} KB ({gz_ms:.1f} ms)")
+    if brotli is not None:
+        br_ms = timed(lambda: brotli.compress(body, quality=5), repeats=5)
+        print(f"br quality 5               : {len(brotli.compress(body, quality=5)) / 1024:7.1f} KB ({br_ms:.1f} ms)")
+    else:
+        print("br                         : paket brotli tidak terinstal")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark micro-batching NERService pada request bersamaan.
+
+Sejumlah thread memanggil predict_entities_text secara bersamaan dengan dokumen sintetis
+berpanjangan campuran (surat pendek sampai notulen beberapa halaman). Dibandingkan tanpa
+penggabungan antar-request (NER_BATCH_MAX_SIZE=1) dan dengan penggabungan; dicetak
+throughput, latensi p50/p95, serta efisiensi padding (token asli / token setelah padding).
+
+Membutuhkan model NER_MODEL (diunduh dari Hugging Face jika belum ada di cache).
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_ner_batching
+"""
+import logging
+import random
+import threading
+import time
+
+from src.document_api.core.config import settings
+from src.document_api.services.ner_service import NERService
+
+CONCURRENCY = 8
+DOCS_PER_THREAD = 4
+CONFIGS = [(1, 0), (8, 10), (8, 25)]  # (NER_BATCH_MAX_SIZE, NER_BATCH_WAIT_MS)
+
+
+def make_document(rng: random.Random) -> str:
+    names = ["Pdt. Yohanes Santoso", "Budi Hartono", "Maria Lestari", "GKI Diponegoro", "Surabaya"]
+    filler = ["dengan hormat", "kami mengundang", "majelis jemaat", "pada hari minggu", "bertempat di"]
+    lines = []
+    for _ in range(rng.choice([3, 8, 20, 60])):
+        words = [rng.choice(filler) for _ in range(rng.randint(2, 6))]
+        words.insert(rng.randint(0, len(words)), rng.choice(names))
+        lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+def run(service: NERService, documents):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        for text in documents[offset::CONCURRENCY]:
+            start = time.perf_counter()
+            service.predict_entities_text(text)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CONCURRENCY)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+    documents = [make_document(rng) for _ in range(CONCURRENCY * DOCS_PER_THREAD)]
+    for max_size, wait_ms in CONFIGS:
+        settings.NER_BATCH_MAX_SIZE, settings.NER_BATCH_WAIT_MS = max_size, wait_ms
+        service = NERService(model_name_or_path=settings.NER_MODEL)
+        service.predict_entities_text(documents[0])  # pemanasan
+        elapsed, p50, p95 = run(service, documents)
+        stats = service.batch_stats()
+        label = "tanpa penggabungan" if max_size == 1 else f"batch {max_size:2d}, {wait_ms:2d} ms"
+        print(f"{label:18s}: {len(documents) / elapsed:6.2f} dok/s, p50 {p50 * 1000:7.1f} ms, "
+              f"p95 {p95 * 1000:7.1f} ms, efisiensi padding {stats['padding_efficiency']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark backend inferensi model (MODEL_BACKEND): memori dan latensi.
+
+Setiap konfigurasi dijalankan di proses terpisah agar pengukuran memori bersih:
+- transformers (bobot full-precision, acuan),
+- onnx fp32 (ONNX Runtime tanpa kuantisasi),
+- onnx int8 (kuantisasi dinamis ONNX_QUANTIZATION_TARGET).
+
+Untuk setiap konfigurasi dicetak RSS setelah kedua model dimuat dan latensi p50/p95 per teks
+untuk klasifikasi dan NER (micro-batching dimatikan). Paritas hasil antar backend diuji
+di test/test_onnx_backend.py. Skrip keluar dengan kode 1 jika salah satu konfigurasi gagal,
+termasuk jika konfigurasi onnx ternyata tidak dimuat dengan ONNX Runtime.
+
+Membutuhkan CLASSIFY_MODEL, NER_MODEL, dan paket optimum[onnxruntime]. Teks uji bisa diambil dari
+folder berisi file .txt (mis. hasil /extract-text yang disimpan); default memakai teks sintetis.
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_onnx_backend [folder_teks]
+"""
+import glob
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import time
+
+CONFIGS = [("transformers", False), ("onnx", False), ("onnx", True)]
+# Batas waktu satu konfigurasi (termasuk ekspor/kuantisasi ONNX pertama kali)
+CONFIG_TIMEOUT_SECONDS = 1800
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def synthetic_texts():
+    names = ["Pdt. Yohanes Santoso", "Budi Hartono", "Maria Lestari", "GKI Diponegoro", "Majelis Jemaat"]
+    openings = ["Dengan hormat, bersama surat ini kami mengundang", "Menindaklanjuti rapat tanggal 12 Mei 2024,",
+                "Nomor: 045/MJ/GKI/V/2024 Perihal: Permohonan peminjaman ruang"]
+    texts = []
+    for i in range(40):
+        lines = [openings[i % len(openings)], f"Kepada Yth. {names[i % len(names)]}"]
+        lines += [f"kegiatan ibadah bersama {names[(i + j) % len(names)]} di Surabaya" for j in range(1 + i % 12)]
+        lines.append(f"Hormat kami, {names[(i + 2) % len(names)]}")
+        texts.append("\n".join(lines))
+    return texts
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def run_backend(backend: str, quantize: bool, texts, results):
+    from src.document_api.core.config import settings
+    settings.MODEL_BACKEND, settings.ONNX_QUANTIZE = backend, quantize
+    settings.CLASSIFY_BATCH_MAX_SIZE = settings.NER_BATCH_MAX_SIZE = 1
+    logging.disable(logging.WARNING)
+    from src.document_api.services.classifier_service import TextClassifierService
+    from src.document_api.services.ner_service import NERService
+
+    rss_before = rss_bytes()
+    classifier = TextClassifierService(model_name_or_path=settings.CLASSIFY_MODEL)
+    ner = NERService(model_name_or_path=settings.NER_MODEL)
+    rss_loaded = rss_bytes()
+    if backend == "onnx":
+        # load_pipeline kembali ke transformers jika optimum[onnxruntime] tidak ada; angka yang
+        # dihasilkan saat itu bukan angka ONNX.
+        from optimum.onnxruntime import ORTModel
+        if not (isinstance(classifier.classifier.model, ORTModel) and isinstance(ner.ner_pipeline.model, ORTModel)):
+            raise RuntimeError("Model tidak dimuat dengan ONNX Runtime (periksa instalasi optimum[onnxruntime]).")
+    classifier.classify_text(texts[0])
+    ner.predict_entities_text(texts[0])
+
+    classify_times, ner_times = [], []
+    for text in texts:
+        start = time.perf_counter()
+        classifier.classify_text(text)
+        classify_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        ner.predict_entities_text(text)
+        ner_times.append(time.perf_counter() - start)
+    results.put({
+        "rss_loaded": rss_loaded, "rss_models": rss_loaded - rss_before,
+        "classify_times": classify_times, "ner_times": ner_times
+    })
+
+
+def run_config(context, backend: str, quantize: bool, texts):
+    """Menjalankan satu konfigurasi di proses terpisah; None jika proses gagal atau melewati batas waktu."""
+    results = context.Queue()
+    process = context.Process(target=run_backend, args=(backend, quantize, texts, results))
+    process.start()
+    deadline = time.monotonic() + CONFIG_TIMEOUT_SECONDS
+    result = None
+    while result is None and time.monotonic() < deadline:
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                # Hasil yang dikirim tepat sebelum proses keluar masih bisa berada di pipe.
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    pass
+                break
+    if result is None and process.is_alive():
+        process.terminate()
+    process.join()
+    if result is None:
+        print(f"Konfigurasi {backend} (kuantisasi: {quantize}) gagal, kode keluar proses: {process.exitcode}")
+    return result
+
+
+def main():
+    if len(sys.argv) > 1:
+        texts = [open(path, encoding="utf-8").read() for path in sorted(glob.glob(os.path.join(sys.argv[1], "*.txt")))]
+    else:
+        texts = synthetic_texts()
+    context = multiprocessing.get_context("spawn")
+
+    passed = True
+    for backend, quantize in CONFIGS:
+        result = run_config(context, backend, quantize, texts)
+        if result is None:
+            passed = False
+            continue
+
+        label = backend if backend == "transformers" else f"onnx {'int8' if quantize else 'fp32'}"
+        print(f"{label:12s}: RSS {result['rss_loaded'] / MB:7.1f} MB (model {result['rss_models'] / MB:6.1f} MB), "
+              f"klasifikasi p50 {percentile(result['classify_times'], 0.5):6.1f} ms / "
+              f"p95 {percentile(result['classify_times'], 0.95):6.1f} ms, "
+              f"NER p50 {percentile(result['ner_times'], 0.5):6.1f} ms / p95 {percentile(result['ner_times'], 0.95):6.1f} ms")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark serah-terima raster halaman A4 300 dpi dari Poppler ke OpenCV dan dari pipeline ke Tesseract.
+
+- Baca halaman PPM/PGM: cv2.imread (baca file + decode) vs _read_pnm (memory-map).
+- Gambar biner ke file sementara pytesseract: PNG (default pytesseract) vs PNM mentah.
+
+Alokasi baru diukur dengan tracemalloc (salinan halaman penuh terlihat sebagai kelipatan raster).
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_raster_handoff
+"""
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmarks.synthetic_pages import make_letter_page
+from src.document_api.utils.pdf_renderer import _read_pnm
+
+REPEATS = 5
+MB = 1024 * 1024
+
+
+def measure(fn, repeats=REPEATS):
+    fn()  # Pemanasan (page cache OS)
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000, peak
+
+
+def main():
+    page_bgr = make_letter_page(with_stamp=True, with_table=True)
+    page_gray = cv2.cvtColor(page_bgr, cv2.COLOR_BGR2GRAY)
+    binary = cv2.threshold(page_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ppm_path, pgm_path = os.path.join(tmp_dir, "page.ppm"), os.path.join(tmp_dir, "page.pgm")
+        cv2.imwrite(ppm_path, page_bgr)
+        cv2.imwrite(pgm_path, page_gray)
+
+        for label, path, gray, raster_bytes in [("PPM warna", ppm_path, False, page_bgr.nbytes),
+                                                ("PGM grayscale", pgm_path, True, page_gray.nbytes)]:
+            flag = cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR
+            imread_ms, imread_peak = measure(lambda: cv2.imread(path, flag))
+            mmap_ms, mmap_peak = measure(lambda: _read_pnm(path, gray))
+            print(f"baca {label:14s}: imread {imread_ms:6.1f} ms ({imread_peak / raster_bytes:4.2f}x raster) | "
+                  f"memmap {mmap_ms:6.1f} ms ({mmap_peak / raster_bytes:4.2f}x raster) | "
+                  f"identik: {np.array_equal(cv2.imread(path, flag), _read_pnm(path, gray))}")
+
+    for fmt in ("PNG", "PPM"):
+        def encode():
+            buffer = io.BytesIO()
+            Image.fromarray(binary).save(buffer, format=fmt)
+            return buffer
+        encode_ms, _ = measure(encode)
+        print(f"tulis biner untuk Tesseract sebagai {fmt}: {encode_ms:6.1f} ms, {len(encode().getvalue()) / MB:5.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark penghapusan stempel/tanda tangan pada halaman A4 300 dpi.
+
+Membandingkan implementasi lama (tujuh cv2.inRange + rantai bitwise_or + overlay putih)
+dengan implementasi LUT satu sapuan di utils/preprocessing_image.py, sekaligus
+memastikan hasil keduanya identik piksel per piksel.
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_stamp_removal
+"""
+import logging
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic_pages import make_letter_page
+from src.document_api.core.config import settings
+from src.document_api.utils.preprocessing_image import remove_stamp_and_signature, STAMP_HSV_RANGES
+
+REPEATS = 10
+
+
+def legacy_remove_stamp_and_signature(image_bgr: np.ndarray, page_number: int = 0) -> np.ndarray:
+    """Salinan implementasi sebelum optimasi (tanpa penulisan debug) sebagai pembanding."""
+    hsv = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2HSV)
+    masks = [cv2.inRange(hsv, np.array(lower), np.array(upper)) for _, lower, upper in STAMP_HSV_RANGES]
+    combined_mask = masks[0]
+    for mask in masks[1:]:
+        combined_mask = cv2.bitwise_or(combined_mask, mask)
+    if page_number == 0:
+        h, w, _ = image_bgr.shape
+        protection_mask = np.full((h, w), 255, dtype=np.uint8)
+        cv2.rectangle(protection_mask, (0, 0), (w, int(h * 0.15)), (0, 0, 0), -1)
+        combined_mask = cv2.bitwise_and(combined_mask, protection_mask)
+    dilated_mask = cv2.dilate(combined_mask, np.ones((3, 3), np.uint8), iterations=1)
+    white_background = np.full(image_bgr.shape, 255, dtype=np.uint8)
+    image_no_stamp_signature = cv2.bitwise_and(image_bgr, image_bgr, mask=cv2.bitwise_not(dilated_mask))
+    white_overlay = cv2.bitwise_and(white_background, white_background, mask=dilated_mask)
+    return cv2.add(image_no_stamp_signature, white_overlay)
+
+
+def time_call(fn, repeats=REPEATS) -> float:
+    fn()  # Pemanasan
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    settings.APP_DEBUG = False
+    logging.disable(logging.INFO)
+
+    for label, page in [("surat + stempel", make_letter_page(with_stamp=True)),
+                        ("surat tanpa stempel", make_letter_page(with_stamp=False))]:
+        for page_number in (0, 1):
+            expected = legacy_remove_stamp_and_signature(page, page_number)
+            actual = remove_stamp_and_signature(page, page_number)
+            identical = np.array_equal(expected, actual)
+
+            legacy_ms = time_call(lambda: legacy_remove_stamp_and_signature(page, page_number))
+            fused_ms = time_call(lambda: remove_stamp_and_signature(page, page_number))
+            working = page.copy()
+            inplace_ms = time_call(lambda: remove_stamp_and_signature(working, page_number, inplace=True))
+
+            print(f"{label:22s} halaman {page_number + 1} ({page.shape[1]}x{page.shape[0]}): "
+                  f"lama {legacy_ms:7.1f} ms | LUT {fused_ms:7.1f} ms | LUT in-place {inplace_ms:7.1f} ms | "
+                  f"speedup {legacy_ms / inplace_ms:4.2f}x | identik: {identical}")
+
+
+if __name__ == "__main__":
+    main()
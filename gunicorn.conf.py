@@ -0,0 +1,62 @@
+"""
+Konfigurasi gunicorn untuk server produksi.
+
+Jalankan dari root proyek:
+    gunicorn -c gunicorn.conf.py
+
+Aplikasi (termasuk kedua pipeline IndoBERT) dimuat sekali di proses master (preload_app),
+lalu worker di-fork sehingga bobot model dibagi copy-on-write antar worker. Garbage collector
+dimatikan di master dan objek yang sudah ada dibekukan (gc.freeze) sebelum fork, supaya
+pemindaian GC di worker tidak menyentuh (dan menyalin) halaman memori milik model.
+Process pool OCR, thread pool batch, worker job, dan penulis debug dibuat lazy per proses
+(dengan pengecekan pid), jadi tidak ada thread/pool yang ikut terwariskan dari master.
+"""
+import gc
+import os
+import sys
+
+from src.document_api.core.config import settings
+
+# Tunda GC sejak awal agar objek yang dibuat saat memuat model tidak dipindahkan/dipadatkan
+# setelah fork (lihat dokumentasi gc.freeze).
+gc.disable()
+
+_cpu_count = os.cpu_count() or 1
+
+wsgi_app = "run:app"
+bind = settings.SERVER_BIND
+workers = settings.SERVER_WORKERS or _cpu_count
+# gthread: SERVER_THREADS thread per worker untuk upload, polling job, dan stream SSE/NDJSON
+worker_class = "gthread"
+threads = settings.SERVER_THREADS
+preload_app = True
+timeout = settings.SERVER_TIMEOUT_SECONDS
+graceful_timeout = 30
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = max_requests // 10
+
+# Batasi thread intra-op inferensi per worker; tanpa ini setiap worker memakai semua core dan
+# throughput turun karena oversubscription. Harus diset sebelum torch/tensorflow dimuat.
+inference_threads = str(settings.SERVER_INFERENCE_THREADS or max(1, _cpu_count // workers))
+for _name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+    os.environ.setdefault(_name, inference_threads)
+# Tokenizer Rust tidak aman dipakai paralel setelah fork.
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def when_ready(server):
+    server.log.info(f"Aplikasi dimuat di master (pid {os.getpid()}); {workers} worker x {threads} thread, "
+                    f"{inference_threads} thread inferensi per worker.")
+
+
+def pre_fork(server, worker):
+    # Objek yang ada sekarang dipindahkan ke generasi permanen; GC di worker tidak akan memindainya.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    # torch membaca OMP_NUM_THREADS saat diimpor; jika sudah diimpor di master, atur ulang di sini.
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(int(inference_threads))
@@ -6,17 +6,24 @@ from datetime import datetime, timezone
 
 from flask import Flask, jsonify
 
+from .api.batch import init_batch_services, batch_bp
 from .api.classifier import init_classifier_services, classifier_bp
+from .api.jobs import init_job_services, jobs_bp
 from .api.information_extraction import init_information_services, information_bp
 from .api.ner import init_ner_services, ner_bp
 from .api.ocr import ocr_bp, init_ocr_service
+from .api.pipeline import init_pipeline_services, pipeline_bp
 from .api.scanner import init_scanner_api, scanner_bp
 from .core.config import settings
 from .services.classifier_service import TextClassifierService
 from .services.information_extraction_service import InformationExtractionService
+from .services.job_service import JobService
 from .services.ner_service import NERService
 from .services.ocr_service import OCRService
+from .services.pipeline_service import DocumentPipelineService
 from .services.scan_service import ScanService
+from .utils.http_compression import compress_response
+from .utils.json_provider import NumpyJSONProvider
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +39,8 @@ def find_tesseract_path() -> str | None:
 def create_app():
     """Application factory function."""
     app = Flask(__name__)
+    # Provider JSON yang men-serialize tipe NumPy secara native (dipakai jsonify, NDJSON, dan SSE)
+    app.json = NumpyJSONProvider(app)
     app.config.from_object(settings)
     app.config['UPLOAD_FOLDER'] = settings.UPLOAD_FOLDER
 
@@ -63,6 +72,17 @@ def create_app():
 
         info_ext_svc_instance = InformationExtractionService()
 
+        pipeline_service_instance = DocumentPipelineService(
+            ocr_service=ocr_service_instance,
+            classifier_service=classifier_service_instance,
+            ner_service=ner_service_instance,
+            info_extraction_service=info_ext_svc_instance
+        )
+
+        job_service_instance = JobService(
+            pipeline_service=pipeline_service_instance
+        )
+
         scan_service_instance = ScanService(
             api_url=settings.ROBOFLOW_API_URL,
             api_key=settings.ROBOFLOW_API_KEY,
@@ -79,10 +99,16 @@ def create_app():
             ner_svc_instance=ner_service_instance
         )
         init_information_services(
-            ocr_svc_instance=ocr_service_instance,
-            classifier_svc_instance=classifier_service_instance,
-            ner_svc_instance=ner_service_instance,
-            info_ext_svc_instance=info_ext_svc_instance
+            pipeline_svc_instance=pipeline_service_instance
+        )
+        init_batch_services(
+            pipeline_svc_instance=pipeline_service_instance
+        )
+        init_pipeline_services(
+            pipeline_svc_instance=pipeline_service_instance
+        )
+        init_job_services(
+            job_svc_instance=job_service_instance
         )
         init_scanner_api(
             service_instance=scan_service_instance
@@ -93,7 +119,11 @@ def create_app():
     app.register_blueprint(classifier_bp, url_prefix='/documents')
     app.register_blueprint(ner_bp, url_prefix='/documents')
     app.register_blueprint(information_bp, url_prefix='/documents')
+    app.register_blueprint(batch_bp, url_prefix='/documents')
+    app.register_blueprint(jobs_bp, url_prefix='/documents')
+    app.register_blueprint(pipeline_bp, url_prefix='/documents')
     app.register_blueprint(scanner_bp, url_prefix='/documents')
+    app.after_request(compress_response)
 
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -153,4 +183,19 @@ def create_app():
         status_code = 200 if is_healthy else 503  # 503 Service Unavailable
 
         return jsonify(response_data), status_code
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """
+        Mengembalikan counter operasional aplikasi (mis. hit/miss cache OCR).
+        """
+        return jsonify({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # Counter bersifat per proses; pid membedakan worker gunicorn
+            "pid": os.getpid(),
+            "ocr_cache": ocr_service_instance.cache_stats(),
+            "classifier_batching": classifier_service_instance.batch_stats(),
+            "ner_batching": ner_service_instance.batch_stats(),
+            "jobs": job_service_instance.stats()
+        }), 200
     return app
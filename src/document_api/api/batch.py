@@ -0,0 +1,129 @@
+import io
+import logging
+import os
+import zipfile
+from typing import List
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from werkzeug.utils import secure_filename
+
+from ..core.config import settings
+from ..services.pipeline_service import DocumentPipelineService, BatchDocument, InvalidDocumentError
+from ..utils.file_handler import allowed_file
+
+logger = logging.getLogger(__name__)
+batch_bp = Blueprint('batch_bp', __name__)
+
+pipeline_service: DocumentPipelineService = None
+
+
+def init_batch_services(pipeline_svc_instance: DocumentPipelineService):
+    """Fungsi helper untuk menerima instance service yang sudah dibuat."""
+    global pipeline_service
+    pipeline_service = pipeline_svc_instance
+
+
+def _rejected(message: str):
+    """Pembaca dokumen untuk file yang ditolak: error dilaporkan sebagai baris hasil dokumen tersebut."""
+    def read() -> bytes:
+        raise InvalidDocumentError(message)
+    return read
+
+
+def _detach_stream(file):
+    """
+    Mengambil alih stream file upload. Flask menutup semua file request ketika view selesai,
+    sebelum respons streaming dikirim; stream yang sudah dilepas ditutup sendiri oleh generator.
+    """
+    stream = file.stream
+    file.stream = io.BytesIO()
+    return stream
+
+
+def _upload_document(file, streams: list) -> BatchDocument:
+    """Dokumen dari satu bagian multipart. Isinya baru dibaca saat dokumen diproses."""
+    file_name = secure_filename(file.filename or "")
+    if not file_name or not allowed_file(file_name):
+        return file_name or "(tanpa nama)", _rejected("Format file tidak didukung.")
+    stream = _detach_stream(file)
+    streams.append(stream)
+    return file_name, stream.read
+
+
+def _zip_documents(archive: zipfile.ZipFile) -> List[BatchDocument]:
+    """Dokumen dari entri arsip ZIP. Ukuran entri diperiksa dari header sebelum didekompresi."""
+    max_bytes = settings.BATCH_MAX_FILE_MB * 1024 * 1024
+    documents = []
+    for info in archive.infolist():
+        base_name = os.path.basename(info.filename)
+        if info.is_dir() or not base_name or base_name.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        file_name = secure_filename(base_name) or base_name
+        if not allowed_file(file_name):
+            documents.append((file_name, _rejected("Format file tidak didukung.")))
+        elif info.file_size > max_bytes:
+            documents.append((file_name, _rejected(f"Ukuran file melebihi {settings.BATCH_MAX_FILE_MB} MB.")))
+        else:
+            documents.append((file_name, lambda info=info: archive.read(info)))
+    return documents
+
+
+@batch_bp.route('extract-information/batch', methods=['POST'])
+def extract_information_batch_endpoint():
+    """
+    Endpoint batch untuk /extract-information. Menerima banyak file sekaligus, baik sebagai
+    beberapa bagian multipart 'files' maupun satu arsip ZIP (bagian 'file'/'files' berekstensi
+    .zip atau body dengan Content-Type application/zip).
+
+    Dokumen diproses paralel dengan jumlah terbatas dan setiap hasil dikirim sebagai satu baris
+    NDJSON segera setelah dokumen selesai. Baris terakhir berisi ringkasan batch.
+    """
+    if pipeline_service is None:
+        logger.error("DocumentPipelineService belum diinisialisasi.")
+        return jsonify({"error": "Layanan tidak tersedia saat ini."}), 503
+
+    uploads = request.files.getlist('files') + request.files.getlist('file')
+    archive = None
+    streams = []
+
+    def close_inputs():
+        if archive is not None:
+            archive.close()
+        for stream in streams:
+            stream.close()
+
+    try:
+        if request.mimetype in ("application/zip", "application/x-zip-compressed"):
+            archive = zipfile.ZipFile(io.BytesIO(request.get_data()))
+        elif len(uploads) == 1 and (uploads[0].filename or "").lower().endswith(".zip"):
+            streams.append(_detach_stream(uploads[0]))
+            archive = zipfile.ZipFile(streams[0])
+    except zipfile.BadZipFile:
+        close_inputs()
+        return jsonify({"error": "Arsip ZIP tidak valid."}), 400
+
+    if archive is not None:
+        documents = _zip_documents(archive)
+    else:
+        documents = [_upload_document(file, streams) for file in uploads]
+    if not documents:
+        close_inputs()
+        return jsonify({"error": "Request harus menyertakan bagian 'files' atau arsip ZIP berisi dokumen."}), 400
+    if len(documents) > settings.BATCH_MAX_FILES:
+        close_inputs()
+        return jsonify({"error": f"Jumlah dokumen melebihi batas {settings.BATCH_MAX_FILES} per batch."}), 400
+
+    logger.info(f"Memulai batch ekstraksi informasi untuk {len(documents)} dokumen.")
+
+    def generate():
+        summary = {"status": "done", "total": len(documents), "succeeded": 0, "failed": 0}
+        try:
+            for result in pipeline_service.process_batch(documents):
+                summary["succeeded" if result["status"] == "ok" else "failed"] += 1
+                yield current_app.json.dumps(result) + "\n"
+            yield current_app.json.dumps(summary) + "\n"
+            logger.info(f"Batch selesai: {summary['succeeded']} berhasil, {summary['failed']} gagal.")
+        finally:
+            close_inputs()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -1,11 +1,10 @@
 import logging
-import os
 
 from flask import Blueprint, request, jsonify
 
 from ..services.classifier_service import TextClassifierService, ClassifierError
 from ..services.ocr_service import OCRService, TesseractNotFoundError, OCRError
-from ..utils.file_handler import save_uploaded_file
+from ..utils.file_handler import read_uploaded_file
 
 logger = logging.getLogger(__name__)
 classifier_bp = Blueprint('classifier_bp', __name__)
@@ -34,13 +33,13 @@ def classify_document_endpoint():
         return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
 
     file = request.files['file']
-    file_path, error = save_uploaded_file(file)
+    file_data, file_name, error = read_uploaded_file(file)
     if error:
         return jsonify({"error": error}), 500
 
     try:
         logger.info(f"Memulai pipeline OCR untuk file: {file.filename}")
-        ocr_result = ocr_service.extract_text_from_file(file_path)
+        ocr_result = ocr_service.extract_text_from_bytes(file_data, file_name)
 
         text_to_classify = ocr_result.get("text_for_classification")
 
@@ -64,10 +63,3 @@ def classify_document_endpoint():
     except Exception as e:
         logger.critical(f"Terjadi error internal server yang tidak terduga: {e}", exc_info=True)
         return jsonify({"error": "Terjadi kesalahan internal pada server."}), 500
-    finally:
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                logger.info(f"File sementara berhasil dihapus: {file_path}")
-            except OSError as e:
-                logger.error(f"Gagal menghapus file sementara: {file_path}. Error: {e}")
\ No newline at end of file
@@ -0,0 +1,136 @@
+import logging
+import time
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+
+from ..core.config import settings
+from ..services.job_service import JobService, JobError, FINAL_STATUSES
+from ..utils.file_handler import read_uploaded_file
+from ..utils.streaming import SSE_HEADERS, SSE_MIMETYPE, sse_event
+
+logger = logging.getLogger(__name__)
+jobs_bp = Blueprint('jobs_bp', __name__)
+
+job_service: JobService = None
+
+
+def init_job_services(job_svc_instance: JobService):
+    """Fungsi helper untuk menerima instance service yang sudah dibuat."""
+    global job_service
+    job_service = job_svc_instance
+
+
+@jobs_bp.before_app_request
+def ensure_job_workers():
+    """
+    Worker job dinyalakan pada request pertama di setiap proses, sehingga job yang terputus
+    saat restart langsung diantrekan ulang tanpa menunggu request ke /jobs.
+    """
+    if job_service is not None:
+        job_service.ensure_workers()
+
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def _job_view(job: dict) -> dict:
+    """Representasi job untuk respons API; hasil/error hanya disertakan jika job sudah selesai."""
+    view = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "file_name": job["file_name"],
+        "created_at": _timestamp(job["created_at"]),
+        "updated_at": _timestamp(job["updated_at"]),
+    }
+    if job["result"] is not None:
+        view["result"] = job["result"]
+    if job["error"] is not None:
+        view["error"] = job["error"]
+    return view
+
+
+@jobs_bp.route('jobs', methods=['POST'])
+def submit_job_endpoint():
+    """
+    Endpoint asinkron untuk /extract-information. File disimpan sebagai job dan id job
+    langsung dikembalikan (202); pipeline dijalankan oleh worker job di latar belakang.
+    """
+    if job_service is None:
+        logger.error("JobService belum diinisialisasi.")
+        return jsonify({"error": "Layanan tidak tersedia saat ini."}), 503
+
+    if 'file' not in request.files:
+        return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
+
+    file = request.files['file']
+    file_data, file_name, error = read_uploaded_file(file)
+    if error:
+        return jsonify({"error": error}), 500
+
+    try:
+        job_id = job_service.submit(file_data, file_name)
+    except JobError as e:
+        logger.error(f"Terjadi error saat membuat job: {e}", exc_info=True)
+        return jsonify({"error": "Gagal membuat job."}), 500
+
+    status_url = url_for('jobs_bp.job_status_endpoint', job_id=job_id)
+    return jsonify({
+        'data': {
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": status_url,
+            "events_url": url_for('jobs_bp.job_events_endpoint', job_id=job_id)
+        }
+    }), 202, {"Location": status_url}
+
+
+@jobs_bp.route('jobs/<job_id>', methods=['GET'])
+def job_status_endpoint(job_id: str):
+    """Endpoint polling: status job, beserta hasil (atau error) jika sudah selesai."""
+    if job_service is None:
+        logger.error("JobService belum diinisialisasi.")
+        return jsonify({"error": "Layanan tidak tersedia saat ini."}), 503
+
+    job = job_service.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job tidak ditemukan."}), 404
+    return jsonify({'data': _job_view(job)}), 200
+
+
+@jobs_bp.route('jobs/<job_id>/events', methods=['GET'])
+def job_events_endpoint(job_id: str):
+    """
+    Endpoint server-sent events: mengirim event "status" setiap kali status job berubah,
+    diakhiri event yang berisi hasil atau error. Komentar keep-alive dikirim saat menunggu.
+    """
+    if job_service is None:
+        logger.error("JobService belum diinisialisasi.")
+        return jsonify({"error": "Layanan tidak tersedia saat ini."}), 503
+
+    if job_service.get(job_id) is None:
+        return jsonify({"error": "Job tidak ditemukan."}), 404
+
+    def generate():
+        since = 0.0
+        deadline = time.monotonic() + settings.JOBS_SSE_TIMEOUT_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield sse_event("timeout", {"job_id": job_id})
+                return
+            job = job_service.wait_for_change(job_id, since,
+                                              timeout=min(remaining, settings.JOBS_SSE_KEEPALIVE_SECONDS))
+            if job is None:
+                yield sse_event("error", {"job_id": job_id, "error": "Job tidak ditemukan."})
+                return
+            if job["updated_at"] > since:
+                since = job["updated_at"]
+                yield sse_event("status", _job_view(job))
+                if job["status"] in FINAL_STATUSES:
+                    return
+            else:
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype=SSE_MIMETYPE, headers=SSE_HEADERS)
@@ -1,12 +1,11 @@
 import logging
-import os
 
-import numpy as np
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 
 from ..services.ner_service import NERService, NERError
 from ..services.ocr_service import OCRService, OCRError
-from ..utils.file_handler import save_uploaded_file
+from ..utils.file_handler import read_uploaded_file
+from ..utils.streaming import SSE_HEADERS, SSE_MIMETYPE, sse_event
 
 logger = logging.getLogger(__name__)
 ner_bp = Blueprint('ner_bp', __name__)
@@ -23,25 +22,6 @@ def init_ner_services(ocr_svc_instance: OCRService,
     ner_service = ner_svc_instance
 
 
-def sanitize_for_json(data):
-    """
-    Mengubah tipe data NumPy yang tidak bisa di-serialize menjadi tipe data Python standar.
-    """
-    if isinstance(data, (np.int_, np.intc, np.intp, np.int8,
-                         np.int16, np.int32, np.int64, np.uint8,
-                         np.uint16, np.uint32, np.uint64)):
-        return int(data)
-    elif isinstance(data, (np.float16, np.float32, np.float64)):
-        return float(data)
-    elif isinstance(data, (np.ndarray,)):
-        return data.tolist()
-    elif isinstance(data, dict):
-        return {k: sanitize_for_json(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_for_json(v) for v in data]
-    return data
-
-
 @ner_bp.route('extract-entities', methods=['POST'])
 def extract_entities_endpoint():
     """
@@ -55,26 +35,24 @@ def extract_entities_endpoint():
         return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
 
     file = request.files['file']
-    file_path, error = save_uploaded_file(file)
+    file_data, file_name, error = read_uploaded_file(file)
     if error:
         return jsonify({"error": error}), 500
 
     try:
         logger.info(f"Memulai pipeline OCR untuk file: {file.filename}")
-        ocr_result = ocr_service.extract_text_from_file(file_path)
+        ocr_result = ocr_service.extract_text_from_bytes(file_data, file_name)
 
         text_for_ner = ocr_result.get("text_for_ner")
 
         logger.info("Memulai ekstraksi entitas pada teks hasil OCR...")
         entities = ner_service.predict_entities_text(text_for_ner)
 
-        sanitized_entities = sanitize_for_json(entities)
-
-        # Format respons JSON
+        # Format respons JSON; skor NumPy di-serialize oleh provider JSON aplikasi
         return jsonify({
             'data': {
                 "file_name": ocr_result.get("file_name"),
-                "entities": sanitized_entities
+                "entities": entities
             }
         }), 200
 
@@ -87,10 +65,51 @@ def extract_entities_endpoint():
     except Exception as e:
         logger.critical(f"Terjadi error internal server yang tidak terduga: {e}", exc_info=True)
         return jsonify({"error": "Terjadi kesalahan internal pada server."}), 500
-    finally:
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                logger.info(f"File sementara berhasil dihapus: {file_path}")
-            except OSError as e:
-                logger.error(f"Gagal menghapus file sementara: {file_path}. Error: {e}")
+
+
+@ner_bp.route('extract-entities/stream', methods=['POST'])
+def extract_entities_stream_endpoint():
+    """
+    Varian streaming dari /extract-entities (server-sent events). Setiap halaman di-OCR lalu
+    langsung diproses NER dan dikirim sebagai event "page" berisi teks dan entitas halaman
+    tersebut (offset start/end relatif terhadap teks halaman). Event "done" menutup stream.
+    """
+    if ocr_service is None or ner_service is None:
+        logger.error("Satu atau lebih service belum diinisialisasi.")
+        return jsonify({"error": "Layanan tidak tersedia saat ini."}), 503
+
+    if 'file' not in request.files:
+        return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
+
+    file = request.files['file']
+    file_data, file_name, error = read_uploaded_file(file)
+    if error:
+        return jsonify({"error": error}), 500
+
+    def generate():
+        try:
+            for event in ocr_service.iter_extract_text_from_bytes(file_data, file_name):
+                if event["event"] == "page":
+                    entities = ner_service.predict_entities_text(event["text_for_ner"])
+                    yield sse_event("page", {
+                        "page": event["page"],
+                        "text": event["text_for_ner"],
+                        "entities": entities
+                    })
+                else:
+                    result = event["result"]
+                    yield sse_event("done", {
+                        "file_name": result.get("file_name"),
+                        "page_count": result.get("page_count")
+                    })
+        except OCRError as e:
+            logger.error(f"Terjadi error OCR: {e}", exc_info=True)
+            yield sse_event("error", {"error": f"Gagal saat ekstraksi teks: {e}"})
+        except NERError as e:
+            logger.error(f"Terjadi error NER: {e}", exc_info=True)
+            yield sse_event("error", {"error": f"Gagal saat ekstraksi entitas: {e}"})
+        except Exception as e:
+            logger.critical(f"Terjadi error internal server yang tidak terduga: {e}", exc_info=True)
+            yield sse_event("error", {"error": "Terjadi kesalahan internal pada server."})
+
+    return Response(stream_with_context(generate()), mimetype=SSE_MIMETYPE, headers=SSE_HEADERS)
@@ -1,9 +1,9 @@
 import logging
-import os
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from ..services.ocr_service import OCRService, TesseractNotFoundError, OCRError
-from ..utils.file_handler import save_uploaded_file
+from ..utils.file_handler import read_uploaded_file
+from ..utils.streaming import SSE_HEADERS, SSE_MIMETYPE, sse_event
 
 logger = logging.getLogger(__name__)
 ocr_bp = Blueprint('ocr_bp', __name__)
@@ -31,23 +31,22 @@ def extract_text_endpoint():
         return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
 
     file = request.files['file']
-    file_path, error = save_uploaded_file(file)
+    file_data, file_name, error = read_uploaded_file(file)
     if error:
         return jsonify({"error": error}), 500
 
     try:
         # Panggil service untuk melakukan pekerjaan berat
-        result = ocr_service.extract_text_from_file(file_path)
+        result = ocr_service.extract_text_from_bytes(file_data, file_name)
         return jsonify({
             'data': {
                 "file_name": result.get("file_name"),
-                'text': result.get('text_for_ner')
+                'text': result.get('text_for_ner'),
+                'pages': result.get('pages'),
+                'preprocess_routes': result.get('preprocess_routes')
             }
         }), 200
 
-    except FileNotFoundError as e:
-        logger.warning(f"File tidak ditemukan selama proses: {e}")
-        return jsonify({"error": "File tidak dapat ditemukan di server setelah diunggah."}), 404
     except OCRError as e:
         # Menangkap semua error spesifik dari service OCR
         logger.error(f"Terjadi error OCR yang terkendali: {e}", exc_info=True)
@@ -56,11 +55,50 @@ def extract_text_endpoint():
         # Menangkap semua error tak terduga lainnya
         logger.critical(f"Terjadi error internal server yang tidak terduga: {e}", exc_info=True)
         return jsonify({"error": "Terjadi kesalahan internal pada server."}), 500
-    finally:
-        # Bagian ini sangat penting: selalu hapus file sementara setelah selesai
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                logger.info(f"File sementara berhasil dihapus: {file_path}")
-            except OSError as e:
-                logger.error(f"Gagal menghapus file sementara: {file_path}. Error: {e}")
\ No newline at end of file
+
+
+@ocr_bp.route('/extract-text/stream', methods=['POST'])
+def extract_text_stream_endpoint():
+    """
+    Varian streaming dari /extract-text (server-sent events). Setiap halaman dikirim sebagai
+    event "page" segera setelah selesai di-OCR, lalu event "done" berisi hasil dokumen yang
+    sama dengan /extract-text. Karena memakai POST, klien membaca stream lewat fetch, bukan EventSource.
+    """
+    if ocr_service is None:
+        logger.error("OCRService belum diinisialisasi.")
+        return jsonify({"error": "Layanan OCR tidak tersedia."}), 503
+
+    if 'file' not in request.files:
+        return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
+
+    file = request.files['file']
+    file_data, file_name, error = read_uploaded_file(file)
+    if error:
+        return jsonify({"error": error}), 500
+
+    def generate():
+        try:
+            for event in ocr_service.iter_extract_text_from_bytes(file_data, file_name):
+                if event["event"] == "page":
+                    yield sse_event("page", {
+                        "page": event["page"],
+                        "source": event["source"],
+                        "text": event["text_for_ner"],
+                        "info": event["info"]
+                    })
+                else:
+                    result = event["result"]
+                    yield sse_event("done", {
+                        "file_name": result.get("file_name"),
+                        "text": result.get("text_for_ner"),
+                        "pages": result.get("pages"),
+                        "preprocess_routes": result.get("preprocess_routes")
+                    })
+        except OCRError as e:
+            logger.error(f"Terjadi error OCR yang terkendali: {e}", exc_info=True)
+            yield sse_event("error", {"error": "terjadi error"})
+        except Exception as e:
+            logger.critical(f"Terjadi error internal server yang tidak terduga: {e}", exc_info=True)
+            yield sse_event("error", {"error": "Terjadi kesalahan internal pada server."})
+
+    return Response(stream_with_context(generate()), mimetype=SSE_MIMETYPE, headers=SSE_HEADERS)
@@ -0,0 +1,91 @@
+import logging
+
+from flask import Blueprint, request, jsonify
+
+from ..services.classifier_service import ClassifierError
+from ..services.ner_service import NERError
+from ..services.ocr_service import OCRError
+from ..services.pipeline_service import DocumentPipelineService, UnknownStageError, STAGES, resolve_stages
+from ..utils.file_handler import read_uploaded_file
+
+logger = logging.getLogger(__name__)
+pipeline_bp = Blueprint('pipeline_bp', __name__)
+
+pipeline_service: DocumentPipelineService = None
+
+
+def init_pipeline_services(pipeline_svc_instance: DocumentPipelineService):
+    """Fungsi helper untuk menerima instance service yang sudah dibuat."""
+    global pipeline_service
+    pipeline_service = pipeline_svc_instance
+
+
+def _stage_response(results: dict, requested: tuple) -> dict:
+    """Menyusun respons hanya untuk tahap yang diminta; tahap dependensi tidak ikut dikirim."""
+    ocr_result = results["ocr"]
+    data = {"file_name": ocr_result.get("file_name"), "stages": list(requested)}
+    if "ocr" in requested:
+        data["ocr"] = {
+            "text": ocr_result.get("text_for_ner"),
+            "page_count": ocr_result.get("page_count"),
+            "pages": ocr_result.get("pages"),
+            "preprocess_routes": ocr_result.get("preprocess_routes")
+        }
+    if "classify" in requested:
+        data["classification"] = results["classify"]
+    if "ner" in requested:
+        data["entities"] = results["ner"]
+    if "extract" in requested:
+        data["information"] = results["extract"]
+    return data
+
+
+@pipeline_bp.route('process', methods=['POST'])
+def process_endpoint():
+    """
+    Endpoint pipeline terpadu. Parameter `stages` (query atau form, dipisah koma) memilih tahap
+    dari ocr, classify, ner, extract; default semua tahap. OCR dijalankan sekali untuk semua
+    tahap, dependensi ditambahkan otomatis, dan model yang tidak dibutuhkan tidak dipanggil.
+    Respons hanya memuat hasil tahap yang diminta.
+    """
+    if pipeline_service is None:
+        logger.error("DocumentPipelineService belum diinisialisasi.")
+        return jsonify({"error": "Layanan tidak tersedia saat ini."}), 503
+
+    stages_param = request.values.get('stages') or ",".join(STAGES)
+    requested = [stage.strip().lower() for stage in stages_param.split(",") if stage.strip()]
+    if not requested:
+        return jsonify({"error": f"Parameter 'stages' tidak memuat tahap apa pun. "
+                                 f"Pilihan: {', '.join(STAGES)}."}), 400
+    try:
+        # Validasi sebelum file dibaca; urutan kanonis dipakai untuk respons.
+        requested = tuple(stage for stage in resolve_stages(requested) if stage in requested)
+    except UnknownStageError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if 'file' not in request.files:
+        return jsonify({"error": "Request harus menyertakan bagian 'file'."}), 400
+
+    file = request.files['file']
+    file_data, file_name, error = read_uploaded_file(file)
+    if error:
+        return jsonify({"error": error}), 500
+
+    try:
+        results = pipeline_service.run_stages(file_data, file_name, requested)
+        return jsonify({
+            'data': _stage_response(results, requested)
+        }), 200
+
+    except OCRError as e:
+        logger.error(f"Terjadi error OCR: {e}", exc_info=True)
+        return jsonify({"error": f"Gagal saat ekstraksi teks: {e}"}), 500
+    except ClassifierError as e:
+        logger.error(f"Terjadi error klasifikasi: {e}", exc_info=True)
+        return jsonify({"error": f"Gagal saat klasifikasi: {e}"}), 500
+    except NERError as e:
+        logger.error(f"Terjadi error NER: {e}", exc_info=True)
+        return jsonify({"error": f"Gagal saat ekstraksi entitas: {e}"}), 500
+    except Exception as e:
+        logger.critical(f"Terjadi error internal server yang tidak terduga: {e}", exc_info=True)
+        return jsonify({"error": "Terjadi kesalahan internal pada server."}), 500
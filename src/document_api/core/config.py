@@ -11,17 +11,111 @@ class Settings:
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     # Tentukan folder debug relatif terhadap root proyek
     DEBUG_FILE: str = os.path.join(BASE_DIR, os.getenv("DEBUG_FILE", "debug"))
+    # Gambar debug ditulis oleh thread latar belakang. Mode sampling: "all", "sample"
+    # (1 dari DEBUG_SAMPLE_RATE request), atau "error" (hanya halaman yang gagal diproses).
+    DEBUG_SAMPLE_MODE: str = os.getenv("DEBUG_SAMPLE_MODE", "all").lower()
+    DEBUG_SAMPLE_RATE: int = int(os.getenv("DEBUG_SAMPLE_RATE", "1"))
+    DEBUG_DISK_BUDGET_MB: int = int(os.getenv("DEBUG_DISK_BUDGET_MB", "1024"))
+    DEBUG_QUEUE_SIZE: int = int(os.getenv("DEBUG_QUEUE_SIZE", "64"))
+    DEBUG_PENDING_MAX_MB: int = int(os.getenv("DEBUG_PENDING_MAX_MB", "256"))
     LEFT_LOGO_BOX_RELATIVE: Tuple[int, int, int, int] = (0.0313, 0.1667, 0.0369, 0.1363)  # (80, 425, 122, 450)
     RIGHT_LOGO_BOX_RELATIVE: Tuple[int, int, int, int] = (0.0313, 0.1667, 0.6439, 0.7293)  # (80, 425, 2125, 2407)
     TESSERACT_PATH = os.getenv("TESSERACT_PATH")
+    # Backend OCR: "auto" (tesserocr jika terinstal), "tesserocr", atau "pytesseract"
+    OCR_ENGINE: str = os.getenv("OCR_ENGINE", "auto")
+    OCR_TESSDATA_PATH = os.getenv("OCR_TESSDATA_PATH")
+    # Jumlah maksimum handle tesserocr per PSM (dipinjam per halaman lintas thread). 0 = jumlah core CPU
+    OCR_TESSEROCR_MAX_HANDLES: int = int(os.getenv("OCR_TESSEROCR_MAX_HANDLES", "0"))
     POPPLER_PATH = os.getenv("POPPLER_PATH")
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads_for_ocr/")
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf', 'bmp', 'tiff'}
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf', 'bmp', 'tif', 'tiff'}
     CLASSIFY_MODEL = os.getenv("CLASSIFY_MODEL", "marcyovian/indobert-church-document-classification")
     NER_MODEL = os.getenv("NER_MODEL", "marcyovian/indobert-church-extraction-document")
+    # Backend inferensi model: "transformers" (bobot full-precision) atau "onnx" (ONNX Runtime via
+    # optimum, diekspor sekali ke ONNX_CACHE_DIR; opsional kuantisasi int8 dinamis)
+    MODEL_BACKEND: str = os.getenv("MODEL_BACKEND", "transformers").lower()
+    ONNX_CACHE_DIR: str = os.path.join(BASE_DIR, os.getenv("ONNX_CACHE_DIR", "models/onnx"))
+    ONNX_QUANTIZE: bool = os.getenv("ONNX_QUANTIZE", "true").lower() == "true"
+    # Set instruksi target kuantisasi: avx2, avx512, avx512_vnni, atau arm64
+    ONNX_QUANTIZATION_TARGET: str = os.getenv("ONNX_QUANTIZATION_TARGET", "avx2").lower()
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))
+    # Micro-batching klasifikasi: panggilan bersamaan dikumpulkan paling lama CLASSIFY_BATCH_WAIT_MS
+    # atau sampai CLASSIFY_BATCH_MAX_SIZE teks, lalu diprediksi sebagai satu batch. 1 = nonaktif
+    CLASSIFY_BATCH_MAX_SIZE: int = int(os.getenv("CLASSIFY_BATCH_MAX_SIZE", "8"))
+    CLASSIFY_BATCH_WAIT_MS: float = float(os.getenv("CLASSIFY_BATCH_WAIT_MS", "10"))
+    # Micro-batching NER: dokumen bersamaan (maks. NER_BATCH_MAX_SIZE, jendela NER_BATCH_WAIT_MS)
+    # dipecah menjadi segmen <= NER_SEGMENT_MAX_TOKENS token, dikelompokkan per bucket panjang, lalu
+    # diprediksi maks. NER_FORWARD_BATCH_SIZE segmen per forward pass. NER_BATCH_MAX_SIZE=1 = nonaktif
+    NER_BATCH_MAX_SIZE: int = int(os.getenv("NER_BATCH_MAX_SIZE", "8"))
+    NER_BATCH_WAIT_MS: float = float(os.getenv("NER_BATCH_WAIT_MS", "10"))
+    NER_FORWARD_BATCH_SIZE: int = int(os.getenv("NER_FORWARD_BATCH_SIZE", "8"))
+    NER_SEGMENT_MAX_TOKENS: int = int(os.getenv("NER_SEGMENT_MAX_TOKENS", "512"))
     ROBOFLOW_API_URL = os.getenv('ROBOFLOW_API_URL')
     ROBOFLOW_API_KEY = os.getenv('ROBOFLOW_API_KEY')
     ROBOFLOW_PROJECT_ID = os.getenv('ROBOFLOW_PROJECT_ID')
+    # Resolusi render PDF dan jumlah halaman yang dirender sekaligus (jendela streaming)
+    OCR_PDF_DPI: int = int(os.getenv("OCR_PDF_DPI", "300"))
+    OCR_PAGE_WINDOW: int = int(os.getenv("OCR_PAGE_WINDOW", "4"))
+    # Format raster render PDF: "color", "gray" (grayscale langsung dari Poppler, tanpa penghapusan
+    # stempel), atau "auto" (pre-render warna OCR_RENDER_PROBE_DPI menentukan per halaman)
+    OCR_RENDER_COLOR_MODE: str = os.getenv("OCR_RENDER_COLOR_MODE", "auto").lower()
+    OCR_RENDER_PROBE_DPI: int = int(os.getenv("OCR_RENDER_PROBE_DPI", "75"))
+    # Target resolusi upload gambar (estimasi terhadap halaman A4); foto lebih besar diperkecil. 0 = nonaktif
+    OCR_IMAGE_TARGET_DPI: int = int(os.getenv("OCR_IMAGE_TARGET_DPI", "300"))
+    # Mode eksekusi OCR per halaman: "sequential" atau "process" (process pool lintas core CPU)
+    OCR_EXECUTION_MODE: str = os.getenv("OCR_EXECUTION_MODE", "sequential")
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", "0"))  # 0 = jumlah core CPU
+    OCR_MP_START_METHOD: str = os.getenv("OCR_MP_START_METHOD", "spawn")
+    # Pakai text layer bawaan PDF (tanpa OCR) jika halaman memiliki cukup teks yang terbaca
+    OCR_USE_TEXT_LAYER: bool = os.getenv("OCR_USE_TEXT_LAYER", "true").lower() == "true"
+    OCR_TEXT_LAYER_MIN_CHARS: int = int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS", "50"))
+    # Cache hasil OCR berbasis SHA-256 isi file. Naikkan OCR_PIPELINE_VERSION setiap kali
+    # logika pra/pasca-pemrosesan berubah agar hasil lama tidak dipakai lagi.
+    OCR_PIPELINE_VERSION: str = os.getenv("OCR_PIPELINE_VERSION", "1")
+    OCR_CACHE_ENABLED: bool = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+    OCR_CACHE_MEMORY_MB: int = int(os.getenv("OCR_CACHE_MEMORY_MB", "64"))
+    OCR_CACHE_DIR: str = os.getenv("OCR_CACHE_DIR", "")  # Kosong = tier disk nonaktif
+    OCR_CACHE_DISK_MB: int = int(os.getenv("OCR_CACHE_DISK_MB", "512"))
+    OCR_CACHE_TTL_SECONDS: int = int(os.getenv("OCR_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    # Cache per halaman (hash raster): revisi dokumen hanya meng-OCR halaman yang berubah
+    OCR_PAGE_CACHE_ENABLED: bool = os.getenv("OCR_PAGE_CACHE_ENABLED", "true").lower() == "true"
+    OCR_PAGE_CACHE_MEMORY_MB: int = int(os.getenv("OCR_PAGE_CACHE_MEMORY_MB", "32"))
+    # Mesin deteksi garis tabel: "downsample" (cepat) atau "morphology" (morfologi resolusi penuh)
+    TABLE_LINE_ENGINE: str = os.getenv("TABLE_LINE_ENGINE", "downsample").lower()
+    # Probe karakteristik halaman untuk memilih jalur pra-pemrosesan termurah
+    # (stamp_removal / grayscale / bilevel). Rasio dihitung dari sampel halaman.
+    OCR_PREPROCESS_ROUTING: bool = os.getenv("OCR_PREPROCESS_ROUTING", "true").lower() == "true"
+    OCR_PROBE_MAX_SIDE: int = int(os.getenv("OCR_PROBE_MAX_SIDE", "600"))
+    OCR_PROBE_COLOR_MIN_RATIO: float = float(os.getenv("OCR_PROBE_COLOR_MIN_RATIO", "0.0002"))
+    OCR_PROBE_BILEVEL_MIN_RATIO: float = float(os.getenv("OCR_PROBE_BILEVEL_MIN_RATIO", "0.999"))
+    # Endpoint batch: jumlah dokumen yang diproses bersamaan, batas dokumen per batch, dan
+    # batas ukuran satu file di dalam arsip ZIP (diperiksa sebelum didekompresi)
+    BATCH_WORKERS: int = int(os.getenv("BATCH_WORKERS", "4"))
+    BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", "500"))
+    BATCH_MAX_FILE_MB: int = int(os.getenv("BATCH_MAX_FILE_MB", "50"))
+    # Job asinkron (/documents/jobs): database SQLite lokal, jumlah thread worker, interval polling
+    # antrean, retensi job selesai, serta durasi maksimum dan interval keep-alive stream SSE
+    JOBS_DB_PATH: str = os.path.join(BASE_DIR, os.getenv("JOBS_DB_PATH", "jobs/jobs.sqlite3"))
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_POLL_SECONDS: float = float(os.getenv("JOBS_POLL_SECONDS", "1.0"))
+    JOBS_MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    JOBS_RETENTION_HOURS: int = int(os.getenv("JOBS_RETENTION_HOURS", "24"))
+    JOBS_SSE_TIMEOUT_SECONDS: int = int(os.getenv("JOBS_SSE_TIMEOUT_SECONDS", "900"))
+    JOBS_SSE_KEEPALIVE_SECONDS: int = int(os.getenv("JOBS_SSE_KEEPALIVE_SECONDS", "15"))
+    # Kompresi respons JSON (br jika paket brotli terinstal, selain itu gzip) sesuai
+    # Accept-Encoding klien; respons streaming dan respons kecil tidak dikompresi
+    RESPONSE_COMPRESSION: bool = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_COMPRESSION_LEVEL: int = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "5"))
+    # Server produksi (gunicorn.conf.py): model dimuat sekali di proses master lalu di-fork ke
+    # SERVER_WORKERS proses, masing-masing dengan SERVER_THREADS thread request.
+    # SERVER_INFERENCE_THREADS = thread intra-op model per worker (0 = core CPU dibagi jumlah worker)
+    SERVER_BIND: str = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))  # 0 = jumlah core CPU
+    SERVER_THREADS: int = int(os.getenv("SERVER_THREADS", "4"))
+    SERVER_INFERENCE_THREADS: int = int(os.getenv("SERVER_INFERENCE_THREADS", "0"))
+    SERVER_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_TIMEOUT_SECONDS", "300"))
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", "0"))  # 0 = worker tidak pernah didaur ulang
 
 
 settings = Settings()
\ No newline at end of file
@@ -1,9 +1,11 @@
 import logging
 from typing import List, Dict, Any
 
-from transformers import pipeline, Pipeline
+from transformers import Pipeline
 
 from ..core.config import settings
+from ..utils.micro_batcher import MicroBatcher
+from ..utils.model_loader import load_pipeline
 
 
 class ClassifierError(Exception):
@@ -31,17 +33,32 @@ class TextClassifierService:
         try:
             logger.info(f"Mencoba memuat model klasifikasi: {self.model_name}...")
             model_path = settings.CLASSIFY_MODEL
-            self.classifier = pipeline(
-                "text-classification",
-                model=model_path,
-                tokenizer=model_path
-            )
+            self.classifier = load_pipeline("text-classification", model_path)
 
             logger.info(f"Model klasifikasi '{settings.CLASSIFY_MODEL}' berhasil dimuat.")
         except Exception as e:
             logger.critical(f"Gagal memuat model klasifikasi '{self.model_name}'. Error: {e}", exc_info=True)
             raise ModelLoadError(f"Gagal memuat model klasifikasi: {e}")
 
+        # Panggilan bersamaan dari beberapa request digabung menjadi satu forward pass ber-padding.
+        self.batcher: MicroBatcher = None
+        if settings.CLASSIFY_BATCH_MAX_SIZE > 1:
+            self.batcher = MicroBatcher(
+                self._classify_batch,
+                max_batch_size=settings.CLASSIFY_BATCH_MAX_SIZE,
+                max_wait_ms=settings.CLASSIFY_BATCH_WAIT_MS,
+                name="classifier-batcher"
+            )
+
+    def _classify_batch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """Menjalankan pipeline sekali untuk beberapa teks; hasil per teks berformat sama seperti classify_text."""
+        results = self.classifier(texts, truncation=True, batch_size=len(texts))
+        return [result if isinstance(result, list) else [result] for result in results]
+
+    def batch_stats(self) -> Dict[str, Any]:
+        """Counter micro-batching klasifikasi (kosong jika batching dimatikan)."""
+        return self.batcher.stats() if self.batcher is not None else {}
+
     def classify_text(self, text: str) -> List[Dict[str, Any]]:
         """
         Melakukan klasifikasi pada sebuah teks.
@@ -65,7 +82,10 @@ class TextClassifierService:
 
         try:
             logger.info("Melakukan prediksi klasifikasi...")
-            result = self.classifier(text, truncation=True)
+            if self.batcher is not None:
+                result = self.batcher.submit(text)
+            else:
+                result = self.classifier(text, truncation=True)
             logger.info(f"Prediksi berhasil: {result}")
             return result
         except Exception as e:
@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from .pipeline_service import DocumentPipelineService
+from .classifier_service import ClassifierError
+from .ner_service import NERError
+from .ocr_service import OCRError
+from ..core.config import settings
+from ..utils.json_provider import numpy_default
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+FINAL_STATUSES = (JOB_DONE, JOB_FAILED)
+
+
+class JobError(Exception):
+    """Base exception class untuk semua error terkait job asinkron."""
+    pass
+
+
+class JobStore:
+    """
+    Penyimpanan job berbasis SQLite (file lokal, tanpa layanan eksternal). Isi file upload
+    disimpan sebagai BLOB sampai job selesai, sehingga job yang belum selesai bisa dijalankan
+    ulang setelah restart. Setiap thread memakai koneksinya sendiri; mode WAL membuat
+    pembacaan status tidak menunggu penulisan hasil.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    payload BLOB,
+                    result TEXT,
+                    error TEXT,
+                    worker_pid INTEGER,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:  # Database dari versi sebelum batas percobaan
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def create(self, data: bytes, file_name: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, file_name, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, file_name, sqlite3.Binary(data), now, now))
+        return job_id
+
+    def claim_next(self) -> Optional[sqlite3.Row]:
+        """
+        Mengambil job antrean tertua dan menandainya "running" secara atomik (BEGIN IMMEDIATE),
+        sehingga beberapa proses aplikasi yang berbagi file database tidak menjalankan job yang sama.
+        Setiap pengambilan menambah `attempts`.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id, file_name, payload FROM jobs WHERE status = ? "
+                               "ORDER BY created_at LIMIT 1", (JOB_QUEUED,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = ?, worker_pid = ?, attempts = attempts + 1, updated_at = ? "
+                             "WHERE id = ?",
+                             (JOB_RUNNING, os.getpid(), time.time(), row["id"]))
+            conn.execute("COMMIT")
+            return row
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def finish(self, job_id: str, result: Any = None, error: str = None):
+        """Menyimpan hasil atau error job dan membuang payload yang sudah tidak diperlukan."""
+        status = JOB_FAILED if error is not None else JOB_DONE
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, updated_at = ? WHERE id = ?",
+            (status, None if result is None else json.dumps(result, default=numpy_default), error, time.time(), job_id))
+
+    def requeue_interrupted(self, max_attempts: int) -> Tuple[int, int]:
+        """
+        Mengembalikan job "running" milik proses yang sudah tidak hidup (mis. server restart
+        di tengah job) ke antrean. Payload masih tersimpan, jadi job dijalankan ulang dari awal.
+        Job yang sudah diambil `max_attempts` kali ditandai gagal, agar dokumen yang selalu
+        mematikan worker (mis. kehabisan memori) tidak diulang tanpa batas.
+
+        Returns:
+            (jumlah job yang diantrekan ulang, jumlah job yang ditandai gagal)
+        """
+        conn = self._connect()
+        rows = conn.execute("SELECT id, worker_pid, attempts FROM jobs WHERE status = ?", (JOB_RUNNING,)).fetchall()
+        requeued, failed = 0, 0
+        for row in rows:
+            if _pid_alive(row["worker_pid"]):
+                continue
+            if row["attempts"] >= max_attempts:
+                error = (f"Job dihentikan setelah {row['attempts']} kali percobaan: proses worker "
+                         f"berhenti di tengah pemrosesan.")
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, payload = NULL, worker_pid = NULL, updated_at = ? "
+                    "WHERE id = ? AND status = ?", (JOB_FAILED, error, time.time(), row["id"], JOB_RUNNING))
+                failed += cursor.rowcount
+            else:
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = ?, worker_pid = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                    (JOB_QUEUED, time.time(), row["id"], JOB_RUNNING))
+                requeued += cursor.rowcount
+        return requeued, failed
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Menghapus job selesai/gagal yang lebih lama dari batas retensi."""
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (JOB_DONE, JOB_FAILED, time.time() - older_than_seconds))
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status job tanpa payload. Hasil di-decode dari JSON; None jika job tidak dikenal."""
+        row = self._connect().execute(
+            "SELECT id, status, file_name, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def count_by_status(self) -> Dict[str, int]:
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid or pid == os.getpid():
+        # Job "running" milik proses ini saat start berarti sisa dari proses lama dengan pid sama.
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobService:
+    """
+    Menjalankan pipeline dokumen (DocumentPipelineService.process_document) secara asinkron.
+    POST cukup menyimpan job ke JobStore; thread worker lokal mengambil job dari antrean
+    SQLite dan menyimpan hasilnya, dan klien membaca status lewat polling atau SSE.
+    """
+
+    def __init__(self, pipeline_service: DocumentPipelineService, store: JobStore = None,
+                 workers: int = None):
+        """
+        Args:
+            pipeline_service: Pipeline yang dijalankan untuk setiap job.
+            store: JobStore (default: SQLite di settings.JOBS_DB_PATH).
+            workers: Jumlah thread worker (default dari settings.JOBS_WORKERS).
+        """
+        self.pipeline_service = pipeline_service
+        self.store = store or JobStore(settings.JOBS_DB_PATH)
+        self.workers = max(1, workers or settings.JOBS_WORKERS)
+
+        # Worker dibangunkan lewat condition saat ada job baru atau status berubah; polling
+        # berkala tetap dipakai agar job yang dibuat proses lain ikut terambil.
+        self._changed = threading.Condition()
+        self._threads = []
+        self._threads_pid: int = None
+        self._stopping = False
+        logger.info(f"JobService diinisialisasi (database: {self.store.db_path}, worker: {self.workers}).")
+
+    def ensure_workers(self):
+        """
+        Menyalakan thread worker secara lazy pada proses yang benar-benar melayani request
+        (thread tidak ikut terwariskan setelah fork). Saat start, job yang terputus diantrekan ulang.
+        """
+        if self._threads_pid == os.getpid():
+            return
+        with self._changed:
+            if self._threads_pid == os.getpid():
+                return
+            requeued, failed = self.store.requeue_interrupted(max(1, settings.JOBS_MAX_ATTEMPTS))
+            if requeued:
+                logger.warning(f"{requeued} job yang terputus dikembalikan ke antrean.")
+            if failed:
+                logger.error(f"{failed} job yang terputus ditandai gagal setelah mencapai "
+                             f"JOBS_MAX_ATTEMPTS ({settings.JOBS_MAX_ATTEMPTS}).")
+            self._stopping = False
+            self._threads = [threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                             for i in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+            self._threads_pid = os.getpid()
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _worker_loop(self):
+        last_purge = 0.0
+        while not self._stopping:
+            if time.monotonic() - last_purge > 3600:
+                last_purge = time.monotonic()
+                try:
+                    purged = self.store.purge_finished(settings.JOBS_RETENTION_HOURS * 3600)
+                except sqlite3.Error as e:
+                    logger.error(f"Gagal menghapus job lama: {e}", exc_info=True)
+                    purged = 0
+                if purged:
+                    logger.info(f"{purged} job lama dihapus dari penyimpanan job.")
+            try:
+                job = self.store.claim_next()
+            except sqlite3.Error as e:
+                logger.error(f"Gagal mengambil job dari antrean: {e}", exc_info=True)
+                job = None
+            if job is None:
+                with self._changed:
+                    self._changed.wait(timeout=settings.JOBS_POLL_SECONDS)
+                continue
+            self._notify()
+            self._run(job["id"], job["file_name"], bytes(job["payload"]))
+
+    def _run(self, job_id: str, file_name: str, data: bytes):
+        logger.info(f"Job {job_id} dimulai untuk file: {file_name}")
+        result, error = None, None
+        try:
+            result = self.pipeline_service.process_document(data, file_name)
+        except OCRError as e:
+            logger.error(f"Job {job_id}: error OCR: {e}", exc_info=True)
+            error = f"Gagal saat ekstraksi teks: {e}"
+        except ClassifierError as e:
+            logger.error(f"Job {job_id}: error klasifikasi: {e}", exc_info=True)
+            error = f"Gagal saat klasifikasi: {e}"
+        except NERError as e:
+            logger.error(f"Job {job_id}: error NER: {e}", exc_info=True)
+            error = f"Gagal saat ekstraksi entitas: {e}"
+        except Exception as e:
+            logger.critical(f"Job {job_id}: error tak terduga: {e}", exc_info=True)
+            error = "Terjadi kesalahan internal pada server."
+        try:
+            self.store.finish(job_id, result=result, error=error)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"Job {job_id}: hasil gagal disimpan: {e}", exc_info=True)
+            try:
+                self.store.finish(job_id, error="Hasil job gagal disimpan.")
+            except sqlite3.Error as retry_error:
+                # Job tetap "running"; requeue_interrupted menanganinya setelah proses ini berhenti.
+                logger.error(f"Job {job_id}: status gagal juga tidak bisa disimpan: {retry_error}", exc_info=True)
+        logger.info(f"Job {job_id} selesai dengan status {JOB_FAILED if error else JOB_DONE}.")
+        self._notify()
+
+    def submit(self, data: bytes, file_name: str) -> str:
+        """Menyimpan job baru ke antrean dan mengembalikan id-nya tanpa menunggu pemrosesan."""
+        self.ensure_workers()
+        try:
+            job_id = self.store.create(data, file_name)
+        except sqlite3.Error as e:
+            logger.error(f"Gagal menyimpan job untuk {file_name}: {e}", exc_info=True)
+            raise JobError(f"Gagal menyimpan job: {e}")
+        self._notify()
+        logger.info(f"Job {job_id} diantrekan untuk file: {file_name}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status dan hasil job; None jika job tidak dikenal (atau sudah melewati retensi)."""
+        self.ensure_workers()
+        return self.store.get(job_id)
+
+    def wait_for_change(self, job_id: str, since: float, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Menunggu hingga job berubah setelah `since` (updated_at) atau timeout, lalu mengembalikan
+        status terbaru. Dipakai endpoint SSE; perubahan dari proses lain terlihat lewat polling.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["updated_at"] > since or job["status"] in FINAL_STATUSES:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(timeout=min(remaining, settings.JOBS_POLL_SECONDS))
+
+    def stats(self) -> Dict[str, int]:
+        """Jumlah job per status, untuk /metrics."""
+        return self.store.count_by_status()
+
+    def close(self):
+        """Menghentikan thread worker (job yang sedang berjalan diselesaikan lebih dulu)."""
+        self._stopping = True
+        self._notify()
+        if self._threads_pid == os.getpid():
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+        self._threads_pid = None
@@ -1,7 +1,12 @@
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Tuple
 
-from transformers import Pipeline, pipeline
+from transformers import Pipeline
+
+from ..core.config import settings
+from ..utils.micro_batcher import MicroBatcher
+from ..utils.model_loader import load_pipeline
 
 
 class NERError(Exception):
@@ -17,6 +22,9 @@ class ModelLoadError(NERError):
 # --- Logger ---
 logger = logging.getLogger(__name__)
 
+# Satu segmen teks dokumen: (offset karakter awal di teks dokumen, teks segmen, jumlah token)
+Segment = Tuple[int, str, int]
+
 
 class NERService:
     """
@@ -34,10 +42,9 @@ class NERService:
         self.ner_pipeline: Pipeline = None
         try:
             logger.info(f"Mencoba memuat model NER: {self.model_name}...")
-            self.ner_pipeline = pipeline(
+            self.ner_pipeline = load_pipeline(
                 "ner",
-                model=self.model_name,
-                tokenizer=self.model_name,
+                self.model_name,
                 aggregation_strategy="first"
             )
             logger.info(f"Model NER '{self.model_name}' berhasil dimuat.")
@@ -45,6 +52,113 @@ class NERService:
             logger.critical(f"Gagal memuat model NER '{self.model_name}'. Error: {e}", exc_info=True)
             raise ModelLoadError(f"Gagal memuat model NER: {e}")
 
+        # Segmen dari dokumen-dokumen yang diproses bersamaan digabung ke batch yang sama.
+        self.batcher: MicroBatcher = None
+        if settings.NER_BATCH_MAX_SIZE > 1:
+            self.batcher = MicroBatcher(
+                self._predict_documents,
+                max_batch_size=settings.NER_BATCH_MAX_SIZE,
+                max_wait_ms=settings.NER_BATCH_WAIT_MS,
+                name="ner-batcher"
+            )
+        self._padding_lock = threading.Lock()
+        self._padding_stats = {"segments": 0, "tokens": 0, "padded_tokens": 0}
+
+    def _segment_token_limit(self) -> int:
+        tokenizer = self.ner_pipeline.tokenizer
+        limit = settings.NER_SEGMENT_MAX_TOKENS
+        # model_max_length bernilai sangat besar jika tidak diset di konfigurasi tokenizer
+        if 0 < tokenizer.model_max_length < limit:
+            limit = tokenizer.model_max_length
+        return limit - tokenizer.num_special_tokens_to_add()
+
+    def _split_segments(self, text: str) -> List[Segment]:
+        """
+        Memotong teks menjadi segmen yang muat dalam panjang input model, sebisa mungkin di batas
+        baris (lalu spasi) agar entitas tidak terbelah. Teks pendek menjadi satu segmen utuh.
+        Tanpa tokenizer fast (tidak ada offset mapping) teks dikirim utuh seperti sebelumnya.
+        """
+        tokenizer = self.ner_pipeline.tokenizer
+        special = tokenizer.num_special_tokens_to_add()
+        if not getattr(tokenizer, "is_fast", False):
+            return [(0, text, len(text.split()) + special)]
+
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        limit = self._segment_token_limit()
+        if len(offsets) <= limit:
+            return [(0, text, len(offsets) + special)]
+
+        segments = []
+        first = 0
+        while first < len(offsets):
+            last = min(first + limit, len(offsets))
+            if last < len(offsets):
+                # Token pertama segmen berikutnya: awal baris, jika tidak ada awal kata.
+                starts = range(last, first, -1)
+                cut = next((i for i in starts if text[offsets[i][0] - 1] == "\n"), None)
+                if cut is None:
+                    cut = next((i for i in starts if text[offsets[i][0] - 1].isspace()), last)
+                last = cut
+            start_char = offsets[first][0] if segments else 0
+            end_char = offsets[last][0] if last < len(offsets) else len(text)
+            segments.append((start_char, text[start_char:end_char], last - first + special))
+            first = last
+        return segments
+
+    def _predict_documents(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Menjalankan NER untuk beberapa dokumen sekaligus. Segmen semua dokumen diurutkan menurut
+        jumlah token lalu dikelompokkan per bucket panjang, sehingga setiap forward pass berisi
+        segmen dengan panjang mirip dan padding minimal. Offset start/end entitas dikembalikan relatif
+        terhadap teks dokumen masing-masing.
+        """
+        # Tokenizer dipakai dari satu thread saja (thread batcher); tokenizer fast tidak aman
+        # dipakai bersamaan saat pengaturan truncation berubah.
+        documents = [self._split_segments(text) for text in texts]
+        flat = [(doc_index, segment) for doc_index, segments in enumerate(documents) for segment in segments]
+        flat.sort(key=lambda item: item[1][2], reverse=True)
+        outputs = []
+        for bucket in self._length_buckets([segment[2] for _, segment in flat]):
+            texts_in_bucket = [flat[i][1][1] for i in bucket]
+            outputs.extend(self.ner_pipeline(texts_in_bucket, batch_size=len(texts_in_bucket)))
+
+        per_document = [[] for _ in documents]
+        for (doc_index, (start_char, _, _)), entities in zip(flat, outputs):
+            for entity in entities:
+                if start_char:
+                    entity["start"] += start_char
+                    entity["end"] += start_char
+            per_document[doc_index].append((start_char, entities))
+        return [[entity for _, entities in sorted(segments, key=lambda item: item[0]) for entity in entities]
+                for segments in per_document]
+
+    def _length_buckets(self, lengths: List[int]) -> List[range]:
+        """
+        Membagi indeks segmen (sudah terurut dari yang terpanjang) menjadi bucket untuk satu
+        forward pass: maksimal NER_FORWARD_BATCH_SIZE segmen, dan bucket baru dimulai jika segmen
+        berikutnya kurang dari setengah panjang segmen terpanjang di bucket.
+        """
+        batch_size = max(1, settings.NER_FORWARD_BATCH_SIZE)
+        buckets, first = [], 0
+        for i in range(1, len(lengths) + 1):
+            if i == len(lengths) or i - first >= batch_size or lengths[i] * 2 < lengths[first]:
+                buckets.append(range(first, i))
+                first = i
+        with self._padding_lock:
+            self._padding_stats["segments"] += len(lengths)
+            self._padding_stats["tokens"] += sum(lengths)
+            self._padding_stats["padded_tokens"] += sum(lengths[bucket[0]] * len(bucket) for bucket in buckets)
+        return buckets
+
+    def batch_stats(self) -> Dict[str, Any]:
+        """Counter micro-batching NER beserta efisiensi padding (token asli / token setelah padding)."""
+        with self._padding_lock:
+            stats = dict(self._padding_stats)
+        stats["padding_efficiency"] = round(stats["tokens"] / stats["padded_tokens"], 4) if stats["padded_tokens"] else 1.0
+        if self.batcher is not None:
+            stats.update(self.batcher.stats())
+        return stats
+
     def predict_entities_text(self, text: str) -> List[Dict[str, Any]]:
         """
         Melakukan ekstraksi entitas dari sebuah teks.
@@ -69,7 +183,10 @@ class NERService:
 
         try:
             logger.info("Melakukan prediksi ekstraksi entitas...")
-            entities = self.ner_pipeline(text)
+            if self.batcher is not None:
+                entities = self.batcher.submit(text)
+            else:
+                entities = self._predict_documents([text])[0]
             logger.info(f"Ekstraksi entitas berhasil, ditemukan {len(entities)} entitas.")
             return entities
         except Exception as e:
@@ -1,17 +1,35 @@
 import os
 import logging
+import multiprocessing
+import queue
+import threading
+import hashlib
 import uuid
-from typing import Dict, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
 
 import cv2
 import numpy as np
 import pytesseract
-from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 
-from src.document_api.utils.preprocessing_image import preprocess_image_data
+try:
+    import tesserocr
+except ImportError:  # Backend in-process bersifat opsional
+    tesserocr = None
+
+from src.document_api.core.config import settings
+from src.document_api.utils.debug_artifacts import debug_artifacts
+from src.document_api.utils.image_loader import load_image, iter_image_frames
+from src.document_api.utils.pdf_renderer import (iter_pdf_pages, extract_pdf_text_layer, is_usable_text_layer,
+                                                 spooled_pdf, PopplerError, PDFSource, COLOR_MODES)
+from src.document_api.utils.preprocessing_image import preprocess_image_data, page_needs_color
 from src.document_api.utils.preprocessing_table_data import extract_table_grid_from_page, page_after_line_removal
 from src.document_api.utils.postprocessing_text import intelligent_postprocessing
+from src.document_api.utils.result_cache import ResultCache, sha256_bytes, sha256_file
 
 
 class OCRError(Exception):
@@ -36,61 +54,336 @@ class ImageReadError(OCRError):
 
 logger = logging.getLogger(__name__)
 
+# Hasil per halaman: (teks mentah, metadata halaman seperti sumber teks).
+PageResult = Tuple[str, Dict[str, Any]]
+
+
+class OCREngine:
+    """Antarmuka backend OCR. Menerima gambar numpy (biner/grayscale atau BGR) dan mengembalikan teks."""
+    name = "base"
+
+    def image_to_string(self, image: np.ndarray, psm: int = 6) -> str:
+        raise NotImplementedError
+
+
+class PytesseractEngine(OCREngine):
+    """Backend fallback: menjalankan executable Tesseract lewat pytesseract (satu proses per panggilan)."""
+    name = "pytesseract"
+
+    def __init__(self, tesseract_cmd: str, lang: str = "ind"):
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.lang = lang
+
+    def image_to_string(self, image: np.ndarray, psm: int = 6) -> str:
+        if image.ndim == 3:
+            # Konversi BGR (OpenCV) ke RGB (PIL)
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        pil_image = Image.fromarray(image)
+        # Pytesseract menyimpan gambar ke file sementara (default PNG). PNM ditulis apa adanya
+        # tanpa kompresi zlib, dan gambar biner 2D tidak melewati konversi warna apa pun.
+        pil_image.format = "PPM"
+        custom_config = f'--oem 3 --psm {psm}'
+        logger.info(f"configurasi pytesseract : {custom_config}")
+        try:
+            return pytesseract.image_to_string(pil_image, lang=self.lang, config=custom_config)
+        except pytesseract.TesseractError as e:
+            logger.error(f"Pytesseract error: {e}", exc_info=True)
+            raise OCRError(f"Terjadi error internal saat Tesseract memproses gambar: {e}")
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Backend in-process melalui tesserocr. Handle TessBaseAPI (beserta traineddata yang sudah
+    dimuat) disimpan dalam pool terbatas per PSM: setiap halaman meminjam satu handle lalu
+    mengembalikannya, sehingga handle tetap dipakai ulang walaupun server membuat thread baru
+    per request. Buffer numpy diberikan langsung tanpa file sementara atau encode PNG.
+    """
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "ind", tessdata_path: str = None, max_handles: int = None):
+        if tesserocr is None:
+            raise OCRError("Paket tesserocr tidak terinstal.")
+        self.lang = lang
+        self.tessdata_path = tessdata_path
+        self.max_handles = max(1, max_handles or settings.OCR_TESSEROCR_MAX_HANDLES or os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self._pools: Dict[int, queue.Queue] = {}
+        self._created: Dict[int, int] = {}
+
+    def _create_api(self, psm: int):
+        kwargs = {"lang": self.lang, "psm": psm, "oem": tesserocr.OEM.DEFAULT}
+        if self.tessdata_path:
+            kwargs["path"] = self.tessdata_path
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        logger.info(f"Handle Tesseract in-process dibuat (lang: {self.lang}, psm: {psm}).")
+        return api
+
+    def _acquire_api(self, psm: int):
+        """Meminjam handle dari pool; handle baru dibuat hanya jika pool kosong dan batas belum tercapai."""
+        with self._lock:
+            pool = self._pools.setdefault(psm, queue.Queue())
+            try:
+                return pool.get_nowait()
+            except queue.Empty:
+                pass
+            can_create = self._created.get(psm, 0) < self.max_handles
+            if can_create:
+                self._created[psm] = self._created.get(psm, 0) + 1
+        if not can_create:
+            return pool.get()
+        try:
+            return self._create_api(psm)
+        except BaseException:
+            with self._lock:
+                self._created[psm] -= 1
+            raise
+
+    def _release_api(self, psm: int, api):
+        api.Clear()
+        self._pools[psm].put(api)
+
+    def image_to_string(self, image: np.ndarray, psm: int = 6) -> str:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Gambar biner 2D dari pipeline dikirim apa adanya; tobytes() satu-satunya salinan.
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+
+        api = self._acquire_api(psm)
+        try:
+            api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+            return api.GetUTF8Text()
+        finally:
+            self._release_api(psm, api)
+
+
+def create_ocr_engine(engine_name: str, tesseract_cmd: str, lang: str = "ind") -> OCREngine:
+    """
+    Membuat backend OCR sesuai konfigurasi ("auto", "tesserocr", atau "pytesseract").
+    Jika tesserocr tidak tersedia atau gagal diinisialisasi, pytesseract dipakai sebagai fallback.
+    """
+    engine_name = (engine_name or "auto").lower()
+    if engine_name in ("auto", "tesserocr") and tesserocr is not None:
+        tessdata_path = settings.OCR_TESSDATA_PATH
+        if not tessdata_path:
+            bundled_tessdata = os.path.join(os.path.dirname(tesseract_cmd), "tessdata")
+            tessdata_path = bundled_tessdata if os.path.isdir(bundled_tessdata) else None
+        try:
+            engine = TesserocrEngine(lang=lang, tessdata_path=tessdata_path)
+            engine._release_api(6, engine._acquire_api(6))  # Validasi traineddata sekarang, bukan saat request pertama
+            return engine
+        except Exception as e:
+            logger.warning(f"Backend tesserocr gagal diinisialisasi, memakai pytesseract: {e}")
+    elif engine_name == "tesserocr":
+        logger.warning("OCR_ENGINE=tesserocr tetapi paket tesserocr tidak terinstal, memakai pytesseract.")
+    elif engine_name not in ("auto", "pytesseract"):
+        raise OCRError(f"Backend OCR tidak dikenal: {engine_name}")
+    return PytesseractEngine(tesseract_cmd, lang=lang)
+
+
+# Instance OCRService milik proses worker (diisi oleh _init_ocr_worker di setiap proses pool).
+_worker_ocr_service: "OCRService" = None
+
+
+def _init_ocr_worker(tesseract_cmd: str, poppler_path: str = None):
+    """Initializer proses pool: membuat OCRService sekuensial sekali per proses worker."""
+    global _worker_ocr_service
+    _worker_ocr_service = OCRService(tesseract_cmd, poppler_path=poppler_path, execution_mode="sequential")
+
+
+def _process_shared_page(shm_name: str, shape: Tuple[int, ...], dtype: str, debug_id: str,
+                         page_num: int) -> PageResult:
+    """
+    Dijalankan di proses worker. Raster halaman dibaca langsung dari shared memory
+    (tanpa pickle salinan gambar), lalu diproses oleh _process_single_image.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        page_result = _worker_ocr_service._process_single_image(image, debug_id, page_num)
+        del image
+        return page_result
+    finally:
+        shm.close()
+
 
 class OCRService:
-    def __init__(self, tesseract_cmd: str, poppler_path: str = None):
+    def __init__(self, tesseract_cmd: str, poppler_path: str = None,
+                 execution_mode: str = None, workers: int = None):
         """
         Inisialisasi service dengan dependensi yang dibutuhkan (Dependency Injection).
 
         Args:
             tesseract_cmd: Path absolut ke executable Tesseract.
             poppler_path: Path absolut ke library Poppler (opsional, untuk Windows).
+            execution_mode: "sequential" atau "process" (default dari settings.OCR_EXECUTION_MODE).
+            workers: Jumlah proses worker untuk mode "process" (default dari settings.OCR_WORKERS).
         """
         if not os.path.exists(tesseract_cmd):
             raise TesseractNotFoundError(f"Tesseract executable tidak ditemukan di path: {tesseract_cmd}")
 
-        pytesseract.tesseract_cmd = tesseract_cmd
+        self.tesseract_cmd = tesseract_cmd
+        self.engine = create_ocr_engine(settings.OCR_ENGINE, tesseract_cmd)
         self.poppler_path = poppler_path
-        logger.info(f"OCRService diinisialisasi dengan Tesseract di: {tesseract_cmd}")
-
-    @staticmethod
-    def _ocr_core(image_data: np.ndarray, psm: int = 6) -> str:
+        self.execution_mode = (execution_mode or settings.OCR_EXECUTION_MODE).lower()
+        self.workers = max(1, workers or settings.OCR_WORKERS or os.cpu_count() or 1)
+        if self.execution_mode not in ("sequential", "process"):
+            raise OCRError(f"Mode eksekusi OCR tidak dikenal: {self.execution_mode}")
+
+        self._executor: ProcessPoolExecutor = None
+        self._executor_pid: int = None
+        self._executor_lock = threading.Lock()
+
+        self.result_cache: ResultCache = None
+        if settings.OCR_CACHE_ENABLED:
+            self.result_cache = ResultCache(
+                name="ocr_result",
+                memory_max_bytes=settings.OCR_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=os.path.join(settings.OCR_CACHE_DIR, "documents") if settings.OCR_CACHE_DIR else None,
+                disk_max_bytes=settings.OCR_CACHE_DISK_MB * 1024 * 1024,
+                ttl_seconds=settings.OCR_CACHE_TTL_SECONDS
+            )
+
+        self.page_cache: ResultCache = None
+        if settings.OCR_PAGE_CACHE_ENABLED:
+            self.page_cache = ResultCache(
+                name="ocr_page",
+                memory_max_bytes=settings.OCR_PAGE_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=os.path.join(settings.OCR_CACHE_DIR, "pages") if settings.OCR_CACHE_DIR else None,
+                disk_max_bytes=settings.OCR_CACHE_DISK_MB * 1024 * 1024,
+                ttl_seconds=settings.OCR_CACHE_TTL_SECONDS
+            )
+        logger.info(f"OCRService diinisialisasi dengan Tesseract di: {tesseract_cmd} "
+                    f"(backend: {self.engine.name}, mode: {self.execution_mode}, worker: {self.workers})")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Membuat process pool secara lazy. Pool dibuat ulang jika proses saat ini berbeda
+        dari proses pembuatnya (mis. setelah fork), karena pool tidak bisa diwariskan.
+        Pembuatan dijaga lock agar request bersamaan tidak membuat beberapa pool sekaligus.
+        """
+        executor = self._executor
+        if executor is not None and self._executor_pid == os.getpid():
+            return executor
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                context = multiprocessing.get_context(settings.OCR_MP_START_METHOD)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_ocr_worker,
+                    initargs=(self.tesseract_cmd, self.poppler_path)
+                )
+                self._executor_pid = os.getpid()
+                logger.info(f"Process pool OCR dibuat dengan {self.workers} worker "
+                            f"({settings.OCR_MP_START_METHOD}).")
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """
+        Membuang pool yang rusak tanpa menunggu worker-nya. Pool hanya dilepas jika belum
+        diganti oleh thread lain, sehingga pool baru yang sehat tidak ikut dibuang.
         """
-        Wrapper privat untuk panggilan Pytesseract. Menggunakan PSM 6 untuk menjaga struktur.
+        executor.shutdown(wait=False, cancel_futures=True)
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+                self._executor_pid = None
+
+    def close(self):
+        """Mematikan process pool OCR jika sudah dibuat."""
+        with self._executor_lock:
+            executor, executor_pid = self._executor, self._executor_pid
+            self._executor = None
+            self._executor_pid = None
+        if executor is not None and executor_pid == os.getpid():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _ocr_core(self, image_data: np.ndarray, psm: int = 6) -> str:
+        """
+        Wrapper privat untuk backend OCR aktif. Menggunakan PSM 6 untuk menjaga struktur.
         """
         if image_data is None:
             logger.warning("Mencoba OCR pada data gambar yang None, mengembalikan string kosong.")
             return ""
 
         try:
-            # Konversi BGR (OpenCV) ke RGB (PIL)
-            pil_image = Image.fromarray(cv2.cvtColor(image_data, cv2.COLOR_BGR2RGB))
-            custom_config = f'--oem 3 --psm {psm}'
-            logger.info(f"configurasi pytesseract : {custom_config}")
-            text = pytesseract.image_to_string(pil_image, lang='ind', config=custom_config)
-            return text
-        except pytesseract.TesseractError as e:
-            logger.error(f"Pytesseract error: {e}", exc_info=True)
-            raise OCRError(f"Terjadi error internal saat Tesseract memproses gambar: {e}")
+            return self.engine.image_to_string(image_data, psm=psm)
+        except OCRError:
+            raise
         except Exception as e:
             logger.error(f"Error tak terduga saat konversi gambar atau OCR: {e}", exc_info=True)
             raise OCRError(f"Error tak terduga di dalam _ocr_core: {e}")
 
-    def _process_single_image(self, image_bgr: np.ndarray, debug_id: str, page_num: int) -> str:
+    def _page_cache_key(self, image: np.ndarray, page_num: int) -> str:
+        """
+        Kunci cache halaman: hash raster hasil render ditambah pengaturan pra-pemrosesan.
+        Halaman pertama diproses berbeda (proteksi header dan masking logo), jadi ikut dibedakan.
+        """
+        raster_digest = hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=20)
+        raster_digest.update(f"{image.shape}|{image.dtype.str}".encode("ascii"))
+        return ResultCache.make_key(raster_digest.hexdigest(), self._pipeline_signature(),
+                                    f"first_page={page_num == 0}", "psm=6")
+
+    def _process_single_image(self, image_bgr: np.ndarray, debug_id: str, page_num: int) -> PageResult:
         """
         Helper privat untuk memproses satu gambar (dari PDF atau file gambar).
         Ini adalah inti dari prinsip DRY untuk menghindari duplikasi kode.
+
+        Jika cache halaman aktif, halaman dengan raster yang identik (mis. halaman yang tidak
+        berubah pada revisi dokumen) langsung memakai teks dari cache tanpa OCR ulang.
         """
+        page_info = {"page": page_num + 1, "source": "ocr"}
+
+        page_cache_key = None
+        if self.page_cache is not None:
+            page_cache_key = self._page_cache_key(image_bgr, page_num)
+            cached_page = self.page_cache.get(page_cache_key)
+            if cached_page is not None:
+                logger.info(f"[Debug ID: {debug_id}] Halaman {page_num + 1} diambil dari cache halaman.")
+                page_info["source"] = "page_cache"
+                return cached_page["text"], page_info
+
         logger.info(f"[Debug ID: {debug_id}] Memulai pra-pemrosesan untuk halaman/gambar ke-{page_num + 1}.")
+        stage_info = {}
+        try:
+            text = self._run_page_pipeline(image_bgr, debug_id, page_num, stage_info)
+        except Exception:
+            # Mode debug "error": gambar debug halaman yang gagal ditulis, selain itu dibuang.
+            debug_artifacts.flush(debug_id)
+            raise
+
+        if stage_info:
+            page_info["preprocess"] = stage_info
+        if text is None:
+            debug_artifacts.flush(debug_id)
+            page_info["source"] = "skipped"
+            return "", page_info
+
+        debug_artifacts.discard(debug_id)
+        if page_cache_key is not None:
+            self.page_cache.put(page_cache_key, {"text": text})
+        return text, page_info
+
+    def _run_page_pipeline(self, image_bgr: np.ndarray, debug_id: str, page_num: int,
+                           stage_info: Dict[str, Any] = None) -> Optional[str]:
+        """
+        Pra-pemrosesan, penghapusan garis tabel, lalu OCR untuk satu halaman.
+        Mengembalikan None jika pra-pemrosesan gagal sehingga halaman dilewati.
+        Jalur pra-pemrosesan yang dipilih probe dicatat ke stage_info.
 
-        binary_image, _ = preprocess_image_data(image_bgr, page_number=page_num, id_numerik=debug_id)
+        Raster halaman dimiliki pipeline, sehingga setiap tahap boleh menimpanya langsung dan
+        gambar antara memakai buffer per-thread yang dipakai ulang antar halaman.
+        """
+        binary_image, _ = preprocess_image_data(image_bgr, page_number=page_num, id_numerik=debug_id, inplace=True,
+                                                stage_info=stage_info)
         if binary_image is None:
             logger.warning(
                 f"[Debug ID: {debug_id}] Pra-pemrosesan gagal untuk halaman {page_num + 1}, halaman dilewati.")
-            return ""
+            return None
 
         grid_mask = extract_table_grid_from_page(binary_image, debug_id, page_num)
-        final_image = page_after_line_removal(binary_image, grid_mask, debug_id, page_num)
+        final_image = page_after_line_removal(binary_image, grid_mask, debug_id, page_num, inplace=True)
 
         # Fallback jika penghapusan garis gagal, gunakan gambar biner hasil pra-pemrosesan.
         if final_image is None:
@@ -99,6 +392,190 @@ class OCRService:
         logger.info(f"[Debug ID: {debug_id}] Melakukan OCR pada gambar final halaman {page_num + 1}...")
         return self._ocr_core(final_image, psm=6)
 
+    @staticmethod
+    def _render_color_mode() -> str:
+        """Mode warna render PDF dari settings; nilai tidak dikenal kembali ke "color"."""
+        color_mode = settings.OCR_RENDER_COLOR_MODE
+        if color_mode not in COLOR_MODES:
+            logger.warning(f"OCR_RENDER_COLOR_MODE '{color_mode}' tidak dikenal, memakai 'color'.")
+            return "color"
+        return color_mode
+
+    def _iter_pdf_pages(self, pdf_source: PDFSource,
+                        page_indices: Sequence[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Membungkus renderer PDF streaming agar error Poppler menjadi PDFConversionError,
+        tanpa ikut menangkap error dari tahap OCR yang berjalan di antara halaman.
+        """
+        pages = iter_pdf_pages(pdf_source, dpi=settings.OCR_PDF_DPI, poppler_path=self.poppler_path,
+                               window=settings.OCR_PAGE_WINDOW, page_indices=page_indices,
+                               color_mode=self._render_color_mode(), probe_dpi=settings.OCR_RENDER_PROBE_DPI,
+                               needs_color=page_needs_color)
+        while True:
+            try:
+                page = next(pages)
+            except StopIteration:
+                return
+            except PopplerError as e:
+                logger.error(f"Gagal mengonversi PDF: {e}", exc_info=True)
+                raise PDFConversionError(f"Gagal memproses file PDF: {e}. Pastikan Poppler terinstal.")
+            yield page
+
+    def _read_text_layer(self, pdf_source: PDFSource, debug_id: str) -> Optional[List[str]]:
+        """
+        Membaca text layer PDF per halaman. Mengembalikan None jika fitur dimatikan atau
+        pdftotext gagal, sehingga seluruh halaman diproses lewat OCR seperti biasa.
+        """
+        if not settings.OCR_USE_TEXT_LAYER:
+            return None
+        try:
+            text_layer = extract_pdf_text_layer(pdf_source, poppler_path=self.poppler_path)
+        except PopplerError as e:
+            logger.warning(f"[Debug ID: {debug_id}] Text layer PDF tidak bisa dibaca, memakai OCR penuh: {e}")
+            return None
+        return text_layer or None
+
+    def _iter_pdf_page_results(self, pdf_source: PDFSource, debug_id: str) -> Iterator[PageResult]:
+        """
+        Menghasilkan teks mentah per halaman PDF sesuai urutan halaman. Halaman dengan text
+        layer yang layak (PDF hasil ekspor pengolah kata) dipakai langsung; hanya halaman hasil
+        pindaian yang dirender dan di-OCR.
+
+        Text layer dibaca dengan satu panggilan pdftotext (PDF di memori lewat stdin). Jika ada
+        halaman yang perlu dirender, PDF di memori ditulis sekali ke file sementara dan semua
+        panggilan pdftoppm membaca file tersebut; file dihapus setelah halaman terakhir.
+        """
+        text_layer = self._read_text_layer(pdf_source, debug_id)
+        if text_layer is None:
+            with spooled_pdf(pdf_source) as pdf_path:
+                yield from self._iter_run_pages(self._iter_pdf_pages(pdf_path), debug_id)
+            return
+
+        layer_results = [(text, {"page": i + 1, "source": "text_layer"})
+                         if is_usable_text_layer(text, min_chars=settings.OCR_TEXT_LAYER_MIN_CHARS) else None
+                         for i, text in enumerate(text_layer)]
+        ocr_indices = [i for i, page_result in enumerate(layer_results) if page_result is None]
+        logger.info(f"[Debug ID: {debug_id}] Text layer dipakai untuk {len(layer_results) - len(ocr_indices)} "
+                    f"dari {len(layer_results)} halaman, {len(ocr_indices)} halaman diproses dengan OCR.")
+        if not ocr_indices:
+            yield from layer_results
+            return
+
+        with spooled_pdf(pdf_source) as pdf_path:
+            ocr_results = self._iter_run_pages(self._iter_pdf_pages(pdf_path, page_indices=ocr_indices), debug_id)
+            try:
+                for page_num, page_result in enumerate(layer_results):
+                    if page_result is None:
+                        # next() tanpa default di dalam generator menjadi RuntimeError (PEP 479).
+                        page_result = next(ocr_results, None)
+                        if page_result is None:
+                            raise PDFConversionError(f"Gagal memproses file PDF: halaman {page_num + 1} "
+                                                     f"tidak bisa dirender.")
+                    yield page_result
+            finally:
+                ocr_results.close()
+
+    def _iter_pages_in_pool(self, pages: Iterator[Tuple[int, np.ndarray]], debug_id: str) -> Iterator[PageResult]:
+        """
+        Menyebar halaman ke process pool. Setiap raster disalin sekali ke shared memory;
+        worker hanya menerima nama segmen dan bentuk array. Jumlah halaman yang sedang
+        diproses dibatasi (2x jumlah worker) agar memori tetap terbatas, dan hasil
+        dihasilkan sesuai urutan halaman segera setelah tersedia.
+        """
+        executor = self._get_executor()
+        max_in_flight = self.workers * 2
+        pending = deque()
+
+        def release(shm: shared_memory.SharedMemory):
+            shm.close()
+            shm.unlink()
+
+        try:
+            for page_num, image in pages:
+                shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+                try:
+                    shared_view = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+                    shared_view[...] = image
+                    del shared_view
+                    future = executor.submit(_process_shared_page, shm.name, image.shape, image.dtype.str,
+                                             debug_id, page_num)
+                except BaseException:
+                    release(shm)
+                    raise
+                pending.append((future, shm))
+                del image
+
+                if len(pending) >= max_in_flight:
+                    future, shm = pending.popleft()
+                    try:
+                        page_result = future.result()
+                    finally:
+                        release(shm)
+                    yield page_result
+
+            while pending:
+                future, shm = pending.popleft()
+                try:
+                    page_result = future.result()
+                finally:
+                    release(shm)
+                yield page_result
+        except BrokenProcessPool as e:
+            logger.error(f"[Debug ID: {debug_id}] Process pool OCR rusak: {e}", exc_info=True)
+            self._discard_executor(executor)
+            raise OCRError(f"Worker OCR berhenti secara tidak terduga: {e}")
+        finally:
+            # Jika terjadi error atau konsumen berhenti lebih awal, batalkan/tunggu halaman
+            # yang tersisa sebelum segmen dihapus.
+            while pending:
+                future, shm = pending.popleft()
+                if not future.cancel():
+                    future.exception()
+                release(shm)
+
+    def _iter_run_pages(self, pages: Iterator[Tuple[int, np.ndarray]], debug_id: str) -> Iterator[PageResult]:
+        """
+        Menjalankan pipeline per halaman secara sekuensial atau melalui process pool dan
+        menghasilkan hasil tiap halaman sesuai urutan, segera setelah halaman tersebut selesai.
+        """
+        if self.execution_mode == "process":
+            yield from self._iter_pages_in_pool(pages, debug_id)
+            return
+
+        for page_num, image in pages:
+            page_result = self._process_single_image(image, debug_id, page_num)
+            del image
+            yield page_result
+
+    def _pipeline_signature(self) -> str:
+        """
+        Versi konfigurasi pipeline yang ikut menjadi bagian kunci cache. Mengubah backend OCR,
+        resolusi render atau normalisasi gambar, aturan text layer, mesin garis tabel, routing,
+        atau OCR_PIPELINE_VERSION membuat entri lama tidak terpakai.
+        """
+        return "|".join([
+            f"pipeline={settings.OCR_PIPELINE_VERSION}",
+            f"engine={self.engine.name}",
+            f"dpi={settings.OCR_PDF_DPI}:{self._render_color_mode()}:{settings.OCR_RENDER_PROBE_DPI}",
+            f"text_layer={settings.OCR_USE_TEXT_LAYER}:{settings.OCR_TEXT_LAYER_MIN_CHARS}",
+            f"table_lines={settings.TABLE_LINE_ENGINE}",
+            f"routing={settings.OCR_PREPROCESS_ROUTING}:{settings.OCR_PROBE_COLOR_MIN_RATIO}:"
+            f"{settings.OCR_PROBE_BILEVEL_MIN_RATIO}",
+            f"image_dpi={settings.OCR_IMAGE_TARGET_DPI}",
+        ])
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Mengembalikan counter hit/miss cache hasil OCR dan cache halaman (kosong jika dimatikan).
+        Pada mode "process", counter cache halaman milik worker tidak ikut terhitung di sini.
+        """
+        stats = {}
+        if self.result_cache is not None:
+            stats["documents"] = self.result_cache.stats()
+        if self.page_cache is not None:
+            stats["pages"] = self.page_cache.stats()
+        return stats
+
     def extract_text_from_file(self, file_path: str) -> Dict[str, Any]:
         """
         Metode utama untuk mengekstrak teks dari file (PDF atau Gambar).
@@ -106,46 +583,182 @@ class OCRService:
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File input tidak ditemukan di: {file_path}")
+        return self._extract_text(file_path, os.path.basename(file_path))
 
-        _, file_extension = os.path.splitext(file_path)
-        file_extension = file_extension.lower()
-        debug_id = str(uuid.uuid4())
-        logger.info(f"--- Memulai Pipeline OCR [Debug ID: {debug_id}] untuk file: {os.path.basename(file_path)} ---")
+    def extract_text_from_bytes(self, data: Union[bytes, BinaryIO], file_name: str) -> Dict[str, Any]:
+        """
+        Sama seperti extract_text_from_file, tetapi untuk isi file yang sudah berada di memori
+        (bytes atau stream seperti upload Flask/SpooledTemporaryFile). Gambar di-decode langsung
+        dengan cv2.imdecode. Text layer PDF dibaca dengan satu panggilan pdftotext lewat stdin; jika
+        ada halaman yang perlu dirender, PDF ditulis sekali ke file sementara (spooled_pdf) yang
+        dibaca semua panggilan pdftoppm dan dihapus setelah halaman terakhir.
 
-        all_pages_raw_text = []
-        page_count = 0
+        Args:
+            data: Isi file (bytes) atau objek file-like yang bisa dibaca.
+            file_name: Nama file asli; ekstensinya menentukan jenis dokumen.
+        """
+        if hasattr(data, "read"):
+            data = data.read()
+        return self._extract_text(bytes(data), file_name)
 
-        if file_extension == ".pdf":
+    def _read_image(self, source: Union[str, bytes]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Membaca gambar BGR dari path file atau dari bytes di memori. Foto beresolusi tinggi
+        langsung di-decode pada skala kecil dan dinormalkan ke OCR_IMAGE_TARGET_DPI.
+        """
+        opencv_image, resolution_info = load_image(source, settings.OCR_IMAGE_TARGET_DPI)
+        if opencv_image is None:
+            raise ImageReadError(f"Gagal membaca file gambar menggunakan OpenCV: "
+                                 f"{source if isinstance(source, str) else 'data upload'}")
+        return opencv_image, resolution_info
+
+    def _iter_tiff_pages(self, source: Union[str, bytes],
+                         resolution_infos: List[Dict[str, Any]]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Membungkus iter_image_frames agar error decode menjadi ImageReadError dan info
+        resolusi tiap frame tercatat, tanpa ikut menangkap error dari tahap OCR di antara frame.
+        """
+        frames = iter_image_frames(source, settings.OCR_IMAGE_TARGET_DPI)
+        while True:
             try:
-                page_count = pdfinfo_from_path(file_path, poppler_path=self.poppler_path)['Pages']
-                images_from_pdf = convert_from_path(file_path, dpi=300, poppler_path=self.poppler_path)
-            except Exception as e:
-                logger.error(f"Gagal mengonversi PDF: {e}", exc_info=True)
-                raise PDFConversionError(f"Gagal memproses file PDF: {e}. Pastikan Poppler terinstal.")
-
-            for i, pil_image in enumerate(images_from_pdf):
-                opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-                page_raw_text = self._process_single_image(opencv_image, debug_id, i)
-                all_pages_raw_text.append(page_raw_text)
-
-        elif file_extension in [".png", ".jpg", ".jpeg", ".bmp", ".tiff"]:
-            page_count = 1
-            opencv_image = cv2.imread(file_path)
-            if opencv_image is None:
-                raise ImageReadError(f"Gagal membaca file gambar menggunakan OpenCV: {file_path}")
-
-            page_raw_text = self._process_single_image(opencv_image, debug_id, 0)
-            all_pages_raw_text.append(page_raw_text)
+                frame_index, image, resolution_info = next(frames)
+            except StopIteration:
+                return
+            # UnidentifiedImageError adalah OSError; DecompressionBombError bukan.
+            except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+                logger.error(f"Gagal membaca frame TIFF: {e}", exc_info=True)
+                raise ImageReadError(f"Gagal membaca file TIFF: "
+                                     f"{source if isinstance(source, str) else 'data upload'} ({e})")
+            resolution_infos.append(resolution_info)
+            yield frame_index, image
+
+    def _iter_tiff_page_results(self, source: Union[str, bytes], debug_id: str) -> Iterator[PageResult]:
+        """
+        Memproses TIFF frame demi frame lewat pipeline halaman yang sama dengan PDF
+        (sekuensial atau process pool), sehingga hanya beberapa frame yang berada di memori.
+        """
+        resolution_infos = []
+        frame_count = 0
+        for page_text, page_info in self._iter_run_pages(self._iter_tiff_pages(source, resolution_infos), debug_id):
+            # Frame dibaca lebih dulu daripada hasilnya keluar, jadi infonya sudah tercatat.
+            page_info["resolution"] = resolution_infos[page_info["page"] - 1]
+            frame_count += 1
+            yield page_text, page_info
+        logger.info(f"[Debug ID: {debug_id}] {frame_count} frame TIFF diproses.")
+
+    def _document_cache_key(self, source: Union[str, bytes], file_extension: str) -> Optional[str]:
+        """Kunci cache hasil OCR berbasis isi file; None jika cache dimatikan."""
+        if self.result_cache is None:
+            return None
+        content_digest = sha256_file(source) if isinstance(source, str) else sha256_bytes(source)
+        return ResultCache.make_key(content_digest, file_extension, self._pipeline_signature())
+
+    def _iter_page_results(self, source: Union[str, bytes], file_extension: str,
+                           debug_id: str) -> Iterator[PageResult]:
+        """Menghasilkan teks mentah dan metadata per halaman sesuai urutan, sesuai jenis file."""
+        if file_extension == ".pdf":
+            # Halaman dirender, diproses, lalu dilepas satu per satu agar memori tetap terbatas.
+            yield from self._iter_pdf_page_results(source, debug_id)
+
+        elif file_extension in [".tif", ".tiff"]:
+            # TIFF bisa berisi banyak halaman (bundel scan/fax): setiap frame adalah satu halaman.
+            yield from self._iter_tiff_page_results(source, debug_id)
+
+        elif file_extension in [".png", ".jpg", ".jpeg", ".bmp"]:
+            opencv_image, resolution_info = self._read_image(source)
+            page_text, page_info = self._process_single_image(opencv_image, debug_id, 0)
+            page_info["resolution"] = resolution_info
+            yield page_text, page_info
         else:
             raise OCRError(f"Format file tidak didukung: {file_extension}")
 
-        full_raw_text = "\n".join(all_pages_raw_text)
+    def _build_result(self, page_results: List[PageResult], debug_id: str) -> Dict[str, Any]:
+        """Menggabungkan hasil per halaman menjadi hasil dokumen (pasca-pemrosesan teks gabungan)."""
+        pages = [page_info for _, page_info in page_results]
+        pages_reused = sum(1 for page_info in pages if page_info["source"] == "page_cache")
+        preprocess_routes = {}
+        for page_info in pages:
+            route = page_info.get("preprocess", {}).get("route")
+            if route:
+                preprocess_routes[route] = preprocess_routes.get(route, 0) + 1
+        logger.info(f"[Debug ID: {debug_id}] {pages_reused} dari {len(pages)} halaman memakai cache halaman.")
+
+        full_raw_text = "\n".join(page_text for page_text, _ in page_results)
         processed_texts = intelligent_postprocessing(full_raw_text)
         logger.info(f"--- Pipeline OCR [Debug ID: {debug_id}] Selesai ---")
 
         return {
             "text_for_ner": processed_texts["text_for_ner"],
             "text_for_classification": processed_texts["text_for_classification"],
-            "page_count": page_count,
-            "file_name": os.path.basename(file_path)
+            "page_count": len(page_results),
+            "pages": pages,
+            "pages_reused": pages_reused,
+            "preprocess_routes": preprocess_routes,
         }
+
+    def _extract_text(self, source: Union[str, bytes], file_name: str) -> Dict[str, Any]:
+        """Pipeline bersama untuk sumber berupa path file atau bytes di memori."""
+        _, file_extension = os.path.splitext(file_name)
+        file_extension = file_extension.lower()
+
+        # Cache berbasis isi file: hit melewati render, pra-pemrosesan, dan Tesseract sepenuhnya.
+        cache_key = self._document_cache_key(source, file_extension)
+        if cache_key is not None:
+            cached_result = self.result_cache.get(cache_key)
+            if cached_result is not None:
+                logger.info(f"Hasil OCR untuk file {file_name} diambil dari cache.")
+                cached_result.update({"file_name": file_name, "cache_hit": True})
+                return cached_result
+
+        debug_id = str(uuid.uuid4())
+        logger.info(f"--- Memulai Pipeline OCR [Debug ID: {debug_id}] untuk file: {file_name} ---")
+
+        page_results = list(self._iter_page_results(source, file_extension, debug_id))
+        result = self._build_result(page_results, debug_id)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, result)
+
+        result.update({"file_name": file_name, "cache_hit": False})
+        return result
+
+    def iter_extract_text_from_bytes(self, data: Union[bytes, BinaryIO], file_name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Varian streaming dari extract_text_from_bytes. Setiap halaman dihasilkan sebagai event
+        segera setelah halaman tersebut selesai di-OCR (sesuai urutan halaman), diikuti satu event
+        akhir berisi hasil dokumen yang sama persis dengan extract_text_from_bytes.
+
+        Cache hasil dokumen tidak dibaca agar event per halaman selalu terkirim; halaman yang
+        tidak berubah tetap cepat lewat cache halaman, dan hasil akhir tetap disimpan ke cache.
+
+        Yields:
+            {"event": "page", "page", "source", "text_for_ner", "text_for_classification", "info"}
+            lalu {"event": "done", "result": <hasil dokumen>}
+        """
+        if hasattr(data, "read"):
+            data = data.read()
+        data = bytes(data)
+        _, file_extension = os.path.splitext(file_name)
+        file_extension = file_extension.lower()
+
+        debug_id = str(uuid.uuid4())
+        logger.info(f"--- Memulai Pipeline OCR streaming [Debug ID: {debug_id}] untuk file: {file_name} ---")
+
+        page_results = []
+        for page_text, page_info in self._iter_page_results(data, file_extension, debug_id):
+            page_results.append((page_text, page_info))
+            processed_page = intelligent_postprocessing(page_text)
+            yield {
+                "event": "page",
+                "page": page_info["page"],
+                "source": page_info["source"],
+                "text_for_ner": processed_page["text_for_ner"],
+                "text_for_classification": processed_page["text_for_classification"],
+                "info": page_info,
+            }
+
+        result = self._build_result(page_results, debug_id)
+        cache_key = self._document_cache_key(data, file_extension)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, result)
+        result = dict(result, file_name=file_name, cache_hit=False)
+        yield {"event": "done", "result": result}
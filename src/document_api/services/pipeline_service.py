@@ -0,0 +1,208 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence, Tuple
+
+from .classifier_service import TextClassifierService, ClassifierError
+from .information_extraction_service import InformationExtractionService
+from .ner_service import NERService, NERError
+from .ocr_service import OCRService, OCRError
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Satu dokumen dalam batch: (nama file, fungsi yang membaca isi file). Isi file baru dibaca
+# saat dokumen akan diproses, sehingga batch besar tidak dimuat ke memori sekaligus.
+BatchDocument = Tuple[str, Callable[[], bytes]]
+
+
+# Tahap pipeline dalam urutan eksekusi, beserta tahap yang hasilnya dibutuhkan.
+STAGES = ("ocr", "classify", "ner", "extract")
+STAGE_DEPENDENCIES = {
+    "ocr": (),
+    "classify": ("ocr",),
+    "ner": ("ocr",),
+    "extract": ("ocr", "classify", "ner"),
+}
+
+
+class UnknownStageError(ValueError):
+    """Dilemparkan ketika parameter stages berisi tahap yang tidak dikenal."""
+    pass
+
+
+def resolve_stages(requested: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Melengkapi tahap yang diminta dengan dependensinya dan mengurutkannya sesuai urutan eksekusi.
+    Contoh: ["ner"] -> ("ocr", "ner"); ["extract"] -> ("ocr", "classify", "ner", "extract").
+
+    Raises:
+        UnknownStageError: Jika ada nama tahap yang tidak dikenal.
+    """
+    needed = set()
+    pending = [stage.strip().lower() for stage in requested if stage and stage.strip()]
+    while pending:
+        stage = pending.pop()
+        if stage not in STAGE_DEPENDENCIES:
+            raise UnknownStageError(f"Tahap tidak dikenal: '{stage}'. Tahap yang tersedia: {', '.join(STAGES)}")
+        if stage not in needed:
+            needed.add(stage)
+            pending.extend(STAGE_DEPENDENCIES[stage])
+    return tuple(stage for stage in STAGES if stage in needed)
+
+
+class InvalidDocumentError(Exception):
+    """Dilemparkan oleh pembaca dokumen batch ketika satu file tidak bisa diterima (format, ukuran)."""
+    pass
+
+
+class DocumentPipelineService:
+    """
+    Menjalankan pipeline lengkap satu dokumen (OCR -> klasifikasi -> NER -> ekstraksi
+    informasi) dan versi batch-nya dengan paralelisme terbatas.
+    """
+
+    def __init__(self, ocr_service: OCRService,
+                 classifier_service: TextClassifierService,
+                 ner_service: NERService,
+                 info_extraction_service: InformationExtractionService,
+                 workers: int = None):
+        """
+        Args:
+            workers: Jumlah dokumen yang diproses bersamaan dalam batch (default dari settings.BATCH_WORKERS).
+        """
+        self.ocr_service = ocr_service
+        self.classifier_service = classifier_service
+        self.ner_service = ner_service
+        self.info_extraction_service = info_extraction_service
+        self.workers = max(1, workers or settings.BATCH_WORKERS)
+
+        self._executor: ThreadPoolExecutor = None
+        self._executor_pid: int = None
+        logger.info(f"DocumentPipelineService diinisialisasi (worker batch: {self.workers}).")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Membuat thread pool batch secara lazy. Pool dibagi oleh semua request batch agar total
+        dokumen yang diproses bersamaan tetap dibatasi, dan dibuat ulang setelah fork.
+        """
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="document-batch")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def close(self):
+        """Mematikan thread pool batch jika sudah dibuat."""
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        self._executor_pid = None
+
+    def run_stages(self, data: bytes, file_name: str, stages: Sequence[str]) -> Dict[str, Any]:
+        """
+        Menjalankan hanya tahap yang diminta (beserta dependensinya), masing-masing tepat
+        sekali. Model yang tidak dibutuhkan tidak dipanggil sama sekali.
+
+        Args:
+            stages: Nama tahap dari STAGES; dependensi ditambahkan oleh resolve_stages.
+
+        Returns:
+            Hasil per tahap yang dijalankan: "ocr" (hasil OCRService), "classify" (list prediksi),
+            "ner" (list entitas), "extract" (data terstruktur).
+
+        Raises:
+            UnknownStageError, OCRError, ClassifierError, NERError
+        """
+        stages = resolve_stages(stages)
+        results = {}
+
+        logger.info(f"Memulai pipeline OCR untuk file: {file_name} (tahap: {', '.join(stages)})")
+        ocr_result = results["ocr"] = self.ocr_service.extract_text_from_bytes(data, file_name)
+
+        if "classify" in stages:
+            logger.info("Memulai klasifikasi pada teks hasil OCR...")
+            results["classify"] = self.classifier_service.classify_text(ocr_result.get("text_for_classification"))
+
+        if "ner" in stages:
+            logger.info("Memulai ekstraksi entitas pada teks hasil OCR...")
+            results["ner"] = self.ner_service.predict_entities_text(ocr_result.get("text_for_ner"))
+
+        if "extract" in stages:
+            # classify_text mengembalikan list kosong untuk teks kosong (mis. halaman tanpa tulisan)
+            classification = results["classify"][0].get('label') if results["classify"] else None
+            logger.info("Memulai ekstraksi informasi...")
+            results["extract"] = self.info_extraction_service.process_extraction(
+                classification=classification,
+                text_for_ner=ocr_result.get("text_for_ner"),
+                entities=results["ner"],
+                filename=ocr_result.get('file_name')
+            )
+        return results
+
+    def process_document(self, data: bytes, file_name: str) -> Dict[str, Any]:
+        """
+        Menjalankan OCR, klasifikasi, NER, dan ekstraksi informasi untuk satu dokumen.
+
+        Returns:
+            Data terstruktur hasil InformationExtractionService.process_extraction.
+
+        Raises:
+            OCRError, ClassifierError, NERError: Jika salah satu tahap gagal.
+        """
+        return self.run_stages(data, file_name, ("extract",))["extract"]
+
+    def _process_batch_item(self, index: int, file_name: str, read: Callable[[], bytes]) -> Dict[str, Any]:
+        """Memproses satu dokumen batch; error dikembalikan sebagai hasil, bukan dilempar."""
+        try:
+            return {"index": index, "file_name": file_name, "status": "ok",
+                    "data": self.process_document(read(), file_name)}
+        except InvalidDocumentError as e:
+            logger.warning(f"Batch: dokumen {file_name} ditolak: {e}")
+            return {"index": index, "file_name": file_name, "status": "error", "error": str(e)}
+        except OCRError as e:
+            logger.error(f"Batch: error OCR pada {file_name}: {e}", exc_info=True)
+            return {"index": index, "file_name": file_name, "status": "error",
+                    "error": f"Gagal saat ekstraksi teks: {e}"}
+        except ClassifierError as e:
+            logger.error(f"Batch: error klasifikasi pada {file_name}: {e}", exc_info=True)
+            return {"index": index, "file_name": file_name, "status": "error",
+                    "error": f"Gagal saat klasifikasi: {e}"}
+        except NERError as e:
+            logger.error(f"Batch: error NER pada {file_name}: {e}", exc_info=True)
+            return {"index": index, "file_name": file_name, "status": "error",
+                    "error": f"Gagal saat ekstraksi entitas: {e}"}
+        except Exception as e:
+            logger.critical(f"Batch: error tak terduga pada {file_name}: {e}", exc_info=True)
+            return {"index": index, "file_name": file_name, "status": "error",
+                    "error": "Terjadi kesalahan internal pada server."}
+
+    def process_batch(self, documents: Iterable[BatchDocument]) -> Iterator[Dict[str, Any]]:
+        """
+        Memproses banyak dokumen secara paralel dan menghasilkan hasil tiap dokumen segera
+        setelah selesai (urutan selesai, bukan urutan input; lihat field "index").
+
+        Jumlah dokumen yang sedang berjalan dibatasi 2x jumlah worker, sehingga isi file
+        hanya dibaca ketika slot tersedia dan memori tetap terbatas untuk batch besar.
+
+        Yields:
+            {"index", "file_name", "status": "ok", "data"} atau {"index", "file_name", "status": "error", "error"}
+        """
+        executor = self._get_executor()
+        max_in_flight = self.workers * 2
+        pending = set()
+        try:
+            for index, (file_name, read) in enumerate(documents):
+                pending.add(executor.submit(self._process_batch_item, index, file_name, read))
+                while len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # Klien memutus stream: dokumen yang belum mulai tidak perlu diproses lagi.
+            for future in pending:
+                future.cancel()
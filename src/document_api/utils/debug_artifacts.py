@@ -0,0 +1,183 @@
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from src.document_api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DebugArtifactSink:
+    """
+    Penampung gambar debug pra-pemrosesan yang menulis PNG di thread latar belakang,
+    sehingga kompresi PNG tidak lagi berada di jalur request.
+
+    Mode sampling (settings.DEBUG_SAMPLE_MODE):
+    - "all": semua request disimpan.
+    - "sample": hanya 1 dari DEBUG_SAMPLE_RATE request (ditentukan dari hash debug ID, sehingga
+      keputusan sama di semua proses worker).
+    - "error": gambar ditahan di memori dan hanya ditulis jika halaman gagal diproses.
+
+    Penulisan berhenti ketika total ukuran folder debug melewati DEBUG_DISK_BUDGET_MB.
+    Semua fitur hanya aktif ketika APP_DEBUG bernilai true.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = None
+        self._thread: threading.Thread = None
+        self._thread_pid: int = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Tuple[str, np.ndarray]]] = OrderedDict()
+        self._pending_bytes = 0
+        self._disk_bytes: int = None
+        self._budget_warned = False
+        self.stats = {"queued": 0, "written": 0, "dropped_queue_full": 0, "dropped_budget": 0}
+
+    # --- Keputusan sampling ---
+
+    @staticmethod
+    def _sampled(debug_id) -> bool:
+        rate = max(1, settings.DEBUG_SAMPLE_RATE)
+        if rate == 1:
+            return True
+        digest = hashlib.sha1(str(debug_id).encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") % rate == 0
+
+    def is_active(self, debug_id) -> bool:
+        """True jika gambar debug untuk debug_id ini akan direkam (cek sebelum komputasi khusus debug)."""
+        if not settings.APP_DEBUG:
+            return False
+        if settings.DEBUG_SAMPLE_MODE == "sample":
+            return self._sampled(debug_id)
+        return True
+
+    # --- API untuk pipeline ---
+
+    def save(self, debug_id, relative_path: str, image: np.ndarray):
+        """
+        Merekam satu gambar debug. `relative_path` relatif terhadap settings.DEBUG_FILE.
+        Gambar disalin saat dipanggil karena buffer pipeline bisa diubah setelahnya.
+        """
+        if image is None or not self.is_active(debug_id):
+            return
+        snapshot = image.copy()
+        if settings.DEBUG_SAMPLE_MODE == "error":
+            self._hold(str(debug_id), relative_path, snapshot)
+        else:
+            self._enqueue(relative_path, snapshot)
+
+    def flush(self, debug_id):
+        """Menulis gambar yang ditahan untuk debug_id (mode "error": dipanggil ketika halaman gagal)."""
+        with self._lock:
+            items = self._pending.pop(str(debug_id), [])
+            self._pending_bytes -= sum(image.nbytes for _, image in items)
+        if items:
+            logger.info(f"Menulis {len(items)} gambar debug untuk ID {debug_id} yang gagal diproses.")
+        for relative_path, image in items:
+            self._enqueue(relative_path, image)
+
+    def discard(self, debug_id):
+        """Membuang gambar yang ditahan untuk debug_id (mode "error": halaman berhasil diproses)."""
+        with self._lock:
+            items = self._pending.pop(str(debug_id), [])
+            self._pending_bytes -= sum(image.nbytes for _, image in items)
+
+    # --- Internal ---
+
+    def _hold(self, debug_id: str, relative_path: str, image: np.ndarray):
+        max_pending = settings.DEBUG_PENDING_MAX_MB * 1024 * 1024
+        with self._lock:
+            self._pending.setdefault(debug_id, []).append((relative_path, image))
+            self._pending_bytes += image.nbytes
+            # Batasi memori: buang gambar tertahan dari request paling lama lebih dulu.
+            while self._pending_bytes > max_pending and self._pending:
+                oldest_id = next(iter(self._pending))
+                items = self._pending[oldest_id]
+                _, dropped = items.pop(0)
+                self._pending_bytes -= dropped.nbytes
+                self.stats["dropped_budget"] += 1
+                if not items:
+                    del self._pending[oldest_id]
+
+    def _ensure_writer(self):
+        # Thread tidak ikut terwarisi setelah fork, jadi dibuat ulang per proses.
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue(maxsize=max(1, settings.DEBUG_QUEUE_SIZE))
+            self._thread = threading.Thread(target=self._writer_loop, name="debug-artifact-writer", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _enqueue(self, relative_path: str, image: np.ndarray):
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((relative_path, image))
+            self.stats["queued"] += 1
+        except queue.Full:
+            self.stats["dropped_queue_full"] += 1
+
+    def _folder_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(settings.DEBUG_FILE):
+            for file_name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file_name))
+                except OSError:
+                    pass
+        return total
+
+    def _writer_loop(self):
+        while True:
+            relative_path, image = self._queue.get()
+            try:
+                self._write(relative_path, image)
+            except Exception as e:
+                logger.warning(f"Gagal menulis gambar debug {relative_path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, relative_path: str, image: np.ndarray):
+        if self._disk_bytes is None:
+            self._disk_bytes = self._folder_size()
+        budget = settings.DEBUG_DISK_BUDGET_MB * 1024 * 1024
+        if self._disk_bytes >= budget:
+            self.stats["dropped_budget"] += 1
+            if not self._budget_warned:
+                logger.warning(f"Batas disk debug ({settings.DEBUG_DISK_BUDGET_MB} MB) tercapai, "
+                               f"gambar debug berikutnya tidak disimpan.")
+                self._budget_warned = True
+            return
+
+        path = os.path.join(settings.DEBUG_FILE, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if cv2.imwrite(path, image):
+            self._disk_bytes += os.path.getsize(path)
+            self.stats["written"] += 1
+
+    def drain(self, timeout: float = 5.0):
+        """Menunggu antrean ditulis (dipanggil saat proses berhenti)."""
+        if self._queue is None or self._thread_pid != os.getpid():
+            return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        done.wait(timeout)
+
+
+debug_artifacts = DebugArtifactSink()
+atexit.register(debug_artifacts.drain)
+
+
+def save_debug_image(debug_id, relative_path: str, image: np.ndarray):
+    """Shortcut untuk merekam gambar debug melalui sink global."""
+    debug_artifacts.save(debug_id, relative_path, image)
@@ -1,5 +1,4 @@
 import logging
-import os
 
 from werkzeug.utils import secure_filename
 
@@ -16,45 +15,42 @@ def allowed_file(filename: str) -> bool:
            filename.rsplit('.', 1)[1].lower() in settings.ALLOWED_EXTENSIONS
 
 
-def save_uploaded_file(file) -> tuple[str | None, str | None]:
+def read_uploaded_file(file) -> tuple[bytes | None, str | None, str | None]:
     """
-    Menyimpan file yang diunggah ke folder UPLOAD_FOLDER dengan return yang konsisten.
+    Memvalidasi file yang diunggah lalu membaca isinya ke memori, tanpa menulis ke UPLOAD_FOLDER.
+    Karena tidak ada file bersama di disk, upload bersamaan dengan nama file yang sama tidak
+    lagi saling menimpa.
 
     Args:
         file: Objek file dari request.files.
 
     Returns:
-        Sebuah tuple (file_path, error_message).
-        - Jika sukses: (str, None) -> ('/path/to/file.pdf', None)
-        - Jika gagal: (None, str) -> (None, "Pesan error di sini")
+        Sebuah tuple (data, file_name, error_message).
+        - Jika sukses: (bytes, str, None) -> (b'%PDF-...', 'dokumen.pdf', None)
+        - Jika gagal: (None, None, str) -> (None, None, "Pesan error di sini")
     """
     # Validasi 1: Apakah ada file yang benar-benar dikirim?
     if not file or file.filename == '':
         error_msg = "Tidak ada file yang dipilih atau nama file kosong."
         logger.warning(error_msg)
-        return None, error_msg
+        return None, None, error_msg
 
     # Validasi 2: Apakah format file diizinkan?
     if not allowed_file(file.filename):
         allowed = ", ".join(settings.ALLOWED_EXTENSIONS)
         error_msg = f"Format file tidak didukung. Hanya format berikut yang diizinkan: {allowed}"
         logger.warning(error_msg)
-        return None, error_msg
+        return None, None, error_msg
 
     try:
-        # Amankan nama file untuk mencegah masalah keamanan
+        # Nama file diamankan karena ikut dikembalikan di respons dan dipakai sebagai metadata
         filename = secure_filename(file.filename)
-        file_path = os.path.join(settings.UPLOAD_FOLDER, filename)
-
-        # Simpan file
-        file.save(file_path)
-        logger.info(f"File berhasil disimpan di: {file_path}")
-
-        # Jika sukses, kembalikan path dan None untuk error
-        return file_path, None
+        data = file.read()
+        logger.info(f"File {filename} berhasil dibaca ke memori ({len(data)} byte).")
+        return data, filename, None
 
     except Exception as e:
-        # Jika terjadi error apa pun saat menyimpan, catat dan kembalikan pesan error
-        error_msg = f"Gagal menyimpan file di server: {e}"
+        # Jika terjadi error apa pun saat membaca, catat dan kembalikan pesan error
+        error_msg = f"Gagal membaca file yang diunggah: {e}"
         logger.error(error_msg, exc_info=True)  # exc_info=True akan mencatat traceback
-        return None, "Terjadi kesalahan internal saat menyimpan file."
+        return None, None, "Terjadi kesalahan internal saat membaca file."
@@ -0,0 +1,67 @@
+import gzip
+
+from flask import Response, request
+
+from ..core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Brotli bersifat opsional; tanpa paket ini hanya gzip yang ditawarkan
+    brotli = None
+
+# Hanya respons teks yang dikompresi; gambar/arsip biasanya sudah terkompresi.
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/plain", "text/html")
+
+
+def _accepted_encodings() -> dict:
+    """Membaca Accept-Encoding beserta bobot q; encoding dengan q=0 dianggap ditolak."""
+    encodings = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Hook after_request: mengompresi respons JSON dengan br (jika paket brotli terinstal dan
+    diterima klien) atau gzip. Respons streaming (NDJSON/SSE), respons kecil di bawah
+    RESPONSE_COMPRESSION_MIN_BYTES, dan respons yang sudah ber-Content-Encoding dilewati.
+    """
+    if (not settings.RESPONSE_COMPRESSION or response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    accepted = _accepted_encodings()
+    if brotli is not None and accepted.get("br", 0) > 0:
+        encoding = "br"
+    elif accepted.get("gzip", 0) > 0:
+        encoding = "gzip"
+    else:
+        return response
+
+    body = response.get_data()
+    if len(body) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    if encoding == "br":
+        # Pada level yang sama, brotli umumnya menghasilkan body lebih kecil dari gzip.
+        compressed = brotli.compress(body, quality=min(11, settings.RESPONSE_COMPRESSION_LEVEL))
+    else:
+        compressed = gzip.compress(body, compresslevel=min(9, settings.RESPONSE_COMPRESSION_LEVEL))
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,169 @@
+import io
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+
+logger = logging.getLogger(__name__)
+
+# Ukuran halaman A4 dalam inci (lebar, tinggi), acuan estimasi resolusi foto dokumen.
+A4_INCHES = (8.27, 11.69)
+# Gambar hanya diperkecil jika resolusinya melebihi target lebih dari toleransi ini.
+DOWNSCALE_TOLERANCE = 1.1
+
+# Di atas faktor ini INTER_LINEAR setara kualitasnya dengan INTER_AREA tetapi beberapa kali lebih cepat.
+AREA_INTERPOLATION_BELOW = 0.5
+
+_REDUCED_COLOR_FLAGS = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def estimate_page_dpi(width: int, height: int) -> float:
+    """
+    Memperkirakan resolusi efektif (dpi) dengan asumsi gambar memuat satu halaman A4 penuh.
+    Diambil nilai terkecil dari kedua sisi agar foto dengan margin tidak diperkecil berlebihan.
+    """
+    long_side, short_side = max(width, height), min(width, height)
+    return min(long_side / A4_INCHES[1], short_side / A4_INCHES[0])
+
+
+def read_image_size(source: Union[str, bytes]) -> Optional[Tuple[int, int]]:
+    """Membaca (lebar, tinggi) dari header gambar lewat PIL tanpa men-decode piksel."""
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            return image.size
+    except Exception as e:
+        logger.debug(f"Ukuran gambar tidak bisa dibaca dari header: {e}")
+        return None
+
+
+def _resize(image: np.ndarray, factor: float) -> np.ndarray:
+    height, width = image.shape[:2]
+    new_size = (max(1, round(width * factor)), max(1, round(height * factor)))
+    interpolation = cv2.INTER_AREA if factor < AREA_INTERPOLATION_BELOW else cv2.INTER_LINEAR
+    return cv2.resize(image, new_size, interpolation=interpolation)
+
+
+def _decode(source: Union[str, bytes], flag: int) -> Optional[np.ndarray]:
+    if isinstance(source, bytes):
+        return cv2.imdecode(np.frombuffer(source, dtype=np.uint8), flag)
+    return cv2.imread(source, flag)
+
+
+def normalize_resolution(image: np.ndarray, target_dpi: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Memperkecil gambar yang sudah di-decode ke target_dpi jika resolusi
+    efektifnya jauh di atas target. Gambar yang sudah cukup kecil dikembalikan apa adanya.
+    """
+    height, width = image.shape[:2]
+    estimated_dpi = estimate_page_dpi(width, height)
+    info = {"original_size": [width, height], "estimated_dpi": round(estimated_dpi, 1), "decode_reduction": 1}
+    if target_dpi and estimated_dpi > target_dpi * DOWNSCALE_TOLERANCE:
+        image = _resize(image, target_dpi / estimated_dpi)
+    info["final_size"] = [image.shape[1], image.shape[0]]
+    return image, info
+
+
+def load_image(source: Union[str, bytes], target_dpi: int = 300) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+    """
+    Membaca gambar BGR dari path atau bytes dan menormalkan resolusinya ke target_dpi.
+
+    Ukuran dibaca dari header lebih dulu; jika gambar jauh lebih besar dari target (mis. foto
+    ponsel 48 MP), gambar di-decode langsung pada resolusi 1/2, 1/4, atau 1/8 dengan
+    IMREAD_REDUCED_COLOR_* (untuk JPEG, libjpeg men-decode pada skala kecil sehingga gambar
+    ukuran penuh tidak pernah dibuat), lalu sisa skalanya diselesaikan dengan cv2.resize.
+    target_dpi 0 menonaktifkan normalisasi.
+
+    Returns:
+        (gambar_bgr atau None jika gagal di-decode, info_resolusi)
+    """
+    size = read_image_size(source) if target_dpi else None
+    if size is None:
+        image = _decode(source, cv2.IMREAD_COLOR)
+        if image is None:
+            return None, {}
+        return normalize_resolution(image, target_dpi)
+
+    width, height = size
+    estimated_dpi = estimate_page_dpi(width, height)
+    scale = target_dpi / estimated_dpi
+    reduction = 1
+    for factor in (8, 4, 2):
+        if scale * factor <= 1.0:
+            reduction = factor
+            break
+
+    image = _decode(source, _REDUCED_COLOR_FLAGS[reduction] if reduction > 1 else cv2.IMREAD_COLOR)
+    if image is None:
+        return None, {}
+    if reduction > 1:
+        logger.info(f"Gambar {width}x{height} (~{estimated_dpi:.0f} dpi) di-decode pada skala 1/{reduction}.")
+
+    info = {"original_size": [width, height], "estimated_dpi": round(estimated_dpi, 1), "decode_reduction": reduction}
+    # Sisa pengecilan relatif terhadap gambar hasil decode (orientasi EXIF sudah diterapkan OpenCV).
+    remaining = scale * reduction
+    if estimated_dpi > target_dpi * DOWNSCALE_TOLERANCE and remaining < 0.999:
+        image = _resize(image, remaining)
+    info["final_size"] = [image.shape[1], image.shape[0]]
+    return image, info
+
+
+def _frame_to_array(frame: Image.Image) -> np.ndarray:
+    """
+    Frame PIL menjadi array OpenCV: bilevel/grayscale tetap 2D, selain itu BGR.
+
+    Frame 16-bit (I;16) diskalakan ke 8-bit dengan membuang 8 bit bawah, sedangkan frame
+    integer 32-bit (I) dan float (F) dinormalkan min-max ke 0..255; convert("L") memotong
+    nilai di atas 255 sehingga seluruh halaman menjadi putih.
+    """
+    # Semua cabang menghasilkan salinan yang bisa ditulis (pipeline memproses in-place).
+    if frame.mode in ("1", "L"):
+        return np.array(frame.convert("L"))
+    if frame.mode.startswith("I;16"):
+        return (np.asarray(frame, dtype=np.uint16) >> 8).astype(np.uint8)
+    if frame.mode in ("I", "F"):
+        return cv2.normalize(np.asarray(frame, dtype=np.float32), None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+    return cv2.cvtColor(np.asarray(frame.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+
+def _square_pixels(image: np.ndarray, frame: Image.Image) -> np.ndarray:
+    """
+    Fax "normal" menyimpan resolusi vertikal setengah dari horizontal (mis. 204x98 dpi).
+    Sumbu beresolusi rendah diregangkan agar piksel persegi dan huruf tidak gepeng.
+    """
+    dpi = frame.info.get("dpi")
+    if not dpi or not dpi[0] or not dpi[1]:
+        return image
+    dpi = (float(dpi[0]), float(dpi[1]))  # TIFF menyimpan dpi sebagai IFDRational
+    if abs(dpi[0] - dpi[1]) / max(dpi) < 0.05:
+        return image
+    height, width = image.shape[:2]
+    if dpi[0] > dpi[1]:
+        new_size = (width, round(height * dpi[0] / dpi[1]))
+    else:
+        new_size = (round(width * dpi[1] / dpi[0]), height)
+    return cv2.resize(image, new_size, interpolation=cv2.INTER_LINEAR)
+
+
+def iter_image_frames(source: Union[str, bytes],
+                      target_dpi: int = 300) -> Iterator[Tuple[int, np.ndarray, Dict[str, Any]]]:
+    """
+    Men-decode gambar multi-frame (TIFF hasil scan/fax) satu frame per langkah.
+
+    Frame dibaca lewat PIL ImageSequence yang hanya men-decode frame yang sedang diminta,
+    sehingga memori dibatasi oleh satu frame, bukan seluruh bundel (cv2.imreadmulti memuat
+    semua frame sekaligus). Setiap frame dinormalkan ke target_dpi seperti load_image.
+
+    Yields:
+        (indeks_frame, gambar (BGR atau grayscale 2D), info_resolusi)
+
+    Raises:
+        OSError / PIL.UnidentifiedImageError jika data bukan gambar yang bisa dibaca.
+    """
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as container:
+        for frame_index, frame in enumerate(ImageSequence.Iterator(container)):
+            image = _square_pixels(_frame_to_array(frame), frame)
+            image, info = normalize_resolution(image, target_dpi)
+            info["frame_mode"] = frame.mode
+            yield frame_index, image, info
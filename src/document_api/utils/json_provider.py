@@ -0,0 +1,122 @@
+import logging
+from typing import Any
+
+import numpy as np
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider, _default as flask_default
+
+try:
+    import orjson
+except ImportError:  # Encoder cepat bersifat opsional; json standar dipakai sebagai fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def numpy_default(value: Any) -> Any:
+    """
+    Hook `default` JSON untuk tipe NumPy (skalar dan array), diteruskan ke hook bawaan Flask
+    (tanggal, dataclass, UUID, Decimal) untuk tipe lain. Hanya dipanggil untuk nilai yang tidak
+    bisa di-serialize langsung, sehingga struktur data tidak perlu dibangun ulang.
+    """
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return flask_default(value)
+
+
+def select_fields(data: Any, fields: str) -> Any:
+    """
+    Memilih field respons berdasarkan parameter `fields` (dipisah koma, boleh bertitik untuk field
+    bersarang). Nama biasa menyertakan hanya field tersebut, awalan "-" membuang field.
+    Contoh: "fields=file_name,entities" atau "fields=-text,-information.text".
+    Diterapkan pada dict, atau pada setiap elemen jika data berupa list.
+    """
+    if isinstance(data, list):
+        return [select_fields(item, fields) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    include, exclude = [], []
+    for field in fields.split(","):
+        field = field.strip()
+        if field.startswith("-") and len(field) > 1:
+            exclude.append(field[1:].split("."))
+        elif field:
+            include.append(field.split("."))
+
+    if include:
+        data = _include_paths(data, include)
+    for path in exclude:
+        data = _exclude_path(data, path)
+    return data
+
+
+def _include_paths(data: dict, paths: list) -> dict:
+    nested = {}
+    for path in paths:
+        if path[0] in data:
+            nested.setdefault(path[0], []).append(path[1:])
+    selected = {}
+    for key, subpaths in nested.items():
+        value = data[key]
+        if any(not subpath for subpath in subpaths) or not isinstance(value, (dict, list)):
+            selected[key] = value
+        elif isinstance(value, list):
+            selected[key] = [_include_paths(item, subpaths) if isinstance(item, dict) else item for item in value]
+        else:
+            selected[key] = _include_paths(value, subpaths)
+    return selected
+
+
+def _exclude_path(data: Any, path: list) -> Any:
+    if isinstance(data, list):
+        return [_exclude_path(item, path) for item in data]
+    if not isinstance(data, dict) or path[0] not in data:
+        return data
+    if len(path) == 1:
+        return {key: value for key, value in data.items() if key != path[0]}
+    return dict(data, **{path[0]: _exclude_path(data[path[0]], path[1:])})
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON Flask yang men-serialize tipe NumPy (mis. skor np.float32 dari pipeline NER)
+    secara native. Memakai orjson jika terinstal (OPT_SERIALIZE_NUMPY, langsung ke bytes),
+    jika tidak memakai json standar dengan hook numpy_default. Respons `jsonify` juga
+    menghormati parameter query `fields` untuk memilih/membuang field di dalam "data".
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return self._orjson_dumps(obj).decode("utf-8")
+        kwargs.setdefault("default", numpy_default)
+        return super().dumps(obj, **kwargs)
+
+    def _orjson_dumps(self, obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=numpy_default, option=option)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        fields = request.args.get("fields") if has_request_context() else None
+        if fields and isinstance(obj, dict) and "data" in obj:
+            obj = dict(obj, data=select_fields(obj["data"], fields))
+
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is not None:
+            body = self._orjson_dumps(obj, indent=pretty) + b"\n"
+        elif pretty:
+            body = f"{self.dumps(obj, indent=2)}\n"
+        else:
+            body = f"{self.dumps(obj, separators=(',', ':'))}\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
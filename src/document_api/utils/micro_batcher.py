@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Jumlah sampel delay antrean terakhir yang disimpan untuk persentil di /metrics
+DELAY_SAMPLES = 1024
+
+
+class _PendingItem:
+    __slots__ = ("item", "enqueued_at", "done", "result", "error")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+
+
+class MicroBatcher:
+    """
+    Menggabungkan panggilan bersamaan dari banyak thread request menjadi satu batch.
+
+    `submit(item)` memblokir pemanggil sampai hasilnya siap. Thread batcher mengambil item
+    pertama di antrean, menunggu paling lama `max_wait_ms` sejak item itu masuk (atau sampai
+    `max_batch_size` item terkumpul), lalu memanggil `process_batch(items)` sekali dan
+    membagikan hasil ke masing-masing pemanggil sesuai urutan. Exception dari `process_batch`
+    diteruskan ke semua pemanggil dalam batch tersebut.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Sequence[Any]], max_batch_size: int,
+                 max_wait_ms: float, name: str = "micro-batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread = None
+        self._thread_pid: int = None
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Dict[int, int] = {}
+        self._queue_delays: deque = deque(maxlen=DELAY_SAMPLES)
+        self._stats = {"batches": 0, "items": 0, "errors": 0, "batch_seconds": 0.0}
+
+    def submit(self, item: Any) -> Any:
+        """Memasukkan item ke antrean batch dan menunggu hasilnya."""
+        self._ensure_worker()
+        pending = _PendingItem(item)
+        with self._cond:
+            self._queue.append(pending)
+            self._cond.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def stats(self) -> Dict[str, Any]:
+        """Counter batch: distribusi ukuran batch dan delay antrean (ms) dari sampel terakhir."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            delays = sorted(self._queue_delays)
+            histogram = dict(sorted(self._batch_sizes.items()))
+        batches = stats.pop("batches")
+        batch_seconds = stats.pop("batch_seconds")
+        stats.update({
+            "batches": batches,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": len(self._queue),
+            "batch_size_mean": round(stats["items"] / batches, 2) if batches else 0.0,
+            "batch_size_histogram": histogram,
+            "batch_ms_mean": round(batch_seconds / batches * 1000, 2) if batches else 0.0,
+            "queue_delay_ms": {
+                "p50": round(delays[len(delays) // 2] * 1000, 2) if delays else 0.0,
+                "p95": round(delays[int(len(delays) * 0.95)] * 1000, 2) if delays else 0.0,
+                "max": round(delays[-1] * 1000, 2) if delays else 0.0
+            }
+        })
+        return stats
+
+    # --- Internal ---
+
+    def _ensure_worker(self):
+        # Thread tidak ikut terwarisi setelah fork, jadi dibuat ulang per proses.
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue.clear()
+            self._thread = threading.Thread(target=self._worker_loop, name=self.name, daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+            logger.info(f"Thread {self.name} dimulai (batch maks: {self.max_batch_size}, "
+                        f"jendela: {self.max_wait * 1000:.1f} ms).")
+
+    def _next_batch(self) -> List[_PendingItem]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch_size))]
+
+    def _worker_loop(self):
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            failed = False
+            try:
+                results = self.process_batch([pending.item for pending in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: jumlah hasil ({len(results)}) tidak sama "
+                                       f"dengan ukuran batch ({len(batch)}).")
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                failed = True
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+            self._record(batch, started, failed)
+
+    def _record(self, batch: List[_PendingItem], started: float, failed: bool):
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["batch_seconds"] += elapsed
+            if failed:
+                self._stats["errors"] += 1
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            self._queue_delays.extend(started - pending.enqueued_at for pending in batch)
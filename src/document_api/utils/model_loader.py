@@ -0,0 +1,94 @@
+import logging
+import os
+
+from transformers import AutoTokenizer, Pipeline, pipeline
+
+from ..core.config import settings
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import (ORTModelForSequenceClassification, ORTModelForTokenClassification,
+                                     ORTQuantizer)
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:  # Backend ONNX bersifat opsional (pip install "optimum[onnxruntime]")
+    onnxruntime = None
+
+logger = logging.getLogger(__name__)
+
+ONNX_FILE_NAME = "model.onnx"
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def _ort_model_class(task: str):
+    if task == "text-classification":
+        return ORTModelForSequenceClassification
+    if task in ("ner", "token-classification"):
+        return ORTModelForTokenClassification
+    raise ValueError(f"Task tanpa dukungan backend ONNX: {task}")
+
+
+def _session_options():
+    options = onnxruntime.SessionOptions()
+    # intra_op 1 = ONNX Runtime tidak membuat thread pool sendiri; thread pool yang dibuat di master
+    # tidak ikut ter-fork ke worker gunicorn (preload_app) dan bisa membuat inferensi macet.
+    options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = 1
+    return options
+
+
+def _export_onnx(task: str, model_name_or_path: str) -> str:
+    """
+    Mengekspor model ke ONNX (dan mengkuantisasi int8 dinamis jika ONNX_QUANTIZE) sekali ke
+    ONNX_CACHE_DIR/<nama model>/{fp32,int8-<target>}. Hasil ekspor dipakai ulang pada start
+    berikutnya; hapus folder tersebut jika model di Hugging Face diperbarui. Target kuantisasi
+    menjadi bagian nama folder, sehingga mengganti ONNX_QUANTIZATION_TARGET memicu kuantisasi ulang.
+    """
+    model_dir = os.path.join(settings.ONNX_CACHE_DIR, model_name_or_path.strip("/").replace("/", "--"))
+    fp32_dir = os.path.join(model_dir, "fp32")
+    if not os.path.exists(os.path.join(fp32_dir, ONNX_FILE_NAME)):
+        logger.info(f"Mengekspor model '{model_name_or_path}' ke ONNX di {fp32_dir}...")
+        model = _ort_model_class(task).from_pretrained(model_name_or_path, export=True)
+        model.save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(model_name_or_path).save_pretrained(fp32_dir)
+    if not settings.ONNX_QUANTIZE:
+        return fp32_dir
+
+    int8_dir = os.path.join(model_dir, f"int8-{settings.ONNX_QUANTIZATION_TARGET}")
+    if not os.path.exists(os.path.join(int8_dir, QUANTIZED_FILE_NAME)):
+        logger.info(f"Kuantisasi int8 dinamis ({settings.ONNX_QUANTIZATION_TARGET}) untuk '{model_name_or_path}'...")
+        quantization_config = getattr(AutoQuantizationConfig, settings.ONNX_QUANTIZATION_TARGET)(
+            is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name=ONNX_FILE_NAME)
+        quantizer.quantize(save_dir=int8_dir, quantization_config=quantization_config)
+        AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(int8_dir)
+    return int8_dir
+
+
+def load_pipeline(task: str, model_name_or_path: str, **pipeline_kwargs) -> Pipeline:
+    """
+    Memuat pipeline Hugging Face untuk `task` sesuai settings.MODEL_BACKEND:
+    "transformers" (bobot full-precision) atau "onnx" (ONNX Runtime, opsional int8).
+    Keduanya mengembalikan objek pipeline yang sama antarmukanya, sehingga service tidak
+    perlu tahu backend mana yang dipakai. Jika paket optimum/onnxruntime tidak terinstal,
+    backend transformers dipakai sebagai fallback.
+    """
+    backend = (settings.MODEL_BACKEND or "transformers").lower()
+    if backend == "onnx" and onnxruntime is None:
+        logger.warning("MODEL_BACKEND=onnx tetapi paket optimum[onnxruntime] tidak terinstal, memakai transformers.")
+        backend = "transformers"
+    elif backend not in ("onnx", "transformers"):
+        raise ValueError(f"Backend model tidak dikenal: {backend}")
+
+    if backend == "transformers":
+        return pipeline(task, model=model_name_or_path, tokenizer=model_name_or_path, **pipeline_kwargs)
+
+    model_dir = _export_onnx(task, model_name_or_path)
+    model = _ort_model_class(task).from_pretrained(
+        model_dir,
+        file_name=QUANTIZED_FILE_NAME if settings.ONNX_QUANTIZE else ONNX_FILE_NAME,
+        provider="CPUExecutionProvider",
+        session_options=_session_options()
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    logger.info(f"Model '{model_name_or_path}' dimuat dengan ONNX Runtime dari {model_dir}.")
+    return pipeline(task, model=model, tokenizer=tokenizer, **pipeline_kwargs)
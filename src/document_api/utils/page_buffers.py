@@ -0,0 +1,48 @@
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class PageBufferPool:
+    """
+    Kumpulan buffer numpy bernama yang dipakai ulang antar halaman.
+
+    Halaman dari dokumen yang sama hampir selalu berukuran sama, sehingga setelah halaman
+    pertama setiap tahap pra-pemrosesan menulis ke buffer yang sudah ada alih-alih
+    mengalokasikan array baru seukuran halaman. Buffer hanya dialokasikan ulang jika
+    bentuk atau dtype-nya berubah.
+
+    Pool tidak thread-safe; gunakan page_buffers() yang memberikan satu pool per thread
+    (dan dengan sendirinya per proses worker).
+    """
+
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Mengembalikan buffer `name` dengan bentuk dan dtype yang diminta (isi tidak diinisialisasi)."""
+        dtype = np.dtype(dtype)
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer
+
+    def nbytes(self) -> int:
+        """Total byte yang ditahan oleh pool."""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+
+
+_local = threading.local()
+
+
+def page_buffers() -> PageBufferPool:
+    """Mengembalikan PageBufferPool milik thread saat ini."""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = PageBufferPool()
+    return pool
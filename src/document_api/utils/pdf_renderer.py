@@ -0,0 +1,313 @@
+import contextlib
+import glob
+import logging
+import os
+import subprocess
+import tempfile
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PopplerError(RuntimeError):
+    """Dilemparkan ketika perintah Poppler gagal dijalankan atau hasilnya tidak bisa dibaca."""
+    pass
+
+
+def poppler_binary(name: str, poppler_path: str = None) -> str:
+    """
+    Mengembalikan path executable Poppler (mis. 'pdftoppm').
+    Jika poppler_path kosong, executable dicari melalui PATH sistem.
+    """
+    return os.path.join(poppler_path, name) if poppler_path else name
+
+
+# Sumber PDF: path file di disk, atau isi PDF (bytes) yang dikirim ke Poppler lewat stdin.
+PDFSource = Union[str, bytes]
+
+
+def _pdf_input(pdf_source: PDFSource) -> Tuple[str, Optional[bytes]]:
+    """Mengembalikan argumen file untuk Poppler dan data stdin ("-" jika PDF berada di memori)."""
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return "-", bytes(pdf_source)
+    return pdf_source, None
+
+
+@contextlib.contextmanager
+def spooled_pdf(pdf_source: PDFSource) -> Iterator[str]:
+    """
+    Menyediakan path file untuk sumber PDF. Isi PDF di memori ditulis sekali ke file sementara
+    bernama unik (mkstemp, hanya bisa dibaca pemilik proses) lalu dihapus saat konteks selesai,
+    sehingga banyak panggilan Poppler membaca file yang sama alih-alih menerima seluruh PDF lewat
+    stdin pada setiap panggilan. Sumber berupa path diteruskan apa adanya.
+    """
+    if not isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        yield pdf_source
+        return
+    fd, path = tempfile.mkstemp(prefix="ocr_upload_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_source)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"File PDF sementara tidak bisa dihapus ({path}): {e}")
+
+
+def _run_poppler(command: list, input_data: bytes = None) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(command, input=input_data, capture_output=True)
+    except OSError as e:
+        raise PopplerError(f"Executable Poppler tidak bisa dijalankan ({command[0]}): {e}")
+
+
+COLOR_MODES = ("color", "gray", "auto")
+
+
+def _parse_pnm_header(header: bytes) -> Tuple[bytes, int, int, int, int]:
+    """
+    Mengurai header PNM biner (P5/P6): magic, lebar, tinggi, maxval, dan offset awal data piksel.
+    Komentar (#) diabaikan; data dimulai tepat satu karakter whitespace setelah maxval.
+    """
+    tokens = []
+    pos = 0
+    while len(tokens) < 4:
+        while pos < len(header) and header[pos:pos + 1].isspace():
+            pos += 1
+        if header[pos:pos + 1] == b"#":
+            pos = header.index(b"\n", pos) + 1
+            continue
+        start = pos
+        while pos < len(header) and not header[pos:pos + 1].isspace():
+            pos += 1
+        if start == pos:
+            raise ValueError("Header PNM terpotong.")
+        tokens.append(header[start:pos])
+    magic, width, height, maxval = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+    return magic, width, height, maxval, pos + 1
+
+
+def _read_pnm(page_file: str, gray: bool) -> np.ndarray:
+    """
+    Membaca halaman PPM/PGM hasil pdftoppm langsung sebagai array numpy.
+
+    Data piksel di-memory-map (copy-on-write) tanpa decode: raster grayscale langsung
+    dipakai pipeline tanpa salinan, raster warna hanya disalin sekali saat urutan channel
+    RGB dibalik ke BGR. File boleh dihapus setelahnya karena mapping tetap valid (POSIX);
+    di Windows file yang masih di-map tidak bisa dihapus, jadi data dibaca dengan np.fromfile.
+    Format yang tidak terduga (mis. maxval 16-bit) dibaca lewat cv2.imread.
+    """
+    with open(page_file, "rb") as f:
+        header = f.read(512)
+    try:
+        magic, width, height, maxval, offset = _parse_pnm_header(header)
+    except ValueError:
+        magic, maxval = None, None
+
+    if magic != (b"P5" if gray else b"P6") or maxval != 255:
+        return cv2.imread(page_file, cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR)
+
+    shape = (height, width) if gray else (height, width, 3)
+    if os.name == "nt":
+        pixels = np.fromfile(page_file, dtype=np.uint8, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    else:
+        pixels = np.memmap(page_file, dtype=np.uint8, mode="c", offset=offset, shape=shape).view(np.ndarray)
+    if gray:
+        return pixels
+    return cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+
+
+def _render_window(pdftoppm: str, pdf_source: PDFSource, dpi: int, first_page: int,
+                   last_page: Optional[int], gray: bool = False) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Merender halaman first_page..last_page (1-based, inklusif; last_page None = sampai halaman
+    terakhir) ke folder sementara dan menghasilkan gambarnya satu per satu. Menghasilkan nol
+    halaman jika first_page sudah melewati halaman terakhir dokumen.
+
+    Dengan gray=True, Poppler langsung menghasilkan raster grayscale 8-bit (PGM), sepertiga
+    ukuran raster BGR dan tanpa konversi warna.
+    """
+    pdf_argument, input_data = _pdf_input(pdf_source)
+    with tempfile.TemporaryDirectory(prefix="ocr_pages_") as tmp_dir:
+        output_root = os.path.join(tmp_dir, "page")
+        command = [pdftoppm, "-r", str(dpi), "-f", str(first_page)]
+        if last_page is not None:
+            command += ["-l", str(last_page)]
+        if gray:
+            command.append("-gray")
+        command += [pdf_argument, output_root]
+        process = _run_poppler(command, input_data)
+        if process.returncode != 0:
+            stderr = process.stderr.decode("utf-8", errors="ignore").strip()
+            # Halaman awal jendela sudah melewati halaman terakhir dokumen: tidak ada halaman.
+            if first_page > 1 and "Wrong page range" in stderr:
+                return
+            raise PopplerError(f"pdftoppm gagal (kode {process.returncode}): {stderr}")
+
+        # Nama file memakai padding nol yang seragam, sehingga urutan leksikal = urutan halaman.
+        page_files = sorted(glob.glob(f"{output_root}*.{'pgm' if gray else 'ppm'}"))
+        logger.info(f"Halaman {first_page}-{first_page + len(page_files) - 1} PDF berhasil dirender "
+                    f"({'grayscale' if gray else 'warna'}, {dpi} dpi).")
+
+        for offset, page_file in enumerate(page_files):
+            image = _read_pnm(page_file, gray)
+            os.remove(page_file)
+            if image is None:
+                raise PopplerError(f"Gagal membaca hasil render halaman: {page_file}")
+            yield first_page - 1 + offset, image
+            del image
+
+
+def _page_runs(page_indices: Sequence[int], window: int,
+               key: Callable[[int], bool] = None) -> List[Tuple[int, int, bool]]:
+    """
+    Mengelompokkan indeks halaman (0-based, terurut) menjadi rentang berurutan (awal, akhir, key)
+    sepanjang paling banyak `window` halaman, agar setiap rentang dirender dalam satu panggilan
+    pdftoppm. Dengan `key`, rentang juga diputus ketika key(indeks) berubah.
+    """
+    runs = []
+    for page_index in page_indices:
+        value = key(page_index) if key is not None else None
+        if (runs and page_index == runs[-1][1] + 1 and runs[-1][2] == value
+                and runs[-1][1] - runs[-1][0] + 1 < window):
+            runs[-1][1] = page_index
+        else:
+            runs.append([page_index, page_index, value])
+    return [tuple(run) for run in runs]
+
+
+def _iter_auto_block(pdftoppm: str, pdf_source: PDFSource, dpi: int, first_page: int, last_page: int,
+                     probe_dpi: int, needs_color: Callable[[np.ndarray, int], bool]):
+    """
+    Satu blok mode "auto": halaman first_page..last_page dirender pada probe_dpi dalam satu panggilan
+    pdftoppm, lalu halaman berurutan dengan keputusan warna yang sama dirender resolusi penuh
+    bersama. Mengembalikan (lewat StopIteration.value) jumlah halaman yang ada di blok.
+    """
+    decisions = {}
+    for page_index, thumbnail in _render_window(pdftoppm, pdf_source, probe_dpi, first_page, last_page):
+        decisions[page_index] = bool(needs_color(thumbnail, page_index))
+        del thumbnail
+    for first_index, last_index, color in _page_runs(sorted(decisions), len(decisions), decisions.get):
+        yield from _render_window(pdftoppm, pdf_source, dpi, first_index + 1, last_index + 1, gray=not color)
+    return len(decisions)
+
+
+def _iter_auto_pages(pdftoppm: str, pdf_source: PDFSource, dpi: int, window: int,
+                     page_indices: Optional[Sequence[int]], probe_dpi: int,
+                     needs_color: Callable[[np.ndarray, int], bool]) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Mode warna "auto": halaman diproses per blok `window` halaman. Setiap blok lebih dulu
+    dirender pada probe_dpi (satu panggilan pdftoppm, gambar kecil dibuang setelah dinilai),
+    needs_color(gambar_kecil, indeks_halaman) menentukan halaman yang dirender berwarna, lalu
+    render resolusi penuh blok tersebut dihasilkan sebelum blok berikutnya di-probe. Halaman
+    pertama tidak menunggu seluruh dokumen di-probe dan file sementara tetap dibatasi satu blok.
+    """
+    if page_indices is not None:
+        # Halaman yang diminta dikelompokkan per rentang berurutan (maks. `window` halaman) per blok.
+        for first_index, last_index, _ in _page_runs(page_indices, window):
+            yield from _iter_auto_block(pdftoppm, pdf_source, dpi, first_index + 1, last_index + 1,
+                                        probe_dpi, needs_color)
+        return
+
+    first_page = 1
+    while True:
+        last_page = first_page + window - 1
+        probed = yield from _iter_auto_block(pdftoppm, pdf_source, dpi, first_page, last_page, probe_dpi, needs_color)
+        if probed < window:
+            return
+        first_page = last_page + 1
+
+
+def iter_pdf_pages(pdf_source: PDFSource, dpi: int = 300, poppler_path: str = None, window: int = 4,
+                   page_indices: Sequence[int] = None, color_mode: str = "color", probe_dpi: int = 75,
+                   needs_color: Callable[[np.ndarray, int], bool] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Merender halaman PDF secara bertahap dan menghasilkan (indeks_halaman, gambar) satu per satu.
+    pdf_source berupa path file atau isi PDF (bytes, dikirim ke pdftoppm lewat stdin).
+
+    Setiap panggilan pdftoppm hanya merender `window` halaman ke folder sementara, sehingga
+    pemakaian memori tidak bergantung pada jumlah halaman dokumen. Tanpa `page_indices`,
+    jumlah halaman tidak ditanyakan lebih dulu (tanpa pdfinfo); iterasi berhenti ketika
+    Poppler tidak lagi menghasilkan halaman. Dengan `page_indices` (0-based, terurut),
+    hanya halaman tersebut yang dirender.
+
+    color_mode menentukan format raster: "color" (BGR 3 channel), "gray" (grayscale 2D
+    langsung dari Poppler), atau "auto" (per halaman, memakai pre-render resolusi rendah per blok
+    dan needs_color; lihat _iter_auto_pages).
+
+    Raises:
+        PopplerError: Jika pdftoppm gagal atau file hasil render tidak bisa dibaca.
+    """
+    window = max(1, int(window))
+    if color_mode not in COLOR_MODES:
+        raise ValueError(f"color_mode tidak dikenal: {color_mode} (pilihan: {', '.join(COLOR_MODES)})")
+    pdftoppm = poppler_binary("pdftoppm", poppler_path)
+
+    if color_mode == "auto" and needs_color is not None:
+        yield from _iter_auto_pages(pdftoppm, pdf_source, dpi, window, page_indices, probe_dpi, needs_color)
+        return
+
+    gray = color_mode == "gray"
+    if page_indices is not None:
+        # Kelompokkan halaman berurutan agar tetap dirender per jendela, bukan per halaman.
+        for first_index, last_index, _ in _page_runs(page_indices, window):
+            yield from _render_window(pdftoppm, pdf_source, dpi, first_index + 1, last_index + 1, gray=gray)
+        return
+
+    first_page = 1
+    while True:
+        last_page = first_page + window - 1
+        rendered = 0
+        for page in _render_window(pdftoppm, pdf_source, dpi, first_page, last_page, gray=gray):
+            rendered += 1
+            yield page
+            del page
+        if rendered < window:
+            return
+        first_page = last_page + 1
+
+
+def extract_pdf_text_layer(pdf_source: PDFSource, poppler_path: str = None) -> List[str]:
+    """
+    Mengambil text layer bawaan PDF per halaman menggunakan pdftotext (mode -layout agar
+    struktur baris mirip hasil OCR PSM 6). Halaman hasil pindaian menghasilkan string kosong.
+    pdf_source berupa path file atau isi PDF (bytes, dikirim lewat stdin).
+
+    Returns:
+        List teks, satu elemen per halaman.
+
+    Raises:
+        PopplerError: Jika pdftotext gagal dijalankan.
+    """
+    pdftotext = poppler_binary("pdftotext", poppler_path)
+    pdf_argument, input_data = _pdf_input(pdf_source)
+    process = _run_poppler([pdftotext, "-layout", "-enc", "UTF-8", pdf_argument, "-"], input_data)
+    if process.returncode != 0:
+        stderr = process.stderr.decode("utf-8", errors="ignore").strip()
+        raise PopplerError(f"pdftotext gagal (kode {process.returncode}): {stderr}")
+
+    # pdftotext mengakhiri setiap halaman dengan form feed; elemen terakhir setelah split kosong.
+    pages = process.stdout.decode("utf-8", errors="replace").split("\f")
+    if pages and pages[-1] == "":
+        pages = pages[:-1]
+    return pages
+
+
+def is_usable_text_layer(text: str, min_chars: int = 50, min_alnum_ratio: float = 0.6) -> bool:
+    """
+    Menilai apakah text layer sebuah halaman layak dipakai langsung tanpa OCR.
+    Teks harus cukup panjang dan didominasi huruf/angka; font tanpa pemetaan Unicode
+    biasanya menghasilkan simbol acak yang gagal pada rasio ini.
+    """
+    if not text:
+        return False
+    visible_chars = [char for char in text if not char.isspace()]
+    alnum_count = sum(1 for char in visible_chars if char.isalnum())
+    if alnum_count < min_chars:
+        return False
+    return alnum_count / len(visible_chars) >= min_alnum_ratio
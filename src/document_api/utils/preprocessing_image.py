@@ -2,6 +2,8 @@ import logging
 import os
 import random
 from src.document_api.core.config import settings
+from src.document_api.utils.debug_artifacts import debug_artifacts, save_debug_image
+from src.document_api.utils.page_buffers import page_buffers
 import cv2
 import numpy as np
 
@@ -9,117 +11,176 @@ import numpy as np
 logger = logging.getLogger(__name__)
 
 
-def remove_stamp_and_signature(image_bgr: np.ndarray, page_number: int = 0, id_numerik=None) -> np.ndarray:
+# Rentang warna HSV (batas bawah, batas atas) untuk tinta stempel dan tanda tangan.
+STAMP_HSV_RANGES = [
+    ("blue", (90, 50, 50), (130, 255, 255)),
+    ("purple", (130, 40, 40), (170, 255, 255)),
+    ("cyan", (80, 50, 50), (100, 255, 255)),
+    ("greenish", (40, 40, 40), (85, 255, 255)),
+    ("yellow", (20, 100, 100), (30, 255, 255)),
+    ("muted_brown_green", (15, 25, 25), (45, 100, 120)),
+    ("purple_gray", (120, 20, 20), (160, 150, 150)),
+]
+
+
+def _build_stamp_hsv_lut(hsv_ranges) -> np.ndarray:
+    """
+    Membangun lookup table per-channel untuk cv2.LUT. Bit ke-k pada entri channel H/S/V
+    bernilai 1 jika nilai tersebut berada di dalam rentang warna ke-k untuk channel itu.
+    Sebuah piksel termasuk rentang ke-k tepat ketika bit k aktif di ketiga channel, sehingga
+    AND ketiga channel lalu cek != 0 sama dengan OR dari semua cv2.inRange.
+    """
+    if len(hsv_ranges) > 8:
+        raise ValueError("Maksimal 8 rentang warna untuk lookup table 8-bit.")
+    lut = np.zeros((256, 1, 3), dtype=np.uint8)
+    values = np.arange(256)
+    for bit, (_, lower, upper) in enumerate(hsv_ranges):
+        for channel in range(3):
+            in_range = (values >= lower[channel]) & (values <= upper[channel])
+            lut[in_range, 0, channel] |= np.uint8(1 << bit)
+    return lut
+
+
+_STAMP_HSV_LUT = _build_stamp_hsv_lut(STAMP_HSV_RANGES)
+
+# Jalur pra-pemrosesan yang dipilih probe_page_route.
+ROUTE_STAMP_REMOVAL = "stamp_removal"  # Ada tinta berwarna: hapus stempel/tanda tangan (HSV penuh)
+ROUTE_GRAYSCALE = "grayscale"  # Tanpa tinta berwarna: langsung grayscale + Otsu
+ROUTE_BILEVEL = "bilevel"  # Sudah hitam-putih (output scanner): tanpa Otsu, langsung ke penghapusan garis
+
+
+def probe_page_route(image_data: np.ndarray, page_number: int = 0) -> dict:
+    """
+    Probe murah untuk memilih jalur pra-pemrosesan termurah bagi sebuah halaman.
+
+    Halaman disampel tiap n piksel (tanpa interpolasi, agar warna goresan tipis dan nilai
+    hitam-putih murni tidak tercampur) hingga sisi terpanjang sekitar OCR_PROBE_MAX_SIDE.
+    - color_ratio: porsi sampel yang masuk rentang warna stempel (lookup table yang sama
+      dengan remove_stamp_and_signature, yaitu ambang saturasi/value per rentang hue). Pada
+      halaman pertama, area header yang dilindungi penghapusan stempel tidak ikut dihitung.
+    - bilevel_ratio: porsi sampel yang bernilai tepat 0 atau 255 (histogram grayscale).
+
+    Returns:
+        Dict berisi "route" (ROUTE_*), "color_ratio", dan "bilevel_ratio".
+    """
+    step = max(1, int(round(max(image_data.shape[:2]) / max(1, settings.OCR_PROBE_MAX_SIDE))))
+    sample = np.ascontiguousarray(image_data[::step, ::step])
+    color_ratio = 0.0
+    if sample.ndim == 3 and sample.shape[2] == 3:
+        color_sample = sample
+        if page_number == 0:
+            header_rows = int(image_data.shape[0] * 0.15) // step + 1
+            color_sample = sample[header_rows:] if header_rows < sample.shape[0] else sample[:0]
+        range_bits = cv2.LUT(cv2.cvtColor(color_sample, cv2.COLOR_BGR2HSV), _STAMP_HSV_LUT)
+        bits_h, bits_s, bits_v = cv2.split(range_bits)
+        combined_bits = cv2.bitwise_and(cv2.bitwise_and(bits_h, bits_s), bits_v)
+        color_ratio = cv2.countNonZero(combined_bits) / max(1, combined_bits.size)
+        sample = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY)
+
+    histogram = cv2.calcHist([sample], [0], None, [256], [0, 256]).ravel()
+    bilevel_ratio = float(histogram[0] + histogram[255]) / sample.size
+
+    if color_ratio >= settings.OCR_PROBE_COLOR_MIN_RATIO:
+        route = ROUTE_STAMP_REMOVAL
+    elif bilevel_ratio >= settings.OCR_PROBE_BILEVEL_MIN_RATIO:
+        route = ROUTE_BILEVEL
+    else:
+        route = ROUTE_GRAYSCALE
+    return {"route": route, "color_ratio": round(color_ratio, 6), "bilevel_ratio": round(bilevel_ratio, 6)}
+
+
+def page_needs_color(image_data: np.ndarray, page_number: int = 0) -> bool:
+    """
+    True jika halaman memiliki tinta berwarna yang perlu dihapus (jalur stamp_removal).
+    Dipakai renderer PDF mode "auto" pada pre-render resolusi rendah untuk memutuskan
+    apakah halaman perlu dirender berwarna atau cukup grayscale.
+    """
+    return probe_page_route(image_data, page_number=page_number)["route"] == ROUTE_STAMP_REMOVAL
+
+
+def remove_stamp_and_signature(image_bgr: np.ndarray, page_number: int = 0, id_numerik=None,
+                               inplace: bool = False) -> np.ndarray:
     """
     Mencoba menghapus stempel dan tanda tangan berwarna dari gambar BGR.
     Khusus untuk halaman pertama (page_number == 0), fungsi ini akan melindungi
     area header agar warna logo tidak ikut terhapus.
 
+    Masker semua rentang warna dihitung dalam satu sapuan lookup table pada gambar HSV,
+    lalu area stempel diputihkan langsung pada buffer output.
+
     Args:
         image_bgr: Gambar input dalam format BGR.
         page_number: Nomor halaman saat ini (dimulai dari 0).
+        inplace: Jika True, image_bgr diubah langsung tanpa membuat salinan.
 
     Returns:
         Gambar BGR di mana area stempel/tanda tangan telah diubah menjadi putih.
     """
-    if settings.APP_DEBUG:
-        if id_numerik is None:
-            id_numerik = random.randint(100000, 999999)
-
-        folder_target = os.path.join(settings.DEBUG_FILE, str(id_numerik), f"page_{page_number + 1}")
-        if not os.path.exists(folder_target):
-            os.makedirs(folder_target)
-
+    if settings.APP_DEBUG and id_numerik is None:
+        id_numerik = random.randint(100000, 999999)
+    debug_active = debug_artifacts.is_active(id_numerik)
+    if debug_active:
+        # Path relatif terhadap settings.DEBUG_FILE; folder dibuat oleh writer debug di latar belakang.
+        folder_target = os.path.join(str(id_numerik), f"page_{page_number + 1}")
         debug_folder = os.path.join(folder_target, f"page_{page_number + 1}_debug_stamp_removal")
-        if not os.path.exists(debug_folder):
-            os.makedirs(debug_folder)
-
-        cv2.imwrite(os.path.join(debug_folder, "0_original.png"), image_bgr)
+        save_debug_image(id_numerik, os.path.join(debug_folder, "0_original.png"), image_bgr)
 
     logger.info(f"Mencoba menghapus stempel/tanda tangan untuk Halaman {page_number + 1}.")
 
-    hsv = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2HSV)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(debug_folder, "1_hsv_representation.png"), hsv)
-
-    # Definisi rentang warna (tetap sama)
-    lower_blue = np.array([90, 50, 50])
-    upper_blue = np.array([130, 255, 255])
-    lower_purple = np.array([130, 40, 40])
-    upper_purple = np.array([170, 255, 255])
-    lower_cyan = np.array([80, 50, 50])
-    upper_cyan = np.array([100, 255, 255])
-    lower_greenish = np.array([40, 40, 40])
-    upper_greenish = np.array([85, 255, 255])
-    lower_yellow = np.array([20, 100, 100])
-    upper_yellow = np.array([30, 255, 255])
-    lower_muted_brown_green = np.array([15, 25, 25])
-    upper_muted_brown_green = np.array([45, 100, 120])
-    lower_purple_gray = np.array([120, 20, 20])
-    upper_purple_gray = np.array([160, 150, 150])
-
-    mask_blue = cv2.inRange(hsv, lower_blue, upper_blue)
-    mask_purple = cv2.inRange(hsv, lower_purple, upper_purple)
-    mask_cyan = cv2.inRange(hsv, lower_cyan, upper_cyan)
-    mask_greenish = cv2.inRange(hsv, lower_greenish, upper_greenish)
-    mask_yellow = cv2.inRange(hsv, lower_yellow, upper_yellow)
-    mask_muted_brown_green = cv2.inRange(hsv, lower_muted_brown_green, upper_muted_brown_green)
-    mask_purple_gray = cv2.inRange(hsv, lower_purple_gray, upper_purple_gray)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(debug_folder, "2a_mask_blue.png"), mask_blue)
-        cv2.imwrite(os.path.join(debug_folder, "2b_mask_purple.png"), mask_purple)
-        cv2.imwrite(os.path.join(debug_folder, "2c_mask_cyan.png"), mask_cyan)
-        cv2.imwrite(os.path.join(debug_folder, "2d_mask_greenish.png"), mask_greenish)
-        cv2.imwrite(os.path.join(debug_folder, "2e_mask_yellow.png"), mask_yellow)
-        cv2.imwrite(os.path.join(debug_folder, "2f_mask_muted_brown_green.png"), mask_muted_brown_green)
-        cv2.imwrite(os.path.join(debug_folder, "2g_mask_purple_gray.png"), mask_purple_gray)
-
-    combined_mask_1 = cv2.bitwise_or(mask_blue, mask_purple)
-    combined_mask_2 = cv2.bitwise_or(combined_mask_1, mask_cyan)
-    combined_mask_3 = cv2.bitwise_or(combined_mask_2, mask_greenish)
-    combined_mask_4 = cv2.bitwise_or(combined_mask_3, mask_yellow)
-    combined_mask_5 = cv2.bitwise_or(combined_mask_4, mask_muted_brown_green)
-    combined_mask = cv2.bitwise_or(combined_mask_5, mask_purple_gray)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(debug_folder, "3_mask_combined.png"), combined_mask)
+    # Semua gambar antara memakai buffer per-thread yang dipakai ulang antar halaman.
+    buffers = page_buffers()
+    plane_shape = image_bgr.shape[:2]
+    hsv = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2HSV, dst=buffers.get("stamp_hsv", image_bgr.shape))
+    if debug_active:
+        save_debug_image(id_numerik, os.path.join(debug_folder, "1_hsv_representation.png"), hsv)
+
+    # Satu sapuan LUT mengganti nilai H/S/V dengan bitset rentang warna (di buffer hsv yang sama).
+    range_bits = cv2.LUT(hsv, _STAMP_HSV_LUT, dst=hsv)
+    combined_bits = cv2.extractChannel(range_bits, 0, dst=buffers.get("stamp_bits", plane_shape))
+    channel_bits = buffers.get("stamp_channel", plane_shape)
+    for channel in (1, 2):
+        cv2.extractChannel(range_bits, channel, dst=channel_bits)
+        cv2.bitwise_and(combined_bits, channel_bits, dst=combined_bits)
+    if debug_active:
+        for bit, (range_name, _, _) in enumerate(STAMP_HSV_RANGES):
+            range_mask = cv2.compare(cv2.bitwise_and(combined_bits, 1 << bit), 0, cv2.CMP_GT)
+            save_debug_image(id_numerik, os.path.join(debug_folder, f"2{chr(ord('a') + bit)}_mask_{range_name}.png"),
+                             range_mask)
+
+    combined_mask = cv2.compare(combined_bits, 0, cv2.CMP_GT, dst=channel_bits)
+    if debug_active:
+        save_debug_image(id_numerik, os.path.join(debug_folder, "3_mask_combined.png"), combined_mask)
 
     # --- PERUBAHAN: Logika untuk melindungi header di halaman pertama ---
     if page_number == 0:
         logger.info("Halaman pertama terdeteksi, menerapkan masker pelindung untuk header.")
         # Definisikan area header. Di sini, kita asumsikan header adalah 15% bagian atas dari gambar.
         # Anda bisa menyesuaikan nilai 0.15 ini sesuai kebutuhan.
-        h, w, _ = image_bgr.shape
+        h = image_bgr.shape[0]
         header_height = int(h * 0.15)
 
-        # Buat masker pelindung: putih di semua tempat, KECUALI hitam di area header.
-        # Masker ini akan membatalkan deteksi warna di dalam area header.
-        protection_mask = np.full((h, w), 255, dtype=np.uint8)
-        cv2.rectangle(protection_mask, (0, 0), (w, header_height), (0, 0, 0), -1)
-
-        # Terapkan masker pelindung ke masker warna gabungan.
-        # Ini akan memastikan area header di 'combined_mask' menjadi hitam (tidak terdeteksi).
-        combined_mask = cv2.bitwise_and(combined_mask, protection_mask)
-        if settings.APP_DEBUG:
-            cv2.imwrite(os.path.join(debug_folder, "4_mask_after_header_protection.png"), combined_mask)
+        # Batalkan deteksi warna di area header (baris 0 s.d. header_height, inklusif).
+        combined_mask[:header_height + 1, :] = 0
+        if debug_active:
+            save_debug_image(id_numerik, os.path.join(debug_folder, "4_mask_after_header_protection.png"), combined_mask)
 
     # Lanjutkan proses pembersihan seperti biasa dengan masker yang sudah dimodifikasi
     # kernel_opening = np.ones((2, 2), np.uint8)
     # mask_no_noise = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel_opening, iterations=1)
     # # DEBUG: Simpan peta noda setelah bintik-bintik kecil dihilangkan.
-    # cv2.imwrite(os.path.join(debug_folder, "5a_mask_after_noise_removal.png"), mask_no_noise)
+    # save_debug_image(id_numerik, os.path.join(debug_folder, "5a_mask_after_noise_removal.png"), mask_no_noise)
 
     # 5b. Tebalkan dan sambungkan goresan yang terputus
     kernel_dilation = np.ones((3, 3), np.uint8)
-    dilated_mask = cv2.dilate(combined_mask, kernel_dilation, iterations=1)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(debug_folder, "5b_mask_final_dilated.png"), dilated_mask)
+    dilated_mask = cv2.dilate(combined_mask, kernel_dilation, iterations=1, dst=combined_mask)
+    if debug_active:
+        save_debug_image(id_numerik, os.path.join(debug_folder, "5b_mask_final_dilated.png"), dilated_mask)
 
-    white_background = np.full(image_bgr.shape, 255, dtype=np.uint8)
-    image_no_stamp_signature = cv2.bitwise_and(image_bgr, image_bgr, mask=cv2.bitwise_not(dilated_mask))
-    white_overlay = cv2.bitwise_and(white_background, white_background, mask=dilated_mask)
-    cleaned_image_bgr = cv2.add(image_no_stamp_signature, white_overlay)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(debug_folder, "6_final_cleaned_image.png"), cleaned_image_bgr)
+    # Putihkan area stempel langsung di buffer output (OR dengan 255 hanya di dalam masker).
+    cleaned_image_bgr = image_bgr if inplace else image_bgr.copy()
+    cv2.bitwise_or(cleaned_image_bgr, (255, 255, 255, 0), dst=cleaned_image_bgr, mask=dilated_mask)
+    if debug_active:
+        save_debug_image(id_numerik, os.path.join(debug_folder, "6_final_cleaned_image.png"), cleaned_image_bgr)
 
     logger.info("Proses penghapusan stempel dan tanda tangan selesai.")
     return cleaned_image_bgr
@@ -145,47 +206,82 @@ def likely_contains_content(image_region, std_dev_threshold=10.0):
     return std_dev > std_dev_threshold
 
 
-def preprocess_image_data(image_data, page_number=0, std_dev_threshold_logo=15.0, id_numerik=None):
+def preprocess_image_data(image_data, page_number=0, std_dev_threshold_logo=15.0, id_numerik=None,
+                          return_bgr_for_cropping=False, inplace=False, stage_info=None):
     """
     Melakukan pra-pemrosesan pada data gambar (numpy array) untuk meningkatkan kualitas OCR.
-    """
-    if settings.APP_DEBUG:
-        if id_numerik is None:
-            id_numerik = random.randint(100000, 999999)
 
-        folder_target = os.path.join(settings.DEBUG_FILE, str(id_numerik), f"page_{page_number + 1}")
-        if not os.path.exists(folder_target):
-            os.makedirs(folder_target)
+    Tahap grayscale dan binarisasi ditulis ke buffer per-thread yang dipakai ulang antar
+    halaman (lihat utils/page_buffers.py), sehingga gambar biner yang dikembalikan hanya
+    valid sampai halaman berikutnya diproses di thread yang sama. Salin jika perlu disimpan.
+
+    Args:
+        return_bgr_for_cropping: Jika True, salinan BGR hasil pembersihan ikut dikembalikan
+            sebagai elemen kedua; jika False (default) elemen kedua bernilai None.
+        inplace: Jika True, image_data boleh diubah langsung (penghapusan stempel tanpa salinan).
+        stage_info: Dict opsional yang diisi jalur pra-pemrosesan terpilih ("route") beserta
+            hasil probe, untuk metadata per halaman.
+    """
+    if settings.APP_DEBUG and id_numerik is None:
+        id_numerik = random.randint(100000, 999999)
+    debug_active = debug_artifacts.is_active(id_numerik)
+    if debug_active:
+        # Path relatif terhadap settings.DEBUG_FILE; folder dibuat oleh writer debug di latar belakang.
+        folder_target = os.path.join(str(id_numerik), f"page_{page_number + 1}")
 
     logger.info(f"Memulai pra-pemrosesan untuk Halaman {page_number + 1} (ID: {id_numerik})...")
     if image_data is None:
         logger.error("Error: Tidak ada data gambar untuk diproses.")
         return None, None  # Kembalikan juga None untuk gambar grayscale asli
 
-    if len(image_data.shape) == 3 and image_data.shape[2] == 3:
+    is_color = len(image_data.shape) == 3 and image_data.shape[2] == 3
+    if settings.OCR_PREPROCESS_ROUTING:
+        probe = probe_page_route(image_data, page_number=page_number)
+    else:
+        probe = {"route": ROUTE_STAMP_REMOVAL if is_color else ROUTE_GRAYSCALE}
+    route = probe["route"]
+    if stage_info is not None:
+        stage_info.update(probe)
+    logger.info(f"Jalur pra-pemrosesan Halaman {page_number + 1}: {route}.")
+
+    if route == ROUTE_STAMP_REMOVAL:
         logger.info("Gambar berwarna terdeteksi, menjalankan penghapusan stempel/tanda tangan.")
-        image_cleaned_bgr = remove_stamp_and_signature(image_data, page_number=page_number, id_numerik=id_numerik)
+        image_cleaned_bgr = remove_stamp_and_signature(image_data, page_number=page_number, id_numerik=id_numerik,
+                                                       inplace=inplace)
         # Simpan untuk debug jika perlu
-        if settings.APP_DEBUG:
-            cv2.imwrite(os.path.join(folder_target, "debug_0_after_stamp_removal.png"), image_cleaned_bgr)
+        if debug_active:
+            save_debug_image(id_numerik, os.path.join(folder_target, "debug_0_after_stamp_removal.png"),
+                             image_cleaned_bgr)
     else:
-        logger.warning("Gambar input bukan berwarna (BGR), melewati langkah penghapusan stempel.")
+        logger.info("Tidak ada tinta berwarna, melewati langkah penghapusan stempel.")
         image_cleaned_bgr = image_data
 
-    # Pastikan gambar dalam format 3 channel jika berwarna, atau konversi ke gray
+    # Pastikan gambar dalam format 3 channel jika berwarna, atau konversi ke gray.
+    # Salinan BGR untuk cropping hanya dibuat jika diminta pemanggil.
+    original_bgr_for_cropping = None
+    buffers = page_buffers()
     if len(image_cleaned_bgr.shape) == 3 and image_cleaned_bgr.shape[2] == 3:
-        original_bgr_for_cropping = image_cleaned_bgr.copy()
-        gray = cv2.cvtColor(image_cleaned_bgr, cv2.COLOR_BGR2GRAY)
+        if return_bgr_for_cropping:
+            original_bgr_for_cropping = image_cleaned_bgr.copy()
+        gray = cv2.cvtColor(image_cleaned_bgr, cv2.COLOR_BGR2GRAY,
+                            dst=buffers.get("gray", image_cleaned_bgr.shape[:2]))
     elif len(image_cleaned_bgr.shape) == 2:  # Sudah grayscale
-        original_bgr_for_cropping = cv2.cvtColor(image_cleaned_bgr, cv2.COLOR_GRAY2BGR)
-        gray = image_cleaned_bgr.copy()
+        if return_bgr_for_cropping:
+            original_bgr_for_cropping = cv2.cvtColor(image_cleaned_bgr, cv2.COLOR_GRAY2BGR)
+        if inplace:
+            gray = image_cleaned_bgr
+        else:
+            gray = buffers.get("gray", image_cleaned_bgr.shape, image_cleaned_bgr.dtype)
+            np.copyto(gray, image_cleaned_bgr)
     else:
         logger.error("Format gambar tidak didukung untuk pra-pemrosesan.")
         return None, None
 
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(folder_target, "debug_0a_original_for_crop.png"), original_bgr_for_cropping)
-        cv2.imwrite(os.path.join(folder_target, "debug_0b_grayscale_initial.png"), gray)
+    if debug_active:
+        if original_bgr_for_cropping is not None:
+            save_debug_image(id_numerik, os.path.join(folder_target, "debug_0a_original_for_crop.png"),
+                             original_bgr_for_cropping)
+        save_debug_image(id_numerik, os.path.join(folder_target, "debug_0b_grayscale_initial.png"), gray)
 
     original_width, original_height = gray.shape[:2]
     logger.info(f"Dimensi Halaman {page_number + 1} (T x L): {original_height} x {original_width} piksel.")
@@ -228,13 +324,13 @@ def preprocess_image_data(image_data, page_number=0, std_dev_threshold_logo=15.0
         else:
             logger.info(f"Koordinat logo kanan di luar batas gambar.")
 
-        if settings.APP_DEBUG:
-            cv2.imwrite(os.path.join(folder_target, "debug_0b_after_logo_masking.png"), gray)
+        if debug_active:
+            save_debug_image(id_numerik, os.path.join(folder_target, "debug_0b_after_logo_masking.png"), gray)
     else:
         logger.info(f"--- Tidak Menerapkan Masking Logo untuk Halaman {page_number + 1} ---")
 
-    # Deskew (meluruskan kemiringan)
-    deskewed_gray = gray.copy()
+    # Deskew (meluruskan kemiringan) -- saat ini nonaktif, sehingga tidak perlu salinan terpisah.
+    deskewed_gray = gray
     # try:
     #     edges = cv2.Canny(deskewed_gray, 50, 150, apertureSize=3)
     #     lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=min(original_width, original_height)//10, maxLineGap=20)
@@ -252,16 +348,18 @@ def preprocess_image_data(image_data, page_number=0, std_dev_threshold_logo=15.0
     #             M = cv2.getRotationMatrix2D(center, median_angle, 1.0)
     #             deskewed_gray = cv2.warpAffine(deskewed_gray, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
     #             print(f"Gambar Halaman {page_number+1} diluruskan (deskewed) sebesar {median_angle:.2f} derajat.")
-    #             cv2.imwrite(os.path.join(folder_target, "debug_1_deskewed.png"), deskewed_gray)
+    #             save_debug_image(id_numerik, os.path.join(folder_target, "debug_1_deskewed.png"), deskewed_gray)
     # except Exception as e:
     #     print(f"Error saat deskewing Halaman {page_number + 1}: {e}")
 
-    # Binarisasi menggunakan Otsu's Thresholding
+    # Binarisasi menggunakan Otsu's Thresholding (ditulis langsung ke buffer grayscale).
+    # Halaman bilevel sudah hitam-putih, cukup ambang tetap tanpa menghitung histogram Otsu.
     gray_to_binarize = deskewed_gray
+    threshold_type = cv2.THRESH_BINARY if route == ROUTE_BILEVEL else cv2.THRESH_BINARY + cv2.THRESH_OTSU
     try:
-        _, binary_image = cv2.threshold(gray_to_binarize, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        if settings.APP_DEBUG:
-            cv2.imwrite(os.path.join(folder_target, "debug_2_binary_for_ocr.png"), binary_image)
+        _, binary_image = cv2.threshold(gray_to_binarize, 127, 255, threshold_type, dst=gray_to_binarize)
+        if debug_active:
+            save_debug_image(id_numerik, os.path.join(folder_target, "debug_2_binary_for_ocr.png"), binary_image)
     except Exception as e:
         logger.error(f"Error saat binarisasi: {e}")
         return None, None
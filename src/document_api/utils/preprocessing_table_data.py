@@ -5,50 +5,170 @@ import os
 import numpy as np
 
 from src.document_api.core.config import settings
+from src.document_api.utils.debug_artifacts import debug_artifacts, save_debug_image
+from src.document_api.utils.page_buffers import page_buffers
+
+
+def _run_length_bound(kernel_length):
+    """
+    Panjang run tinta minimum dalam satu baris/kolom agar erosi 2 iterasi dengan kernel
+    sepanjang kernel_length bisa menyisakan piksel (termasuk di tepi gambar, karena erosi
+    OpenCV menganggap area di luar gambar sebagai tinta).
+    """
+    return 2 * ((kernel_length - 1) // 2) + 1
+
+
+def _may_contain_lines(inverted_page, kernel_length, axis):
+    """
+    Early exit murah dan eksak: garis hanya mungkin ada jika minimal satu baris (axis=1,
+    garis horizontal) atau kolom (axis=0, garis vertikal) memiliki cukup piksel tinta.
+    """
+    ink_counts = cv2.reduce(inverted_page, axis, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+    return int(ink_counts.max()) >= _run_length_bound(kernel_length) * 255
+
+
+def _line_mask_morphology(inverted_page, kernel_length, axis, dst_name):
+    """Deteksi garis referensi: erosi lalu dilasi 2 iterasi pada resolusi penuh."""
+    buffers = page_buffers()
+    page_shape = inverted_page.shape[:2]
+    kernel_size = (kernel_length, 1) if axis == 1 else (1, kernel_length)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, kernel_size)
+    img_temp = cv2.erode(inverted_page, kernel, dst=buffers.get("lines_temp", page_shape), iterations=2)
+    return cv2.dilate(img_temp, kernel, dst=buffers.get(dst_name, page_shape), iterations=2)
+
+
+def _line_mask_downsampled(inverted_page, kernel_length, axis, dst_name):
+    """
+    Deteksi garis cepat pada halaman yang diperkecil faktor f hanya searah garis.
+
+    Setiap blok f piksel yang seluruhnya tinta menjadi satu piksel kecil bernilai 255 (minimum
+    blok). Run tinta sepanjang M = 2*kernel_length-1 (panjang efektif erosi 2 iterasi) selalu
+    memuat minimal (M-f+1)//f blok penuh, sehingga opening dengan kernel sepanjang itu pada
+    gambar kecil menemukan garis yang sama. Hanya baris/kolom yang memuat garis yang diperbesar
+    kembali dan di-AND dengan tinta asli, sehingga tepi garis tetap presisi; perbedaan dengan
+    mesin morfologi hanya di ujung garis (kurang dari satu blok).
+
+    Mengembalikan None (early exit, tanpa memperbesar) jika tidak ada kandidat garis.
+    """
+    buffers = page_buffers()
+    page_height, page_width = inverted_page.shape[:2]
+    suffix = "h" if axis == 1 else "v"  # Bentuk gambar kecil berbeda per arah, buffer dipisah
+    effective_length = 2 * kernel_length - 1
+    factor = max(1, effective_length // 16)
+    small_kernel_length = max(1, (effective_length - factor + 1) // factor)
+    if small_kernel_length % 2 == 0:
+        small_kernel_length -= 1  # Kernel ganjil: anchor di tengah, opening tidak bergeser
+
+    if axis == 1:
+        usable = (page_width // factor) * factor
+        source = inverted_page[:, :usable]
+        small_shape = (page_height, usable // factor)
+        # Minimum tiap blok horizontal: erosi dengan anchor di kiri, lalu ambil setiap kolom ke-f.
+        block_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (factor, 1))
+        block_min = cv2.erode(source, block_kernel, dst=buffers.get("lines_temp", source.shape), anchor=(0, 0))
+        small = buffers.get(f"lines_small_{suffix}", small_shape)
+        np.copyto(small, block_min[:, ::factor])
+        small_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (small_kernel_length, 1))
+        grow_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (small_kernel_length + 2, 1))
+    else:
+        usable = (page_height // factor) * factor
+        source = inverted_page[:usable, :]
+        small_shape = (usable // factor, page_width)
+        # Minimum tiap blok vertikal: reduksi numpy atas sumbu tengah (baris dalam blok).
+        small = buffers.get(f"lines_small_{suffix}", small_shape)
+        np.minimum.reduce(source.reshape(small_shape[0], factor, page_width), axis=1, out=small)
+        small_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, small_kernel_length))
+        grow_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, small_kernel_length + 2))
+
+    small_lines = cv2.erode(small, small_kernel, dst=buffers.get(f"lines_small_temp_{suffix}", small_shape))
+    if cv2.countNonZero(small_lines) == 0:
+        return None
+    # Dilasi satu blok lebih panjang di tiap sisi agar blok parsial di ujung garis ikut tercakup.
+    grown = cv2.dilate(small_lines, grow_kernel, dst=small)
+
+    line_mask = buffers.get(dst_name, (page_height, page_width))
+    line_mask.fill(0)
+    if axis == 1:
+        rows = np.flatnonzero(cv2.reduce(grown, 1, cv2.REDUCE_MAX))
+        line_mask[rows, :usable] = np.repeat(grown[rows], factor, axis=1) & source[rows]
+    else:
+        cols = np.flatnonzero(cv2.reduce(grown, 0, cv2.REDUCE_MAX))
+        line_mask[:usable, cols] = np.repeat(grown[:, cols], factor, axis=0) & source[:, cols]
+    return line_mask
+
+
+_LINE_ENGINES = {
+    "morphology": _line_mask_morphology,
+    "downsample": _line_mask_downsampled,
+}
+
+
+def extract_table_grid_from_page(binary_page_for_lines, id_numerik, page_number, engine=None):
+    """
+    Mendeteksi garis tabel horizontal dan vertikal dari halaman biner (teks/garis hitam).
 
+    Mesin deteksi dipilih lewat `engine` atau settings.TABLE_LINE_ENGINE:
+    "downsample" (cepat, default) atau "morphology" (morfologi resolusi penuh, referensi).
 
-def extract_table_grid_from_page(binary_page_for_lines, id_numerik, page_number):
-    if settings.APP_DEBUG:
-        folder_target_page = os.path.join(settings.DEBUG_FILE, str(id_numerik), f"page_{page_number + 1}")
-        if not os.path.exists(folder_target_page):
-            os.makedirs(folder_target_page)
+    Semua gambar antara ditulis ke buffer per-thread (utils/page_buffers.py); masker yang
+    dikembalikan hanya valid sampai halaman berikutnya diproses di thread yang sama.
+    """
+    debug_active = debug_artifacts.is_active(id_numerik)
+    if debug_active:
+        folder_target_page = os.path.join(str(id_numerik), f"page_{page_number + 1}")
 
     logging.info(f"\n--- Memulai Deteksi Grid Tabel dari Halaman {page_number + 1} ---")
     if binary_page_for_lines is None:
         logging.error(f"Tidak ada gambar biner untuk ekstraksi grid di Halaman {page_number + 1}.")
         return None
 
+    engine = engine or settings.TABLE_LINE_ENGINE
+    detect_lines = _LINE_ENGINES.get(engine)
+    if detect_lines is None:
+        logging.warning(f"TABLE_LINE_ENGINE '{engine}' tidak dikenal, memakai 'morphology'.")
+        detect_lines = _line_mask_morphology
+
     page_height, page_width = binary_page_for_lines.shape[:2]
+    buffers = page_buffers()
+    page_shape = binary_page_for_lines.shape[:2]
 
     # Invert gambar biner agar garis menjadi putih untuk deteksi morfologi
     # (Karena binary_page_for_lines memiliki garis hitam)
-    inverted_binary_page = cv2.bitwise_not(binary_page_for_lines)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(folder_target_page, f"debug_3a_inverted_binary_page.png"), inverted_binary_page)
+    inverted_binary_page = cv2.bitwise_not(binary_page_for_lines, dst=buffers.get("lines_inverted", page_shape))
+    if debug_active:
+        save_debug_image(id_numerik, os.path.join(folder_target_page, f"debug_3a_inverted_binary_page.png"), inverted_binary_page)
 
     # 1. Deteksi Garis Horizontal
     horizontal_kernel_length = max(15, page_width // 30)  # Pastikan kernel tidak terlalu kecil
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (horizontal_kernel_length, 1))
-    img_temp_horizontal = cv2.erode(inverted_binary_page, horizontal_kernel, iterations=2)
-    horizontal_lines_img = cv2.dilate(img_temp_horizontal, horizontal_kernel, iterations=2)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(folder_target_page, f"debug_3b_horizontal_lines.png"), horizontal_lines_img)
+    horizontal_lines_img = None
+    if _may_contain_lines(inverted_binary_page, horizontal_kernel_length, 1):
+        horizontal_lines_img = detect_lines(inverted_binary_page, horizontal_kernel_length, 1, "lines_horizontal")
+    if debug_active and horizontal_lines_img is not None:
+        save_debug_image(id_numerik, os.path.join(folder_target_page, f"debug_3b_horizontal_lines.png"), horizontal_lines_img)
 
     # 2. Deteksi Garis Vertikal
     vertical_kernel_length = max(15, page_height // 30)  # Pastikan kernel tidak terlalu kecil
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, vertical_kernel_length))
-    img_temp_vertical = cv2.erode(inverted_binary_page, vertical_kernel, iterations=2)
-    vertical_lines_img = cv2.dilate(img_temp_vertical, vertical_kernel, iterations=2)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(folder_target_page, f"debug_3c_vertical_lines.png"), vertical_lines_img)
+    vertical_lines_img = None
+    if _may_contain_lines(inverted_binary_page, vertical_kernel_length, 0):
+        vertical_lines_img = detect_lines(inverted_binary_page, vertical_kernel_length, 0, "lines_vertical")
+    if debug_active and vertical_lines_img is not None:
+        save_debug_image(id_numerik, os.path.join(folder_target_page, f"debug_3c_vertical_lines.png"), vertical_lines_img)
+
+    # Early exit: tidak ada kandidat garis sama sekali di kedua arah.
+    if horizontal_lines_img is None and vertical_lines_img is None:
+        logging.info(f"Tidak ada grid tabel (garis) yang terdeteksi dengan jelas di Halaman {page_number + 1}.")
+        return None
 
     # 3. Gabungkan garis untuk mendapatkan grid tabel
-    table_grid_mask = cv2.add(horizontal_lines_img, vertical_lines_img)
-    if settings.APP_DEBUG:
-        cv2.imwrite(os.path.join(folder_target_page, f"debug_3d_table_grid_mask.png"), table_grid_mask)
+    if horizontal_lines_img is None or vertical_lines_img is None:
+        table_grid_mask = vertical_lines_img if horizontal_lines_img is None else horizontal_lines_img
+    else:
+        table_grid_mask = cv2.add(horizontal_lines_img, vertical_lines_img, dst=buffers.get("lines_grid", page_shape))
+    if debug_active:
+        save_debug_image(id_numerik, os.path.join(folder_target_page, f"debug_3d_table_grid_mask.png"), table_grid_mask)
 
     # Cek apakah ada sesuatu di table_grid_mask (apakah ada garis yang terdeteksi)
-    if np.sum(table_grid_mask) == 0:  # Jika semua piksel hitam (tidak ada garis putih terdeteksi)
+    if cv2.countNonZero(table_grid_mask) == 0:  # Jika semua piksel hitam (tidak ada garis putih terdeteksi)
         logging.info(f"Tidak ada grid tabel (garis) yang terdeteksi dengan jelas di Halaman {page_number + 1}.")
         return None
 
@@ -56,11 +176,16 @@ def extract_table_grid_from_page(binary_page_for_lines, id_numerik, page_number)
     return table_grid_mask
 
 
-def page_after_line_removal(binary_page_with_lines, table_grid_mask, id_numerik, page_number):
-    if settings.APP_DEBUG:
-        folder_target = os.path.join(settings.DEBUG_FILE, str(id_numerik), f"page_{page_number + 1}")
-        if not os.path.exists(folder_target):
-            os.makedirs(folder_target)
+def page_after_line_removal(binary_page_with_lines, table_grid_mask, id_numerik, page_number, inplace=False):
+    """
+    Memutihkan piksel garis tabel pada halaman biner.
+
+    Dengan inplace=True, binary_page_with_lines dan table_grid_mask ditimpa langsung
+    (dipakai pipeline OCR yang memiliki kedua buffer); jika tidak, hasil berupa array baru.
+    """
+    debug_active = debug_artifacts.is_active(id_numerik)
+    if debug_active:
+        folder_target = os.path.join(str(id_numerik), f"page_{page_number + 1}")
 
     logging.info(f"\n--- Mempersiapkan Halaman {page_number + 1} Setelah Penghapusan Garis ---")
 
@@ -70,26 +195,28 @@ def page_after_line_removal(binary_page_with_lines, table_grid_mask, id_numerik,
     if table_grid_mask is None:
         logging.info(f"Tidak ada masker grid tabel untuk Halaman {page_number + 1}, menggunakan gambar biner asli.")
         # Simpan gambar biner asli jika tidak ada masker, agar alur debug konsisten
-        if settings.APP_DEBUG:
+        if debug_active:
             debug_path_no_removal = os.path.join(folder_target, f"debug_5_no_lines_removed_used_as_is.png")
-            cv2.imwrite(debug_path_no_removal, binary_page_with_lines)
+            save_debug_image(id_numerik, debug_path_no_removal, binary_page_with_lines)
         return binary_page_with_lines  # Kembalikan gambar biner asli jika tidak ada masker
 
-    image_lines_removed = binary_page_with_lines.copy()
-
     # Pastikan table_grid_mask adalah biner (0 dan 255)
-    _, table_grid_mask_thresh = cv2.threshold(table_grid_mask, 127, 255, cv2.THRESH_BINARY)
+    mask_dst = table_grid_mask if inplace else page_buffers().get("lines_mask", table_grid_mask.shape)
+    _, table_grid_mask_thresh = cv2.threshold(table_grid_mask, 127, 255, cv2.THRESH_BINARY, dst=mask_dst)
 
     # Sedikit dilasi pada masker mungkin membantu menutup garis sepenuhnya
     # kernel_dilation_mask = np.ones((2,2), np.uint8)
     # dilated_table_grid_mask = cv2.dilate(table_grid_mask_thresh, kernel_dilation_mask, iterations=1)
     # image_lines_removed[dilated_table_grid_mask == 255] = 255 # Latar adalah putih
 
-    image_lines_removed[table_grid_mask_thresh == 255] = 255  # Latar adalah putih
+    # Latar adalah putih: OR dengan masker 0/255 sama dengan mengisi 255 di piksel garis,
+    # tanpa membuat masker boolean sementara.
+    image_lines_removed = cv2.bitwise_or(binary_page_with_lines, table_grid_mask_thresh,
+                                         dst=binary_page_with_lines if inplace else None)
 
-    if settings.APP_DEBUG:
+    if debug_active:
         debug_path_lines_removed = os.path.join(folder_target, f"debug_5_lines_removed.png")
-        cv2.imwrite(debug_path_lines_removed, image_lines_removed)
-        logging.info(f"Gambar setelah penghapusan garis disimpan sebagai: {debug_path_lines_removed}")
+        save_debug_image(id_numerik, debug_path_lines_removed, image_lines_removed)
+        logging.info(f"Gambar setelah penghapusan garis diantrekan sebagai: {debug_path_lines_removed}")
 
     return image_lines_removed
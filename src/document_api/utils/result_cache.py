@@ -0,0 +1,199 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Menghitung SHA-256 isi file secara bertahap tanpa memuat seluruh file ke memori."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Menghitung SHA-256 isi file yang sudah berada di memori (mis. upload)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache hasil berbasis konten dengan dua tingkat:
+    - Memori: LRU dengan batas ukuran (byte JSON yang disimpan).
+    - Disk (opsional): satu file JSON per kunci, dibuang berdasarkan TTL dan batas ukuran total.
+
+    Nilai disimpan sebagai JSON sehingga pemanggil selalu menerima salinan baru.
+    Aman dipakai dari banyak thread; tier disk juga bisa dibagi antar proses.
+    """
+
+    def __init__(self, name: str, memory_max_bytes: int, disk_dir: str = None,
+                 disk_max_bytes: int = 0, ttl_seconds: int = 0):
+        self.name = name
+        self.memory_max_bytes = max(0, memory_max_bytes)
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = max(0, disk_max_bytes)
+        self.ttl_seconds = max(0, ttl_seconds)
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+        logger.info(f"Cache '{name}' aktif (memori: {self.memory_max_bytes} byte, "
+                    f"disk: {self.disk_dir or 'nonaktif'}).")
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Menggabungkan bagian-bagian kunci (mis. hash konten + versi pipeline) menjadi satu hash."""
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return json.loads(payload)
+
+        payload = self._disk_get(key)
+        with self._lock:
+            if payload is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._memory_put(key, payload)
+        return json.loads(payload)
+
+    def put(self, key: str, value: Dict[str, Any]):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._stats["stores"] += 1
+            self._memory_put(key, payload)
+        self._disk_put(key, payload)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    # --- Tier memori (dipanggil dengan lock) ---
+
+    def _memory_put(self, key: str, payload: str):
+        size = len(payload)
+        if size > self.memory_max_bytes:
+            return
+        old_payload = self._memory.pop(key, None)
+        if old_payload is not None:
+            self._memory_bytes -= len(old_payload)
+        self._memory[key] = payload
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["evictions"] += 1
+
+    # --- Tier disk ---
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if self.ttl_seconds and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self._disk_remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                payload = f.read()
+            os.utime(path)  # Tandai baru dipakai untuk urutan eviksi
+            return payload
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Cache '{self.name}': gagal membaca entri disk {path}: {e}")
+            return None
+
+    def _disk_put(self, key: str, payload: str):
+        if not self.disk_dir or not self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Tulis ke file sementara lalu rename agar pembaca tidak pernah melihat file setengah jadi.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Cache '{self.name}': gagal menulis entri disk {path}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(payload.encode("utf-8"))
+            needs_eviction = self._disk_bytes > self.disk_max_bytes
+        if needs_eviction:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _disk_remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _evict_disk(self):
+        """Membuang entri kedaluwarsa lalu entri terlama hingga ukuran turun ke 90% batas."""
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_max_bytes * 0.9)
+        now = time.time()
+        evicted = 0
+        for mtime, size, path in entries:
+            expired = self.ttl_seconds and now - mtime > self.ttl_seconds
+            if not expired and total <= target:
+                continue
+            if self._disk_remove(path):
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._stats["evictions"] += evicted
+        logger.info(f"Cache '{self.name}': {evicted} entri disk dibuang, ukuran sekarang {total} byte.")
@@ -0,0 +1,11 @@
+from flask import current_app
+
+# Header respons server-sent events: tanpa cache dan tanpa buffering di reverse proxy (nginx),
+# agar setiap event langsung sampai ke klien.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_MIMETYPE = "text/event-stream"
+
+
+def sse_event(name: str, data) -> str:
+    """Memformat satu event SSE; data di-serialize dengan provider JSON aplikasi."""
+    return f"event: {name}\ndata: {current_app.json.dumps(data)}\n\n"
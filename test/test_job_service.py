@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from src.document_api.services.job_service import (JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobService,
+                                                   JobStore)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+@pytest.fixture(scope="module")
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def job_row(store: JobStore, job_id: str) -> sqlite3.Row:
+    return store._connect().execute("SELECT status, attempts, worker_pid, payload FROM jobs WHERE id = ?",
+                                    (job_id,)).fetchone()
+
+
+def interrupt(store: JobStore, job_id: str, pid: int):
+    """Meniru proses worker yang mati di tengah job."""
+    store._connect().execute("UPDATE jobs SET worker_pid = ? WHERE id = ?", (pid, job_id))
+
+
+def test_claim_next_takes_oldest_job_once(store):
+    first = store.create(b"satu", "a.pdf")
+    second = store.create(b"dua", "b.pdf")
+
+    claimed = store.claim_next()
+    assert claimed["id"] == first
+    assert bytes(claimed["payload"]) == b"satu"
+    assert store.claim_next()["id"] == second
+    assert store.claim_next() is None
+
+    row = job_row(store, first)
+    assert row["status"] == JOB_RUNNING
+    assert row["attempts"] == 1
+
+
+def test_finish_stores_result_or_error_and_drops_payload(store):
+    done_id = store.create(b"isi", "a.pdf")
+    failed_id = store.create(b"isi", "b.pdf")
+    store.claim_next()
+    store.claim_next()
+
+    store.finish(done_id, result={"skor": np.float32(0.5), "jumlah": np.int64(2)})
+    store.finish(failed_id, error="Gagal saat ekstraksi teks.")
+
+    done = store.get(done_id)
+    assert done["status"] == JOB_DONE
+    assert done["result"] == {"skor": 0.5, "jumlah": 2}
+    assert job_row(store, done_id)["payload"] is None
+    failed = store.get(failed_id)
+    assert failed["status"] == JOB_FAILED
+    assert failed["error"] == "Gagal saat ekstraksi teks."
+    assert store.count_by_status() == {JOB_DONE: 1, JOB_FAILED: 1}
+
+
+def test_requeue_interrupted_until_max_attempts(store, dead_pid):
+    job_id = store.create(b"isi", "a.pdf")
+
+    store.claim_next()
+    interrupt(store, job_id, dead_pid)
+    assert store.requeue_interrupted(max_attempts=2) == (1, 0)
+    assert job_row(store, job_id)["status"] == JOB_QUEUED
+
+    assert store.claim_next()["id"] == job_id
+    interrupt(store, job_id, dead_pid)
+    assert store.requeue_interrupted(max_attempts=2) == (0, 1)
+
+    job = store.get(job_id)
+    assert job["status"] == JOB_FAILED
+    assert "2 kali percobaan" in job["error"]
+    row = job_row(store, job_id)
+    assert row["attempts"] == 2
+    assert row["payload"] is None
+    assert store.claim_next() is None
+
+
+def test_requeue_interrupted_leaves_jobs_of_live_processes(store):
+    job_id = store.create(b"isi", "a.pdf")
+    store.claim_next()
+    interrupt(store, job_id, os.getppid())
+
+    assert store.requeue_interrupted(max_attempts=3) == (0, 0)
+    assert job_row(store, job_id)["status"] == JOB_RUNNING
+
+
+def test_existing_database_gets_attempts_column(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, file_name TEXT NOT NULL, "
+                 "payload BLOB, result TEXT, error TEXT, worker_pid INTEGER, created_at REAL NOT NULL, "
+                 "updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO jobs VALUES ('lama', 'queued', 'a.pdf', x'00', NULL, NULL, NULL, 1, 1)")
+    conn.commit()
+    conn.close()
+
+    store = JobStore(db_path)
+    assert store.claim_next()["id"] == "lama"
+    assert job_row(store, "lama")["attempts"] == 1
+
+
+class _EchoPipeline:
+    def process_document(self, data: bytes, file_name: str):
+        return {"file_name": file_name, "size": len(data)}
+
+
+def wait_for_status(service: JobService, job_id: str, status: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} tidak mencapai status {status}")
+
+
+def test_worker_survives_store_errors(store, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "purge_finished", locked)
+    real_finish = store.finish
+    failures = {"count": 0}
+
+    def flaky_finish(job_id, result=None, error=None):
+        # Job pertama gagal disimpan dua kali (hasil dan status gagal), job berikutnya normal.
+        if failures["count"] < 2:
+            failures["count"] += 1
+            raise sqlite3.OperationalError("database is locked")
+        real_finish(job_id, result=result, error=error)
+
+    monkeypatch.setattr(store, "finish", flaky_finish)
+    service = JobService(_EchoPipeline(), store=store, workers=1)
+    try:
+        first = service.submit(b"satu", "a.pdf")
+        second = service.submit(b"dua", "b.pdf")
+
+        job = wait_for_status(service, second, JOB_DONE)
+        assert job["result"] == {"file_name": "b.pdf", "size": 3}
+        assert service.get(first)["status"] == JOB_RUNNING
+        assert all(thread.is_alive() for thread in service._threads)
+    finally:
+        service.close()
@@ -0,0 +1,130 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+from flask import Flask, jsonify
+
+from src.document_api.core.config import settings
+from src.document_api.utils import http_compression, json_provider
+from src.document_api.utils.http_compression import compress_response
+from src.document_api.utils.json_provider import NumpyJSONProvider, select_fields
+
+DOCUMENT = {
+    "file_name": "surat.pdf",
+    "text": "Dengan hormat",
+    "information": {"text": "Dengan hormat", "nomor_surat": "045/MJ/GKI/V/2024", "tanggal": "12 Mei 2024"},
+    "entities": [
+        {"entity_group": "PER", "word": "Budi Hartono", "score": 0.98},
+        {"entity_group": "LOC", "word": "Surabaya", "score": 0.91},
+    ],
+}
+
+
+def test_select_fields_include_with_dotted_paths():
+    selected = select_fields(DOCUMENT, "file_name,information.nomor_surat,entities.word")
+    assert selected == {
+        "file_name": "surat.pdf",
+        "information": {"nomor_surat": "045/MJ/GKI/V/2024"},
+        "entities": [{"word": "Budi Hartono"}, {"word": "Surabaya"}],
+    }
+
+
+def test_select_fields_exclude_with_dotted_paths():
+    selected = select_fields(DOCUMENT, "-text,-information.text,-entities.score")
+    assert set(selected) == {"file_name", "information", "entities"}
+    assert selected["information"] == {"nomor_surat": "045/MJ/GKI/V/2024", "tanggal": "12 Mei 2024"}
+    assert selected["entities"] == [{"entity_group": "PER", "word": "Budi Hartono"},
+                                    {"entity_group": "LOC", "word": "Surabaya"}]
+    assert "text" in DOCUMENT["information"]  # Data asli tidak diubah
+
+
+def test_select_fields_applies_to_each_list_item_and_ignores_unknown_fields():
+    selected = select_fields([DOCUMENT, DOCUMENT], "file_name,tidak_ada")
+    assert selected == [{"file_name": "surat.pdf"}, {"file_name": "surat.pdf"}]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def app(request, monkeypatch):
+    if request.param == "orjson":
+        if json_provider.orjson is None:
+            pytest.skip("orjson tidak terinstal")
+    else:
+        monkeypatch.setattr(json_provider, "orjson", None)
+
+    app = Flask(__name__)
+    app.json = NumpyJSONProvider(app)
+    app.after_request(compress_response)
+
+    @app.route("/document")
+    def document():
+        return jsonify({"data": dict(DOCUMENT, score=np.float32(0.5), count=np.int64(3), valid=np.bool_(True),
+                                     vector=np.arange(3, dtype=np.int32))})
+
+    @app.route("/large")
+    def large():
+        return jsonify({"data": {"text": "Dengan hormat, kami mengundang Bapak/Ibu. " * 200}})
+
+    return app
+
+
+def test_numpy_values_serialized_through_app_json(app):
+    response = app.test_client().get("/document")
+    data = json.loads(response.get_data())["data"]
+    assert data["score"] == 0.5
+    assert data["count"] == 3
+    assert data["valid"] is True
+    assert data["vector"] == [0, 1, 2]
+
+    with app.app_context():
+        assert json.loads(app.json.dumps({"skor": np.float64(0.25), "baris": np.zeros((2, 2))})) == {
+            "skor": 0.25, "baris": [[0.0, 0.0], [0.0, 0.0]]}
+
+
+def test_fields_query_parameter_selects_inside_data(app):
+    response = app.test_client().get("/document?fields=file_name,information.tanggal,-information.text")
+    assert json.loads(response.get_data()) == {
+        "data": {"file_name": "surat.pdf", "information": {"tanggal": "12 Mei 2024"}}}
+
+    response = app.test_client().get("/document?fields=-entities,-information,-text,-vector")
+    data = json.loads(response.get_data())["data"]
+    assert set(data) == {"file_name", "score", "count", "valid"}
+
+
+@pytest.fixture
+def compression_settings(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_COMPRESSION", True)
+    monkeypatch.setattr(settings, "RESPONSE_COMPRESSION_MIN_BYTES", 1024)
+    monkeypatch.setattr(settings, "RESPONSE_COMPRESSION_LEVEL", 5)
+
+
+def test_gzip_when_brotli_unavailable(app, compression_settings, monkeypatch):
+    monkeypatch.setattr(http_compression, "brotli", None)
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.get_data()))["data"]["text"].startswith("Dengan hormat")
+
+
+def test_brotli_preferred_when_accepted(app, compression_settings):
+    brotli = pytest.importorskip("brotli")
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "gzip, deflate, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.get_data()))["data"]["text"].startswith("Dengan hormat")
+
+
+def test_encoding_with_q_zero_is_refused(app, compression_settings, monkeypatch):
+    monkeypatch.setattr(http_compression, "brotli", None)
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(response.get_data())["data"]["text"].startswith("Dengan hormat")
+
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "br;q=0, gzip;q=0.5"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_small_responses_are_not_compressed(app, compression_settings):
+    response = app.test_client().get("/document", headers={"Accept-Encoding": "gzip"})
+    assert len(response.get_data()) < settings.RESPONSE_COMPRESSION_MIN_BYTES
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(response.get_data())["data"]["file_name"] == "surat.pdf"
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from src.document_api.utils.micro_batcher import MicroBatcher
+
+
+def submit_concurrently(batcher: MicroBatcher, items):
+    """Mengirim item dari thread terpisah secara bersamaan; mengembalikan hasil atau exception per item."""
+    results = [None] * len(items)
+    barrier = threading.Barrier(len(items))
+
+    def worker(index: int):
+        barrier.wait()
+        try:
+            results[index] = batcher.submit(items[index])
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_each_caller_receives_its_own_result():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [f"hasil-{item}" for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=16, max_wait_ms=200)
+    items = list(range(12))
+
+    results = submit_concurrently(batcher, items)
+
+    assert results == [f"hasil-{item}" for item in items]
+    assert sorted(item for batch in batches for item in batch) == items
+    assert len(batches) < len(items)  # Panggilan bersamaan benar-benar digabung
+
+
+def test_batch_size_never_exceeds_maximum():
+    batches = []
+
+    def process(items):
+        batches.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=200)
+    results = submit_concurrently(batcher, list(range(10)))
+
+    assert results == list(range(10))
+    assert max(batches) <= 3
+    assert sum(batches) == 10
+    stats = batcher.stats()
+    assert stats["items"] == 10
+    assert max(stats["batch_size_histogram"]) <= 3
+
+
+def test_error_is_raised_to_every_caller_in_the_batch():
+    def process(items):
+        if "rusak" in items:
+            raise ValueError("batch gagal")
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=500)
+    results = submit_concurrently(batcher, ["a", "rusak", "b", "c"])
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert batcher.stats()["errors"] == 1
+    # Thread batcher tetap hidup setelah batch gagal.
+    assert batcher.submit("d") == "d"
+
+
+def test_result_count_mismatch_is_an_error():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=1, max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.submit("a")
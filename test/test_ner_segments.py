@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from src.document_api.core.config import settings
+from src.document_api.services import ner_service
+from src.document_api.services.ner_service import NERService
+
+SPECIAL_TOKENS = 2
+
+
+class WhitespaceTokenizer:
+    """Tokenizer fast tiruan: satu token per kata, offset karakter seperti return_offsets_mapping."""
+    is_fast = True
+    model_max_length = 1000000
+
+    def num_special_tokens_to_add(self) -> int:
+        return SPECIAL_TOKENS
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False):
+        return {"offset_mapping": [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]}
+
+
+class CapitalizedWordPipeline:
+    """Pipeline NER tiruan: setiap kata berhuruf kapital menjadi entitas dengan offset relatif segmen."""
+
+    def __init__(self):
+        self.tokenizer = WhitespaceTokenizer()
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None):
+        self.calls.append(list(texts))
+        return [[{"entity_group": "PER", "word": m.group(), "score": 0.9, "start": m.start(), "end": m.end()}
+                 for m in re.finditer(r"\b[A-Z]\w+", text)] for text in texts]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "NER_BATCH_MAX_SIZE", 1)
+    monkeypatch.setattr(settings, "NER_SEGMENT_MAX_TOKENS", 12)  # 10 token isi per segmen
+    monkeypatch.setattr(settings, "NER_FORWARD_BATCH_SIZE", 3)
+    pipeline = CapitalizedWordPipeline()
+    monkeypatch.setattr(ner_service, "load_pipeline", lambda *args, **kwargs: pipeline)
+    return NERService(model_name_or_path="stub")
+
+
+def make_document(names, lines):
+    return "\n".join(f"surat untuk {names[i % len(names)]} di kota {names[(i + 1) % len(names)]} hari ini"
+                     for i in range(lines))
+
+
+DOCUMENTS = [
+    make_document(["Budi", "Maria", "Yohanes"], 7),
+    "Kepada Lestari",
+    make_document(["Surabaya", "Hartono"], 3),
+    make_document(["Santoso", "Diponegoro", "Jemaat", "Majelis"], 12),
+]
+
+
+def test_split_segments_cover_text_and_respect_token_limit(service):
+    text = DOCUMENTS[0]
+    segments = service._split_segments(text)
+
+    assert len(segments) > 1
+    assert "".join(segment_text for _, segment_text, _ in segments) == text
+    for start_char, segment_text, token_count in segments:
+        assert text[start_char:start_char + len(segment_text)] == segment_text
+        assert token_count <= settings.NER_SEGMENT_MAX_TOKENS
+    # Baris pendek: setiap potongan jatuh di batas baris, bukan di tengah baris.
+    for _, segment_text, _ in segments[:-1]:
+        assert segment_text.endswith("\n")
+
+
+def test_short_text_is_a_single_segment(service):
+    assert service._split_segments("Kepada Lestari") == [(0, "Kepada Lestari", 2 + SPECIAL_TOKENS)]
+
+
+def test_entity_offsets_are_relative_to_each_document(service):
+    results = service._predict_documents(DOCUMENTS)
+
+    assert len(results) == len(DOCUMENTS)
+    # Segmen beberapa dokumen digabung: lebih banyak segmen daripada dokumen, dibagi ke beberapa forward pass.
+    segment_count = sum(len(batch) for batch in service.ner_pipeline.calls)
+    assert segment_count > len(DOCUMENTS)
+    assert len(service.ner_pipeline.calls) > 1
+    for text, entities in zip(DOCUMENTS, results):
+        expected = [(m.group(), m.start(), m.end()) for m in re.finditer(r"\b[A-Z]\w+", text)]
+        assert [(entity["word"], entity["start"], entity["end"]) for entity in entities] == expected
+        for entity in entities:
+            assert text[entity["start"]:entity["end"]] == entity["word"]
+
+
+def test_predict_entities_text_matches_batched_documents(service):
+    text = DOCUMENTS[3]
+    entities = service.predict_entities_text(text)
+    assert entities == service._predict_documents([text])[0]
+    assert all(text[entity["start"]:entity["end"]] == entity["word"] for entity in entities)
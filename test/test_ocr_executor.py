@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from src.document_api.core.config import settings
+from src.document_api.services import ocr_service
+from src.document_api.services.ocr_service import OCRError
+
+
+class _DummyEngine:
+    name = "dummy"
+
+
+class _FakeProcessPool:
+    """Pengganti ProcessPoolExecutor: pembuatannya lambat dan submit selalu gagal seperti pool yang rusak."""
+    created = []
+
+    def __init__(self, **kwargs):
+        time.sleep(0.05)  # Memperlebar celah race antar thread
+        self.shutdown_calls = []
+        _FakeProcessPool.created.append(self)
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker mati")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdown_calls.append((wait, cancel_futures))
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    _FakeProcessPool.created = []
+    monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "OCR_PAGE_CACHE_ENABLED", False)
+    monkeypatch.setattr(ocr_service, "create_ocr_engine", lambda *args, **kwargs: _DummyEngine())
+    monkeypatch.setattr(ocr_service, "ProcessPoolExecutor", _FakeProcessPool)
+    tesseract_cmd = tmp_path / "tesseract"
+    tesseract_cmd.write_text("")
+    return ocr_service.OCRService(tesseract_cmd=str(tesseract_cmd), execution_mode="process", workers=2)
+
+
+def test_concurrent_callers_share_one_pool(service):
+    executors = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        executors.append(service._get_executor())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(_FakeProcessPool.created) == 1
+    assert all(executor is _FakeProcessPool.created[0] for executor in executors)
+
+
+def test_broken_pool_is_shut_down_and_replaced(service):
+    pages = iter([(1, np.zeros((4, 4), dtype=np.uint8))])
+
+    with pytest.raises(OCRError):
+        list(service._iter_pages_in_pool(pages, "debug"))
+
+    broken = _FakeProcessPool.created[0]
+    assert broken.shutdown_calls == [(False, True)]
+    assert service._get_executor() is not broken
+    assert len(_FakeProcessPool.created) == 2
+
+
+def test_close_shuts_down_pool_once(service):
+    executor = service._get_executor()
+    service.close()
+    service.close()
+
+    assert executor.shutdown_calls == [(True, True)]
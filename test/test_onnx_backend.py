@@ -0,0 +1,88 @@
+"""
+Uji paritas backend ONNX (MODEL_BACKEND=onnx, fp32 dan int8) terhadap backend transformers
+pada CLASSIFY_MODEL dan NER_MODEL: kesamaan label klasifikasi dan F1 entitas
+(entity_group, start, end). Dilewati jika optimum[onnxruntime] tidak terinstal atau model
+acuan tidak bisa dimuat (mis. tanpa akses ke Hugging Face).
+"""
+import pytest
+
+pytest.importorskip("optimum.onnxruntime")
+from optimum.onnxruntime import ORTModel  # noqa: E402
+
+from src.document_api.core.config import settings  # noqa: E402
+from src.document_api.services import classifier_service, ner_service  # noqa: E402
+from src.document_api.services.classifier_service import TextClassifierService  # noqa: E402
+from src.document_api.services.ner_service import NERService  # noqa: E402
+
+# Ambang (kesamaan label, F1 entitas) per nilai ONNX_QUANTIZE: fp32 harus identik, int8 diberi toleransi.
+PARITY_THRESHOLDS = {False: (1.0, 0.99), True: (0.95, 0.90)}
+
+
+def synthetic_texts():
+    names = ["Pdt. Yohanes Santoso", "Budi Hartono", "Maria Lestari", "GKI Diponegoro", "Majelis Jemaat"]
+    openings = ["Dengan hormat, bersama surat ini kami mengundang", "Menindaklanjuti rapat tanggal 12 Mei 2024,",
+                "Nomor: 045/MJ/GKI/V/2024 Perihal: Permohonan peminjaman ruang"]
+    texts = []
+    for i in range(40):
+        lines = [openings[i % len(openings)], f"Kepada Yth. {names[i % len(names)]}"]
+        lines += [f"kegiatan ibadah bersama {names[(i + j) % len(names)]} di Surabaya" for j in range(1 + i % 12)]
+        lines.append(f"Hormat kami, {names[(i + 2) % len(names)]}")
+        texts.append("\n".join(lines))
+    return texts
+
+
+def entity_f1(reference, candidate) -> float:
+    true_positive = sum(len(ref & cand) for ref, cand in zip(reference, candidate))
+    predicted = sum(len(cand) for cand in candidate)
+    expected = sum(len(ref) for ref in reference)
+    if not predicted and not expected:
+        return 1.0
+    return 2 * true_positive / (predicted + expected)
+
+
+def predict(backend: str, quantize: bool, texts):
+    saved = (settings.MODEL_BACKEND, settings.ONNX_QUANTIZE, settings.CLASSIFY_BATCH_MAX_SIZE,
+             settings.NER_BATCH_MAX_SIZE)
+    settings.MODEL_BACKEND, settings.ONNX_QUANTIZE = backend, quantize
+    settings.CLASSIFY_BATCH_MAX_SIZE = settings.NER_BATCH_MAX_SIZE = 1
+    try:
+        classifier = TextClassifierService(model_name_or_path=settings.CLASSIFY_MODEL)
+        ner = NERService(model_name_or_path=settings.NER_MODEL)
+    finally:
+        (settings.MODEL_BACKEND, settings.ONNX_QUANTIZE, settings.CLASSIFY_BATCH_MAX_SIZE,
+         settings.NER_BATCH_MAX_SIZE) = saved
+
+    if backend == "onnx":
+        # Tanpa pemeriksaan ini, fallback diam-diam ke transformers akan selalu lolos uji paritas.
+        assert isinstance(classifier.classifier.model, ORTModel)
+        assert isinstance(ner.ner_pipeline.model, ORTModel)
+
+    labels = [classifier.classify_text(text)[0]["label"] for text in texts]
+    entities = [{(e["entity_group"], int(e["start"]), int(e["end"])) for e in ner.predict_entities_text(text)}
+                for text in texts]
+    return labels, entities
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return synthetic_texts()
+
+
+@pytest.fixture(scope="module")
+def reference(texts):
+    try:
+        return predict("transformers", False, texts)
+    except (classifier_service.ModelLoadError, ner_service.ModelLoadError) as e:
+        pytest.skip(f"Model acuan tidak bisa dimuat: {e}")
+
+
+@pytest.mark.parametrize("quantize", [False, True], ids=["fp32", "int8"])
+def test_onnx_matches_transformers(reference, texts, quantize):
+    labels, entities = predict("onnx", quantize, texts)
+    reference_labels, reference_entities = reference
+
+    agreement = sum(a == b for a, b in zip(reference_labels, labels)) / len(texts)
+    f1 = entity_f1(reference_entities, entities)
+    min_agreement, min_f1 = PARITY_THRESHOLDS[quantize]
+    assert agreement >= min_agreement
+    assert f1 >= min_f1
@@ -0,0 +1,81 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+from src.document_api.utils.pdf_renderer import iter_pdf_pages
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="pdftoppm tiruan berupa skrip shebang POSIX")
+
+FAKE_PDFTOPPM = textwrap.dedent("""\
+    #!{python}
+    # pdftoppm tiruan: dokumen {pages} halaman, setiap panggilan dicatat ke file log.
+    import sys
+    args = sys.argv[1:]
+    first = int(args[args.index("-f") + 1])
+    last = int(args[args.index("-l") + 1]) if "-l" in args else 10 ** 6
+    gray = "-gray" in args
+    dpi = args[args.index("-r") + 1]
+    with open({log!r}, "a") as log:
+        log.write(f"{{first}} {{last}} {{dpi}} {{'gray' if gray else 'color'}}\\n")
+    if first > {pages}:
+        sys.stderr.write("Wrong page range given: the first page can not be after the last page.\\n")
+        sys.exit(99)
+    for page in range(first, min(last, {pages}) + 1):
+        header = b"P5\\n4 6\\n255\\n" if gray else b"P6\\n4 6\\n255\\n"
+        with open(f"{{args[-1]}}-{{page:02d}}.{{'pgm' if gray else 'ppm'}}", "wb") as f:
+            f.write(header + bytes([page]) * (24 if gray else 72))
+""")
+
+
+@pytest.fixture
+def poppler(tmp_path):
+    log_path = tmp_path / "calls.log"
+    script = tmp_path / "pdftoppm"
+    script.write_text(FAKE_PDFTOPPM.format(python=sys.executable, pages=9, log=str(log_path)))
+    script.chmod(0o755)
+    log_path.write_text("")
+
+    def calls():
+        return [line.split() for line in log_path.read_text().splitlines()]
+
+    return str(tmp_path), calls
+
+
+def test_auto_mode_probes_block_by_block(poppler):
+    poppler_path, calls = poppler
+    color_pages = {1, 2, 5}
+    pages = iter_pdf_pages("dokumen.pdf", dpi=300, poppler_path=poppler_path, window=4, color_mode="auto",
+                           probe_dpi=75, needs_color=lambda thumbnail, page_index: page_index in color_pages)
+
+    page_index, image = next(pages)
+    # Halaman pertama keluar setelah probe blok pertama saja, bukan seluruh dokumen.
+    assert page_index == 0
+    assert calls() == [["1", "4", "75", "color"], ["1", "1", "300", "gray"]]
+
+    rest = list(pages)
+    indices = [page_index] + [index for index, _ in rest]
+    assert indices == list(range(9))
+    assert [image.ndim] + [img.ndim for _, img in rest] == [3 if i in color_pages else 2 for i in range(9)]
+    assert [call for call in calls() if call[2] == "75"] == [["1", "4", "75", "color"], ["5", "8", "75", "color"],
+                                                            ["9", "12", "75", "color"]]
+
+
+def test_auto_mode_with_page_indices_renders_only_requested_pages(poppler):
+    poppler_path, calls = poppler
+    pages = list(iter_pdf_pages("dokumen.pdf", poppler_path=poppler_path, window=2, page_indices=[0, 2, 3, 4, 7],
+                                color_mode="auto", needs_color=lambda thumbnail, page_index: page_index == 3))
+
+    assert [index for index, _ in pages] == [0, 2, 3, 4, 7]
+    assert [image.ndim for _, image in pages] == [2, 2, 3, 2, 2]
+    assert all(int(call[1]) - int(call[0]) + 1 <= 2 for call in calls())
+
+
+def test_fixed_color_mode_stops_at_end_of_document(poppler):
+    poppler_path, calls = poppler
+    pages = list(iter_pdf_pages("dokumen.pdf", poppler_path=poppler_path, window=4, color_mode="gray"))
+
+    assert [index for index, _ in pages] == list(range(9))
+    assert all(image.ndim == 2 for _, image in pages)
+    assert [call[:2] for call in calls()] == [["1", "4"], ["5", "8"], ["9", "12"]]
@@ -0,0 +1,123 @@
+import io
+
+import pytest
+from flask import Flask
+
+from src.document_api.api import pipeline as pipeline_api
+from src.document_api.services.pipeline_service import (DocumentPipelineService, STAGES, UnknownStageError,
+                                                        resolve_stages)
+from src.document_api.utils.json_provider import NumpyJSONProvider
+
+
+class _Recorder:
+    def __init__(self, calls: list, name: str, result):
+        self.calls, self.name, self.result = calls, name, result
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append(self.name)
+        return self.result
+
+
+class _StubOCR:
+    def __init__(self, calls):
+        self.extract_text_from_bytes = _Recorder(calls, "ocr", {
+            "file_name": "surat.pdf", "text_for_ner": "Kepada Budi Hartono", "text_for_classification": "kepada budi",
+            "page_count": 1, "pages": [{"page": 1, "source": "ocr"}], "preprocess_routes": {}})
+
+
+class _StubClassifier:
+    def __init__(self, calls):
+        self.classify_text = _Recorder(calls, "classify", [{"label": "SURAT_UNDANGAN", "score": 0.9}])
+
+
+class _StubNER:
+    def __init__(self, calls):
+        self.predict_entities_text = _Recorder(calls, "ner", [{"entity_group": "PER", "word": "Budi Hartono"}])
+
+
+class _StubExtraction:
+    def __init__(self, calls):
+        self.process_extraction = _Recorder(calls, "extract", {"jenis": "SURAT_UNDANGAN"})
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls, monkeypatch):
+    service = DocumentPipelineService(_StubOCR(calls), _StubClassifier(calls), _StubNER(calls),
+                                      _StubExtraction(calls), workers=1)
+    monkeypatch.setattr(pipeline_api, "pipeline_service", service)
+    app = Flask(__name__)
+    app.json = NumpyJSONProvider(app)
+    app.register_blueprint(pipeline_api.pipeline_bp, url_prefix='/documents')
+    return app.test_client()
+
+
+def post(client, query: str = "", with_file: bool = True):
+    data = {"file": (io.BytesIO(b"%PDF-1.4 isi"), "surat.pdf")} if with_file else {}
+    return client.post(f"/documents/process{query}", data=data, content_type="multipart/form-data")
+
+
+@pytest.mark.parametrize("requested, expected", [
+    (["ocr"], ("ocr",)),
+    (["ner"], ("ocr", "ner")),
+    (["NER", " classify "], ("ocr", "classify", "ner")),
+    (["extract"], ("ocr", "classify", "ner", "extract")),
+    ([], ()),
+])
+def test_resolve_stages_adds_dependencies_in_execution_order(requested, expected):
+    assert resolve_stages(requested) == expected
+
+
+def test_resolve_stages_rejects_unknown_stage():
+    with pytest.raises(UnknownStageError):
+        resolve_stages(["ocr", "terjemahan"])
+
+
+def test_ner_stage_pulls_in_ocr_but_only_returns_entities(client, calls):
+    response = post(client, "?stages=ner")
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert calls == ["ocr", "ner"]
+    assert data == {"file_name": "surat.pdf", "stages": ["ner"],
+                    "entities": [{"entity_group": "PER", "word": "Budi Hartono"}]}
+
+
+def test_response_contains_only_requested_stages_in_canonical_order(client, calls):
+    response = post(client, "?stages=classify,ocr")
+
+    data = response.get_json()["data"]
+    assert calls == ["ocr", "classify"]
+    assert data["stages"] == ["ocr", "classify"]
+    assert set(data) == {"file_name", "stages", "ocr", "classification"}
+    assert data["ocr"]["text"] == "Kepada Budi Hartono"
+
+
+def test_missing_or_empty_stages_runs_every_stage(client, calls):
+    for query in ("", "?stages="):
+        calls.clear()
+        data = post(client, query).get_json()["data"]
+        assert calls == list(STAGES)
+        assert data["stages"] == list(STAGES)
+        assert set(data) == {"file_name", "stages", "ocr", "classification", "entities", "information"}
+
+
+def test_unknown_stage_is_rejected_before_reading_the_file(client, calls):
+    response = post(client, "?stages=ner,terjemahan", with_file=False)
+
+    assert response.status_code == 400
+    assert "terjemahan" in response.get_json()["error"]
+    assert calls == []
+
+
+@pytest.mark.parametrize("query", ["?stages=,", "?stages=%20", "?stages=%20,%20"])
+def test_stages_without_any_stage_name_is_rejected(client, calls, query):
+    response = post(client, query)
+
+    assert response.status_code == 400
+    assert "Pilihan: ocr, classify, ner, extract" in response.get_json()["error"]
+    assert calls == []
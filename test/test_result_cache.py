@@ -0,0 +1,147 @@
+import json
+import os
+import time
+
+import pytest
+
+from src.document_api.core.config import settings
+from src.document_api.services import ocr_service
+from src.document_api.utils.result_cache import ResultCache
+
+
+def payload_size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False))
+
+
+def disk_files(directory):
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(directory)
+                  for name in files if name.endswith(".json"))
+
+
+def test_memory_lru_evicts_least_recently_used_by_bytes():
+    value = {"text": "x" * 90}
+    cache = ResultCache("test", memory_max_bytes=payload_size(value) * 2)
+    cache.put("a", value)
+    cache.put("b", value)
+    assert cache.get("a") == value  # "a" menjadi yang terbaru dipakai
+
+    cache.put("c", value)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_items"] == 2
+    assert stats["memory_bytes"] <= cache.memory_max_bytes
+
+
+def test_memory_skips_values_larger_than_limit():
+    cache = ResultCache("test", memory_max_bytes=10)
+    cache.put("a", {"text": "x" * 100})
+    assert cache.get("a") is None
+    assert cache.stats()["memory_bytes"] == 0
+
+
+def test_disk_tier_round_trip(tmp_path):
+    value = {"text": "Surat Permohonan", "pages": [{"page": 1}]}
+    ResultCache("test", memory_max_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=1024 * 1024).put("k", value)
+
+    # Instance baru (mis. proses lain atau setelah restart) hanya punya tier disk.
+    cache = ResultCache("test", memory_max_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=1024 * 1024)
+    assert cache.get("k") == value
+    assert cache.get("k") == value
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 0
+
+
+def test_disk_entry_expires_after_ttl(tmp_path):
+    writer = ResultCache("test", memory_max_bytes=1024, disk_dir=str(tmp_path),
+                         disk_max_bytes=1024 * 1024, ttl_seconds=60)
+    writer.put("k", {"text": "lama"})
+    path = writer._disk_path("k")
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    cache = ResultCache("test", memory_max_bytes=1024, disk_dir=str(tmp_path),
+                        disk_max_bytes=1024 * 1024, ttl_seconds=60)
+    assert cache.get("k") is None
+    assert not os.path.exists(path)
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_eviction_shrinks_to_ninety_percent_of_limit(tmp_path):
+    value = {"text": "x" * 88}
+    size = payload_size(value)
+    cache = ResultCache("test", memory_max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=size * 10)
+
+    now = time.time()
+    for i in range(10):
+        cache.put(f"key{i:02d}", value)
+        # mtime menentukan urutan eviksi; dibuat berurutan agar tidak bergantung resolusi timestamp.
+        os.utime(cache._disk_path(f"key{i:02d}"), (now - 100 + i, now - 100 + i))
+    assert len(disk_files(tmp_path)) == 10
+
+    cache.put("key10", value)
+
+    remaining = disk_files(tmp_path)
+    assert sum(os.path.getsize(path) for path in remaining) <= int(cache.disk_max_bytes * 0.9)
+    assert len(remaining) == 9
+    assert not os.path.exists(cache._disk_path("key00"))
+    assert not os.path.exists(cache._disk_path("key01"))
+    assert os.path.exists(cache._disk_path("key10"))
+
+
+def test_get_returns_independent_copies():
+    value = {"text": "asli", "pages": [{"page": 1}]}
+    cache = ResultCache("test", memory_max_bytes=1024)
+    cache.put("k", value)
+    value["pages"].append({"page": 2})
+
+    first = cache.get("k")
+    first["text"] = "diubah"
+    first["pages"][0]["page"] = 99
+
+    assert cache.get("k") == {"text": "asli", "pages": [{"page": 1}]}
+
+
+class _DummyEngine:
+    name = "dummy"
+
+
+@pytest.fixture
+def cached_ocr_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_CACHE_DIR", "")
+    monkeypatch.setattr(settings, "OCR_PAGE_CACHE_ENABLED", False)
+    monkeypatch.setattr(ocr_service, "create_ocr_engine", lambda *args, **kwargs: _DummyEngine())
+    tesseract_cmd = tmp_path / "tesseract"
+    tesseract_cmd.write_text("")
+    return ocr_service.OCRService(tesseract_cmd=str(tesseract_cmd), execution_mode="sequential")
+
+
+def test_extract_text_hit_skips_pipeline_and_sets_cache_hit(cached_ocr_service, monkeypatch):
+    calls = []
+
+    def fake_page_results(source, file_extension, debug_id):
+        calls.append(file_extension)
+        yield "Dengan hormat, kami mengundang Bapak/Ibu.", {"page": 1, "source": "ocr"}
+
+    monkeypatch.setattr(cached_ocr_service, "_iter_page_results", fake_page_results)
+
+    first = cached_ocr_service.extract_text_from_bytes(b"isi dokumen", "surat.png")
+    second = cached_ocr_service.extract_text_from_bytes(b"isi dokumen", "salinan.png")
+
+    assert calls == [".png"]
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["file_name"] == "salinan.png"
+    assert second["text_for_ner"] == first["text_for_ner"]
+    assert cached_ocr_service.cache_stats()["documents"]["memory_hits"] == 1
+
+    # Isi berbeda tidak boleh memakai entri yang sama.
+    third = cached_ocr_service.extract_text_from_bytes(b"isi lain", "surat.png")
+    assert third["cache_hit"] is False
+    assert calls == [".png", ".png"]